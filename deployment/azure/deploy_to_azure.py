@@ -68,7 +68,7 @@ def configure_web_app(app_name, resource_group):
     print(f"⚙️  Configuring Web App '{app_name}'...")
     
     # Set startup command
-    startup_command = "gunicorn --bind=0.0.0.0 --timeout 600 registrationApp.wsgi:application"
+    startup_command = "gunicorn -c config/gunicorn.py config.wsgi:application"
     command = f"az webapp config set --resource-group {resource_group} --name {app_name} --startup-file '{startup_command}'"
     run_command(command, "Setting startup command")
     
@@ -83,7 +83,7 @@ User=$USER
 Group=www-data
 WorkingDirectory=/var/www/registration-app
 Environment="PATH=/var/www/registration-app/venv/bin"
-ExecStart=/var/www/registration-app/venv/bin/gunicorn --workers 3 --bind unix:/var/www/registration-app/registration-app.sock config.wsgi:application
+ExecStart=/var/www/registration-app/venv/bin/gunicorn -c config/gunicorn.py --bind unix:/var/www/registration-app/registration-app.sock config.wsgi:application
 
 [Install]
 WantedBy=multi-user.target
@@ -1,11 +1,12 @@
 #!/bin/bash
 # [STUDENT-ID: C4055929 - Ramanjaneyulu Reddy Avuduri] Azure App Service startup script
 
-# Collect static files
+# Build asset bundles (fails on missing references) and collect static files
+python manage.py build_assets
 python manage.py collectstatic --noinput
 
-# Run database migrations
-python manage.py migrate
+# Prepare the database (create if needed, migrate, optional sample data)
+python manage.py bootstrap
 
-# Start Gunicorn
-gunicorn --bind=0.0.0.0 --timeout 600 registrationApp.wsgi:application
+# Start Gunicorn (preloaded, warmed, workers sized from CPU and memory; see config/gunicorn.py)
+exec gunicorn -c config/gunicorn.py config.wsgi:application
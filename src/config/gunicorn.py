@@ -0,0 +1,103 @@
+"""
+Gunicorn launch profile for the WSGI deployment (threaded workers).
+
+Run from the src/ directory:
+
+    gunicorn -c config/gunicorn.py config.wsgi:application
+
+The app is preloaded in the master and warmed (URLs, templates, catalog
+cache; see registration/warmup.py) before any worker is forked, so workers
+share that memory copy-on-write and serve their first request warm. Workers
+are recycled after a jittered number of requests, and SIGTERM drains
+in-flight requests for up to ``graceful_timeout`` seconds.
+
+Environment overrides:
+    WEB_CONCURRENCY          worker processes (default: 2 x CPUs + 1, capped by memory)
+    GUNICORN_THREADS         threads per worker (default 4)
+    GUNICORN_WORKER_MEMORY   expected MB per worker for the memory cap (default 150)
+    GUNICORN_PRELOAD         preload and warm in the master (default true)
+    GUNICORN_MAX_REQUESTS    requests before a worker is recycled (default 1000, 0 disables)
+    GUNICORN_TIMEOUT         seconds before a silent worker is killed (default 30)
+    GUNICORN_BIND / PORT     listen address
+"""
+import gc
+import multiprocessing
+import os
+
+
+def cpu_count() -> int:
+    """CPUs this process may run on (respects container CPU sets)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+def available_memory_mb():
+    """MemAvailable from /proc/meminfo, or None where it cannot be read"""
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def default_workers() -> int:
+    workers = cpu_count() * 2 + 1
+    memory = available_memory_mb()
+    if memory is not None:
+        workers = min(workers, memory // int(os.environ.get('GUNICORN_WORKER_MEMORY', 150)))
+    return max(workers, 1)
+
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', 0)) or default_workers()
+# Requests mostly wait on the database, so a few threads keep a worker busy
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() in ('true', '1', 'yes')
+
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+# Spread recycling out so workers do not all restart at the same moment
+max_requests_jitter = max_requests // 10
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Heartbeat files on tmpfs: a slow disk must not get workers killed
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    """Master: the app is loaded and the socket bound; workers not yet forked"""
+    if not server.cfg.preload_app:
+        return
+    from registration.warmup import warm_up
+
+    warm_up()
+    # Move everything allocated so far out of the collector's reach, so
+    # collections in the workers do not touch (and copy) the shared pages
+    gc.collect()
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    if not worker.cfg.preload_app:
+        from registration.warmup import warm_up
+
+        warm_up()
+
+
+def worker_exit(server, worker):
+    from django.db import connections
+
+    connections.close_all()
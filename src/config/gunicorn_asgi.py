@@ -0,0 +1,33 @@
+"""
+Gunicorn launch profile for the ASGI deployment (uvicorn workers).
+
+Run from the src/ directory:
+
+    gunicorn -c config/gunicorn_asgi.py config.asgi:application
+
+or, without gunicorn supervising the workers:
+
+    ASYNC_CATALOG_VIEWS=true uvicorn config.asgi:application --workers 2 --host 0.0.0.0 --port 8000
+
+Each uvicorn worker runs one event loop, so the async catalog views can keep
+many requests in flight per process; sync views still run in a thread pool.
+Preloading, warmup, recycling and shutdown are shared with the WSGI profile
+(config/gunicorn.py).
+"""
+import os
+import sys
+
+# gunicorn reads this file before changing into the app directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.gunicorn import *  # noqa: E402,F401,F403
+
+worker_class = 'uvicorn.workers.UvicornWorker'
+# Async workers are not blocked by I/O, so one per core is enough
+workers = int(os.environ.get('WEB_CONCURRENCY', 0)) or min(default_workers(), cpu_count())  # noqa: F405
+threads = 1
+
+# Make sure the workers route catalog URLs to registration/async_views.py.
+# Async views run their queries on whichever thread is free, so connections
+# are not kept across requests here (DB_CONN_MAX_AGE=0).
+raw_env = ['ASYNC_CATALOG_VIEWS=true', 'DB_CONN_MAX_AGE=0']
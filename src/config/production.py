@@ -16,21 +16,65 @@ ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', '').split(',') + [
     'localhost',
     '127.0.0.1'
 ]
+# Every tenant's host names (see TENANTS in config/settings.py)
+ALLOWED_HOSTS += [host for hosts in TENANTS.values() for host in hosts]
 
 # Database configuration for Azure
 # Use PostgreSQL if DATABASE_URL is set, otherwise fall back to SQLite
 if 'DATABASE_URL' in os.environ:
     DATABASES = {
-        'default': dj_database_url.parse(os.environ['DATABASE_URL'])
+        'default': dj_database_url.parse(
+            os.environ['DATABASE_URL'],
+            conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+            conn_health_checks=True,
+        )
     }
+    # psycopg's connection pool (psycopg 3 with psycopg-pool installed). Each
+    # worker process holds at most DB_POOL_MAX_SIZE connections, which should
+    # match its thread count (GUNICORN_THREADS); requests wait up to
+    # DB_POOL_TIMEOUT seconds for a free one. Django requires CONN_MAX_AGE = 0
+    # with a pool: connections are returned to the pool instead of kept open.
+    if os.environ.get('DB_POOL', 'false').lower() == 'true' and DATABASES['default']['ENGINE'].endswith('postgresql'):
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', os.environ.get('GUNICORN_THREADS', 4))),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
         }
     }
 
+# Read replicas: comma-separated database URLs, configured like the primary.
+# Two SQLite files work for trying this locally (the replica a copy of the primary).
+DATABASE_REPLICAS = []
+for _n, _url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), start=1):
+    _replica = dj_database_url.parse(
+        _url.strip(),
+        conn_max_age=DATABASES['default'].get('CONN_MAX_AGE', 0),
+        conn_health_checks=True,
+    )
+    if 'pool' in DATABASES['default'].get('OPTIONS', {}) and _replica['ENGINE'] == DATABASES['default']['ENGINE']:
+        _replica.setdefault('OPTIONS', {})['pool'] = DATABASES['default']['OPTIONS']['pool']
+    _replica['TEST'] = {'MIRROR': 'default'}
+    DATABASES[f'replica_{_n}'] = _replica
+    DATABASE_REPLICAS.append(f'replica_{_n}')
+
+# One database (or PostgreSQL schema) per tenant next to the default database
+DATABASES.update(tenant_databases(DATABASES['default']))
+
+# SQLite databases (the fallback, or sqlite:// URLs) get the tuned profile
+# from config/settings.py: WAL, busy timeout and BEGIN IMMEDIATE writes
+for _database in DATABASES.values():
+    if _database['ENGINE'] == 'django.db.backends.sqlite3':
+        _database['OPTIONS'] = {**SQLITE_OPTIONS, **_database.get('OPTIONS', {})}
+
 # Static files configuration for Azure
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
@@ -38,8 +82,28 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # Add whitenoise for static file serving
 MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
 
-# Configure whitenoise
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Configure whitenoise: collected files get content-hashed names (run
+# build_assets before collectstatic), which whitenoise serves with far-future
+# immutable cache headers, plus precompressed variants.
+STORAGES = {
+    'default': {
+        'BACKEND': 'registration.tenants.TenantFileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Compile each template once per process (Django only does this implicitly
+# when DEBUG is off and no loaders are configured; make it explicit).
+# Template fragments tagged {% cachefragment %} are cached whenever DEBUG is off.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
 
 # Security settings for production
 SECURE_BROWSER_XSS_FILTER = True
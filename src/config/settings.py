@@ -11,8 +11,10 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import re
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -36,6 +38,13 @@ LOGOUT_REDIRECT_URL = 'home'  # Redirect to home after logout
 # Custom user model
 AUTH_USER_MODEL = 'registration.User'
 
+# The cached backend (registration/backends.py) is added below when the cache
+# is shared by every worker. ModelBackend stays listed so sessions created
+# before the switch remain valid.
+AUTHENTICATION_BACKENDS = [
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -51,10 +60,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'registration.tenants.TenantMiddleware',
+    'registration.routers.ReplicaMiddleware',
+    'registration.sessions.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'registration.student_context.StudentContextMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -71,12 +83,17 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'registration.student_context.student_context',
             ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
+
+# Serve the read-only catalog pages with async views (set when running under ASGI)
+ASYNC_CATALOG_VIEWS = config('ASYNC_CATALOG_VIEWS', default=False, cast=bool)
 
 
 # Database
@@ -91,6 +108,10 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='somrup7'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='3306'),
+        # Keep each worker thread's connection open across requests (seconds;
+        # 0 closes it after every request) and check it before reusing it
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
         'OPTIONS': {
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
             'charset': 'utf8mb4',
@@ -98,6 +119,83 @@ DATABASES = {
     }
 }
 
+# Read replicas (registration/routers.py): comma-separated host[:port] of
+# MySQL replicas that accept the primary's credentials. Catalog pages,
+# reports and exports read from them; everything else uses the primary.
+DATABASE_REPLICAS = []
+for _n, _host in enumerate(filter(None, config('DB_REPLICA_HOSTS', default='').split(',')), start=1):
+    _host, _, _port = _host.strip().partition(':')
+    DATABASES[f'replica_{_n}'] = {
+        **DATABASES['default'], 'HOST': _host, 'PORT': _port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{_n}')
+
+# Single-node SQLite profile, applied by config/production.py when it runs
+# on SQLite. WAL lets reads proceed while one connection writes. Write
+# transactions begin IMMEDIATE, taking the write lock up front, so a writer
+# waits up to SQLITE_BUSY_TIMEOUT seconds for it instead of failing with
+# "database is locked" when a read transaction tries to upgrade.
+# synchronous=NORMAL is safe with WAL (a power loss can only drop the last
+# commits); mmap and a larger page cache serve reads from memory.
+SQLITE_OPTIONS = {
+    'timeout': config('SQLITE_BUSY_TIMEOUT', default=20, cast=int),
+    'transaction_mode': 'IMMEDIATE',
+    'init_command': ';'.join([
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f"PRAGMA mmap_size={config('SQLITE_MMAP_SIZE', default=268435456, cast=int)}",
+        f"PRAGMA cache_size=-{config('SQLITE_CACHE_KB', default=65536, cast=int)}",
+        'PRAGMA temp_store=MEMORY',
+    ]),
+}
+
+# Tenants (registration/tenants.py): comma-separated name=host pairs, e.g.
+# "north=north.example.edu,south=south.example.edu,south=www.south.example.edu".
+# Each tenant has its own database alias, tenant_<name>, on the default
+# database's server: a database named <NAME>_<name> (a <file>_<name>.sqlite3
+# file on SQLite) or, with TENANT_ISOLATION=schema on PostgreSQL, the schema
+# <name> in the default database. Hosts that match no tenant, and management
+# commands, use TENANT ('' is the default database).
+TENANTS = {}
+for _pair in filter(None, config('TENANTS', default='').split(',')):
+    _name, _, _host = _pair.strip().partition('=')
+    TENANTS.setdefault(_name.strip(), []).append(_host.strip().lower())
+TENANT = config('TENANT', default='')
+TENANT_ISOLATION = config('TENANT_ISOLATION', default='database')  # 'database' or 'schema'
+# Seconds an idle tenant connection is kept; many small tenants should not each hold one per thread
+TENANT_CONN_MAX_AGE = config('TENANT_CONN_MAX_AGE', default=60, cast=int)
+
+
+def tenant_databases(default) -> dict:
+    """DATABASES entries for the tenants, derived from the default database's settings"""
+    databases = {}
+    for name in TENANTS:
+        if not re.fullmatch(r'[a-z][a-z0-9_]*', name):
+            raise ImproperlyConfigured(f'Tenant name {name!r} must be lowercase letters, digits and underscores')
+        database = {
+            **default,
+            'CONN_MAX_AGE': min(default.get('CONN_MAX_AGE', 0), TENANT_CONN_MAX_AGE),
+            'OPTIONS': dict(default.get('OPTIONS', {})),
+        }
+        if TENANT_ISOLATION == 'schema' and default['ENGINE'] == 'django.db.backends.postgresql':
+            database['OPTIONS']['options'] = f'-c search_path={name}'
+        elif default['ENGINE'] == 'django.db.backends.sqlite3':
+            path = Path(default['NAME'])
+            database['NAME'] = path.with_name(f'{path.stem}_{name}{path.suffix}')
+        else:
+            database['NAME'] = f"{default['NAME']}_{name}"
+        databases[f'tenant_{name}'] = database
+    return databases
+
+
+DATABASES.update(tenant_databases(DATABASES['default']))
+
+DATABASE_ROUTERS = ['registration.tenants.TenantRouter', 'registration.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=5, cast=int)  # Primary reads after a write
+REPLICA_MAX_LAG = config('REPLICA_MAX_LAG', default=5, cast=float)  # Seconds; further behind falls back to the primary
+REPLICA_CHECK_INTERVAL = config('REPLICA_CHECK_INTERVAL', default=10, cast=float)  # Seconds between lag checks
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -182,6 +280,16 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads go to MEDIA_ROOT/<tenant>/ for tenants (registration/tenants.py)
+STORAGES = {
+    'default': {
+        'BACKEND': 'registration.tenants.TenantFileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
 # Login/Logout URLs
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = 'home'
@@ -190,9 +298,50 @@ LOGOUT_REDIRECT_URL = 'home'
 # Email settings (for password reset, etc.)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development only
 
+# Cache
+# Local memory is per process; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# cache (e.g. django.core.cache.backends.redis.RedisCache, redis://host:6379/1)
+# so single-flight locks, version stamps and availability events span workers.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='skylark-academy'),
+        # Keys carry the tenant's name, so tenants can share one cache
+        'KEY_FUNCTION': 'registration.tenants.cache_key',
+    }
+}
+
+# Serve the logged-in user, student profile, groups and permissions from the
+# cache. Only with a shared cache: invalidation is by version stamps, which a
+# per-process cache would keep from the other workers until the TTL runs out.
+if CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache':
+    AUTHENTICATION_BACKENDS.insert(0, 'registration.backends.CachedModelBackend')
+
+# External data client (registration/external.py)
+EXTERNAL_DATA = {
+    'BASE_URL': config('EXTERNAL_DATA_BASE_URL', default='https://jsonplaceholder.typicode.com'),
+    'CONNECT_TIMEOUT': config('EXTERNAL_DATA_CONNECT_TIMEOUT', default=3.05, cast=float),
+    'READ_TIMEOUT': config('EXTERNAL_DATA_READ_TIMEOUT', default=5.0, cast=float),
+    'POOL_MAXSIZE': config('EXTERNAL_DATA_POOL_MAXSIZE', default=10, cast=int),
+    'CACHE_TTL': config('EXTERNAL_DATA_CACHE_TTL', default=60, cast=int),  # Served as fresh
+    'STALE_WHILE_REVALIDATE': 300,  # Served stale while refreshing in the background
+    'STALE_IF_ERROR': 86400,  # Served stale while the upstream is failing
+    'FAILURE_THRESHOLD': 5,  # Consecutive failures before the circuit opens
+    'RECOVERY_TIMEOUT': 30,  # Seconds before a half-open probe is allowed
+}
+
 # Session settings
+# Cached-DB sessions written only when they change or when the last save is
+# older than SESSION_REFRESH_INTERVAL, so the expiry still slides for active
+# users (see registration/sessions.py). The cached copy needs a shared cache:
+# with a per-process one a logout would not reach the other workers, so the
+# sessions then live in the database only.
+if CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache':
+    SESSION_ENGINE = 'registration.sessions'
+else:
+    SESSION_ENGINE = 'registration.db_sessions'
 SESSION_COOKIE_AGE = 1209600  # 2 weeks in seconds
-SESSION_SAVE_EVERY_REQUEST = True
+SESSION_REFRESH_INTERVAL = config('SESSION_REFRESH_INTERVAL', default=86400, cast=int)  # 1 day in seconds
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -7,7 +7,13 @@ from django.http import HttpResponse
 from django.utils import timezone
 from django.utils.html import format_html
 from django.contrib import messages
-from .models import Course, Module, Student, Registration, PageContent, AdminAuditLog
+from .models import (
+    Course, Module, ModuleOffering, Student, Registration, RegistrationArchive, Term, PageContent, AdminAuditLog,
+)
+from .availability import publish_modules
+from .routers import replica_reads
+from .terms import sync_offerings
+from .versioning import CATALOG, REGISTRATIONS, STUDENTS, bump_user_versions, bump_version
 
 User = get_user_model()
 
@@ -73,6 +79,7 @@ class CourseAdmin(admin.ModelAdmin):
         return format_html('<span style="color: gray;">{}</span>', count)
     students_count.short_description = 'Enrolled Students'
     
+    @replica_reads
     def export_as_csv(self, request, queryset):
         response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename=courses_export_{timezone.now().strftime("%Y%m%d")}.csv'
@@ -90,6 +97,7 @@ class CourseAdmin(admin.ModelAdmin):
     
     def bulk_activate(self, request, queryset):
         updated = queryset.update(is_active=True)
+        bump_version(CATALOG)
         self.message_user(request, f'{updated} courses have been activated and are now available for enrollment.')
         
         # Log bulk action
@@ -106,6 +114,7 @@ class CourseAdmin(admin.ModelAdmin):
     
     def bulk_deactivate(self, request, queryset):
         updated = queryset.update(is_active=False)
+        bump_version(CATALOG)
         self.message_user(request, f'{updated} courses have been deactivated and are no longer available for enrollment.')
         
         # Log bulk action
@@ -199,19 +208,20 @@ class ModuleAdmin(admin.ModelAdmin):
     courses_linked.short_description = 'Linked Courses'
     
     def registered_students_count(self, obj):
-        count = obj.registrations.count()
+        count = obj.registered_students_count()
         if count > 0:
             return format_html('<span style="color: green;">{}</span>', count)
         return format_html('<span style="color: gray;">{}</span>', count)
     registered_students_count.short_description = 'Registered Students'
     
     def available_slots(self, obj):
-        available = obj.courses_allowed - obj.registrations.count()
+        available = obj.courses_allowed - obj.registered_students_count()
         if available > 0:
             return format_html('<span style="color: green;">{}</span>', available)
         return format_html('<span style="color: red;">{}</span>', available)
     available_slots.short_description = 'Available Slots'
     
+    @replica_reads
     def export_as_csv(self, request, queryset):
         response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename=modules_export_{timezone.now().strftime("%Y%m%d")}.csv'
@@ -230,11 +240,16 @@ class ModuleAdmin(admin.ModelAdmin):
     export_as_csv.short_description = "Export selected modules to CSV"
     
     def bulk_activate(self, request, queryset):
+        # Read the selection first: filtered on availability, the queryset is empty after the update
+        modules = list(queryset)
         updated = queryset.update(availability=True)
+        sync_offerings([module.pk for module in modules])
+        bump_version(CATALOG)
+        publish_modules(module.pk for module in modules)
         self.message_user(request, f'{updated} modules have been activated.')
         
         # Log bulk action
-        for module in queryset:
+        for module in modules:
             AdminAuditLog.objects.create(
                 admin_user=request.user,
                 action='UPDATE',
@@ -246,11 +261,16 @@ class ModuleAdmin(admin.ModelAdmin):
     bulk_activate.short_description = "Activate selected modules"
     
     def bulk_deactivate(self, request, queryset):
+        # Read the selection first: filtered on availability, the queryset is empty after the update
+        modules = list(queryset)
         updated = queryset.update(availability=False)
+        sync_offerings([module.pk for module in modules])
+        bump_version(CATALOG)
+        publish_modules(module.pk for module in modules)
         self.message_user(request, f'{updated} modules have been deactivated.')
         
         # Log bulk action
-        for module in queryset:
+        for module in modules:
             AdminAuditLog.objects.create(
                 admin_user=request.user,
                 action='UPDATE',
@@ -261,6 +281,7 @@ class ModuleAdmin(admin.ModelAdmin):
             )
     bulk_deactivate.short_description = "Deactivate selected modules"
     
+    @replica_reads
     def export_registrations(self, request, queryset):
         response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename=module_registrations_{timezone.now().strftime("%Y%m%d")}.csv'
@@ -353,7 +374,7 @@ class StudentAdmin(admin.ModelAdmin):
     def user_full_name(self, obj):
         return obj.user.get_full_name()
     user_full_name.short_description = 'Name'
-    user_full_name.admin_order_field = 'user__last_name'
+    user_full_name.admin_order_field = 'sort_name'
     
     def email(self, obj):
         return obj.user.email
@@ -366,6 +387,7 @@ class StudentAdmin(admin.ModelAdmin):
         return format_html('<span style="color: gray;">{}</span>', count)
     registration_count.short_description = 'Registrations'
     
+    @replica_reads
     def export_as_csv(self, request, queryset):
         response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename=students_export_{timezone.now().strftime("%Y%m%d")}.csv'
@@ -383,11 +405,15 @@ class StudentAdmin(admin.ModelAdmin):
     export_as_csv.short_description = "Export selected students to CSV"
     
     def bulk_activate(self, request, queryset):
+        # Read the selection first: filtered on is_active, the queryset is empty after the update
+        students = list(queryset.select_related('user'))
         updated = queryset.update(is_active=True)
+        bump_version(STUDENTS)
+        bump_user_versions(student.user_id for student in students)
         self.message_user(request, f'{updated} students have been activated.')
         
         # Log bulk action
-        for student in queryset:
+        for student in students:
             AdminAuditLog.objects.create(
                 admin_user=request.user,
                 action='UPDATE',
@@ -399,11 +425,15 @@ class StudentAdmin(admin.ModelAdmin):
     bulk_activate.short_description = "Activate selected students"
     
     def bulk_deactivate(self, request, queryset):
+        # Read the selection first: filtered on is_active, the queryset is empty after the update
+        students = list(queryset.select_related('user'))
         updated = queryset.update(is_active=False)
+        bump_version(STUDENTS)
+        bump_user_versions(student.user_id for student in students)
         self.message_user(request, f'{updated} students have been deactivated.')
         
         # Log bulk action
-        for student in queryset:
+        for student in students:
             AdminAuditLog.objects.create(
                 admin_user=request.user,
                 action='UPDATE',
@@ -414,6 +444,7 @@ class StudentAdmin(admin.ModelAdmin):
             )
     bulk_deactivate.short_description = "Deactivate selected students"
     
+    @replica_reads
     def export_academic_history(self, request, queryset):
         response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename=academic_history_{timezone.now().strftime("%Y%m%d")}.csv'
@@ -439,8 +470,8 @@ class StudentAdmin(admin.ModelAdmin):
 
 @admin.register(Registration)
 class RegistrationAdmin(admin.ModelAdmin):
-    list_display = ['student', 'module', 'status', 'grade', 'registration_date', 'status_color']
-    list_filter = ['status', 'module__category', 'registration_date']
+    list_display = ['student', 'module', 'term', 'status', 'grade', 'registration_date', 'status_color']
+    list_filter = ['term', 'status', 'module__category', 'registration_date']
     search_fields = ['student__user__username', 'student__user__first_name', 'student__user__last_name', 'module__code', 'module__name']
     date_hierarchy = 'registration_date'
     list_editable = ['status', 'grade']
@@ -449,7 +480,7 @@ class RegistrationAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('Registration Details', {
-            'fields': ('student', 'module', 'status', 'grade')
+            'fields': ('student', 'module', 'term', 'status', 'grade')
         }),
         ('Additional Information', {
             'fields': ('notes',)
@@ -504,6 +535,7 @@ class RegistrationAdmin(admin.ModelAdmin):
         )
     status_color.short_description = 'Status'
     
+    @replica_reads
     def export_as_csv(self, request, queryset):
         response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename=registrations_export_{timezone.now().strftime("%Y%m%d")}.csv'
@@ -525,11 +557,15 @@ class RegistrationAdmin(admin.ModelAdmin):
     export_as_csv.short_description = "Export selected registrations to CSV"
     
     def bulk_approve(self, request, queryset):
+        # Read the selection first: filtered on status, the queryset is empty after the update
+        registrations = list(queryset.select_related('student', 'module'))
         updated = queryset.update(status='A')
+        bump_version(REGISTRATIONS)
+        publish_modules(registration.module_id for registration in registrations)
         self.message_user(request, f'{updated} registrations have been approved.')
         
         # Log bulk action
-        for registration in queryset:
+        for registration in registrations:
             AdminAuditLog.objects.create(
                 admin_user=request.user,
                 action='UPDATE',
@@ -541,11 +577,15 @@ class RegistrationAdmin(admin.ModelAdmin):
     bulk_approve.short_description = "Approve selected registrations"
     
     def bulk_reject(self, request, queryset):
+        # Read the selection first: filtered on status, the queryset is empty after the update
+        registrations = list(queryset.select_related('student', 'module'))
         updated = queryset.update(status='R')
+        bump_version(REGISTRATIONS)
+        publish_modules(registration.module_id for registration in registrations)
         self.message_user(request, f'{updated} registrations have been rejected.')
         
         # Log bulk action
-        for registration in queryset:
+        for registration in registrations:
             AdminAuditLog.objects.create(
                 admin_user=request.user,
                 action='UPDATE',
@@ -556,6 +596,34 @@ class RegistrationAdmin(admin.ModelAdmin):
             )
     bulk_reject.short_description = "Reject selected registrations"
 
+class ModuleOfferingInline(admin.TabularInline):
+    model = ModuleOffering
+    fields = ['module', 'capacity', 'availability']
+    extra = 0
+
+
+@admin.register(Term)
+class TermAdmin(admin.ModelAdmin):
+    list_display = ['code', 'name', 'starts_on', 'ends_on', 'is_current']
+    search_fields = ['code', 'name']
+    readonly_fields = ['is_current', 'created_at']
+    inlines = [ModuleOfferingInline]
+
+
+@admin.register(RegistrationArchive)
+class RegistrationArchiveAdmin(admin.ModelAdmin):
+    """Past terms' registrations; moved here by ``manage.py rollover_term``"""
+    list_display = ['student', 'module', 'term', 'status', 'grade', 'registration_date']
+    list_filter = ['term', 'status']
+    list_select_related = ['student__user', 'module', 'term']
+    search_fields = ['student__student_id', 'student__user__username', 'module__code']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
 # Custom Group Admin for better management
 class CustomGroupAdmin(admin.ModelAdmin):
     list_display = ['name', 'user_count', 'permission_count']
@@ -669,6 +737,7 @@ class UserAdmin(BaseUserAdmin):
             ip = request.META.get('REMOTE_ADDR')
         return ip
     
+    @replica_reads
     def export_as_csv(self, request, queryset):
         response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename=users_export_{timezone.now().strftime("%Y%m%d")}.csv'
@@ -686,11 +755,15 @@ class UserAdmin(BaseUserAdmin):
     export_as_csv.short_description = "Export selected users to CSV"
     
     def bulk_activate(self, request, queryset):
+        # Read the selection first: filtered on is_active, the queryset is empty after the update
+        users = list(queryset)
         updated = queryset.update(is_active=True)
+        bump_version(STUDENTS)
+        bump_user_versions(user.pk for user in users)
         self.message_user(request, f'{updated} users have been activated.')
         
         # Log bulk action
-        for user in queryset:
+        for user in users:
             AdminAuditLog.objects.create(
                 admin_user=request.user,
                 action='UPDATE',
@@ -702,11 +775,15 @@ class UserAdmin(BaseUserAdmin):
     bulk_activate.short_description = "Activate selected users"
     
     def bulk_deactivate(self, request, queryset):
+        # Read the selection first: filtered on is_active, the queryset is empty after the update
+        users = list(queryset)
         updated = queryset.update(is_active=False)
+        bump_version(STUDENTS)
+        bump_user_versions(user.pk for user in users)
         self.message_user(request, f'{updated} users have been deactivated.')
         
         # Log bulk action
-        for user in queryset:
+        for user in users:
             AdminAuditLog.objects.create(
                 admin_user=request.user,
                 action='UPDATE',
@@ -773,6 +850,7 @@ class PageContentAdmin(admin.ModelAdmin):
         return obj.content[:100] + '...' if len(obj.content) > 100 else obj.content
     content_preview.short_description = 'Content Preview'
     
+    @replica_reads
     def export_content(self, request, queryset):
         """Export page content to CSV"""
         response = HttpResponse(content_type='text/csv')
@@ -841,6 +919,15 @@ class CustomAdminSite(admin.AdminSite):
         
         return super().index(request, extra_context)
 
+    def get_urls(self):
+        from django.urls import path
+        from .admin_views import db_pool_stats
+
+        # Ahead of the admin's catch-all, which would otherwise 404 the path
+        return [
+            path('db-pool/', self.admin_view(db_pool_stats), name='db_pool'),
+        ] + super().get_urls()
+
 # Replace the default admin site with our custom one
 admin_site = CustomAdminSite(name='custom_admin')
 
@@ -849,6 +936,8 @@ admin_site.register(Course, CourseAdmin)
 admin_site.register(Module, ModuleAdmin)
 admin_site.register(Student, StudentAdmin)
 admin_site.register(Registration, RegistrationAdmin)
+admin_site.register(Term, TermAdmin)
+admin_site.register(RegistrationArchive, RegistrationArchiveAdmin)
 admin_site.register(PageContent, PageContentAdmin)
 admin_site.register(AdminAuditLog, AdminAuditLogAdmin)
 admin_site.register(User, UserAdmin)
@@ -1,4 +1,5 @@
 from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.db.models import Count, Avg, Q
@@ -6,14 +7,28 @@ from django.utils import timezone
 from datetime import datetime, timedelta
 from django.core.paginator import Paginator
 from .models import Module, Student, Registration, User, AdminAuditLog
+from . import db_pool
+from .availability import publish_modules
+from .routers import replica_reads
+from .singleflight import make_key, single_flight
+from .terms import current_term, sync_offerings
+from .versioning import CATALOG, REGISTRATIONS, STUDENTS, bump_version
 import csv
 
 def is_superuser(user):
     return user.is_superuser
 
 @staff_member_required
+@replica_reads
 def admin_dashboard(request):
     """Admin dashboard with statistics and overview"""
+    # Identical concurrent requests share one computation (see singleflight.py)
+    key = make_key('admin_dashboard', depends_on=(CATALOG, REGISTRATIONS, STUDENTS))
+    context = single_flight.do(key, dashboard_data)
+    return render(request, 'admin/dashboard.html', context)
+
+def dashboard_data():
+    """Compute the dashboard statistics (fully evaluated, so it can be shared)"""
     
     # Get current date and time
     now = timezone.now()
@@ -26,24 +41,24 @@ def admin_dashboard(request):
     active_modules = Module.objects.filter(availability=True).count()
     
     # Recent activity
-    recent_registrations = Registration.objects.select_related('student__user', 'module').order_by('-registration_date')[:10]
-    recent_students = Student.objects.select_related('user').order_by('-created_at')[:5]
+    recent_registrations = list(Registration.objects.select_related('student__user', 'module').order_by('-registration_date')[:10])
+    recent_students = list(Student.objects.select_related('user').order_by('-created_at')[:5])
     
     # Module statistics
-    module_stats = Module.objects.annotate(
+    module_stats = list(Module.objects.annotate(
         student_count=Count('registrations')
-    ).order_by('-student_count')[:10]
+    ).order_by('-student_count')[:10])
     
     # Category distribution
-    category_stats = Module.objects.values('category').annotate(
+    category_stats = list(Module.objects.values('category').annotate(
         count=Count('id'),
         avg_credit=Avg('credit')
-    ).order_by('-count')
+    ).order_by('-count'))
     
     # Registration status distribution
-    status_stats = Registration.objects.values('status').annotate(
+    status_stats = list(Registration.objects.values('status').annotate(
         count=Count('id')
-    ).order_by('-count')
+    ).order_by('-count'))
     
     # Monthly registration trends (last 6 months)
     monthly_stats = []
@@ -62,11 +77,11 @@ def admin_dashboard(request):
         })
     
     # Top performing modules
-    top_modules = Module.objects.annotate(
+    top_modules = list(Module.objects.annotate(
         registration_count=Count('registrations')
-    ).filter(registration_count__gt=0).order_by('-registration_count')[:5]
+    ).filter(registration_count__gt=0).order_by('-registration_count')[:5])
     
-    context = {
+    return {
         'total_students': total_students,
         'total_modules': total_modules,
         'total_registrations': total_registrations,
@@ -79,8 +94,6 @@ def admin_dashboard(request):
         'monthly_stats': monthly_stats,
         'top_modules': top_modules,
     }
-    
-    return render(request, 'admin/dashboard.html', context)
 
 @staff_member_required
 def bulk_operations(request):
@@ -92,22 +105,43 @@ def bulk_operations(request):
         
         if action == 'activate_modules':
             Module.objects.filter(id__in=selected_ids).update(availability=True)
+            sync_offerings(selected_ids)
+            publish_modules(selected_ids)
+            bump_version(CATALOG)
             messages.success(request, f'{len(selected_ids)} modules activated successfully.')
         elif action == 'deactivate_modules':
             Module.objects.filter(id__in=selected_ids).update(availability=False)
+            sync_offerings(selected_ids)
+            publish_modules(selected_ids)
+            bump_version(CATALOG)
             messages.success(request, f'{len(selected_ids)} modules deactivated successfully.')
         elif action == 'approve_registrations':
             Registration.objects.filter(id__in=selected_ids).update(status='A')
+            publish_modules(Registration.objects.filter(id__in=selected_ids).values_list('module_id', flat=True))
+            bump_version(REGISTRATIONS)
             messages.success(request, f'{len(selected_ids)} registrations approved successfully.')
         elif action == 'reject_registrations':
             Registration.objects.filter(id__in=selected_ids).update(status='R')
+            publish_modules(Registration.objects.filter(id__in=selected_ids).values_list('module_id', flat=True))
+            bump_version(REGISTRATIONS)
             messages.success(request, f'{len(selected_ids)} registrations rejected successfully.')
         
         return redirect('admin:bulk_operations')
     
-    # Get data for bulk operations
-    modules = Module.objects.all().order_by('code')
-    registrations = Registration.objects.select_related('student__user', 'module').order_by('-registration_date')
+    # Get data for bulk operations: only the columns the tables show, and
+    # this term's registration counts in the same query as the modules
+    modules = list(
+        Module.objects.only('id', 'code', 'name', 'category', 'credit', 'availability', 'courses_allowed')
+        .annotate(registered=Count('registrations', filter=Q(registrations__term=current_term())))
+        .order_by('code')
+    )
+    for module in modules:
+        module.seats_left = max(0, module.courses_allowed - module.registered)
+    registrations = Registration.objects.select_related('student__user', 'module').only(
+        'id', 'status', 'grade', 'registration_date', 'notes', 'student', 'module',
+        'student__student_id', 'student__user', 'student__user__first_name', 'student__user__last_name',
+        'module__code', 'module__name',
+    ).order_by('-registration_date')
     
     context = {
         'modules': modules,
@@ -207,6 +241,7 @@ def import_students_from_csv(csv_file):
     return success_count
 
 @staff_member_required
+@replica_reads
 def audit_logs(request):
     """View admin audit logs"""
     
@@ -241,18 +276,24 @@ def audit_logs(request):
     return render(request, 'admin/audit_logs.html', context)
 
 @staff_member_required
+@replica_reads
 def reports(request):
     """Generate various reports"""
     
     report_type = request.GET.get('type', 'enrollment')
-    
+    key = make_key('reports', {'type': report_type}, depends_on=(CATALOG, REGISTRATIONS, STUDENTS))
+    context = single_flight.do(key, lambda: report_data(report_type))
+    return render(request, 'admin/reports.html', context)
+
+def report_data(report_type):
+    """Compute one report (fully evaluated, so it can be shared)"""
     if report_type == 'enrollment':
         # Enrollment report
-        modules = Module.objects.annotate(
+        modules = list(Module.objects.annotate(
             student_count=Count('registrations'),
             male_count=Count('registrations__student', filter=Q(registrations__student__gender='M')),
             female_count=Count('registrations__student', filter=Q(registrations__student__gender='F'))
-        ).order_by('-student_count')
+        ).order_by('-student_count'))
         
         context = {
             'report_type': 'enrollment',
@@ -263,13 +304,13 @@ def reports(request):
         
     elif report_type == 'geographic':
         # Geographic distribution report
-        city_stats = Student.objects.values('city').annotate(
+        city_stats = list(Student.objects.values('city').annotate(
             count=Count('id')
-        ).order_by('-count')[:20]
+        ).order_by('-count')[:20])
         
-        country_stats = Student.objects.values('country').annotate(
+        country_stats = list(Student.objects.values('country').annotate(
             count=Count('id')
-        ).order_by('-count')
+        ).order_by('-count'))
         
         context = {
             'report_type': 'geographic',
@@ -279,14 +320,14 @@ def reports(request):
         
     elif report_type == 'academic':
         # Academic performance report
-        grade_stats = Registration.objects.exclude(grade__isnull=True).values('grade').annotate(
+        grade_stats = list(Registration.objects.exclude(grade__isnull=True).values('grade').annotate(
             count=Count('id')
-        ).order_by('grade')
+        ).order_by('grade'))
         
-        module_performance = Module.objects.annotate(
+        module_performance = list(Module.objects.annotate(
             avg_grade=Avg('registrations__grade'),
             total_students=Count('registrations')
-        ).filter(total_students__gt=0).order_by('-avg_grade')
+        ).filter(total_students__gt=0).order_by('-avg_grade'))
         
         context = {
             'report_type': 'academic',
@@ -297,7 +338,7 @@ def reports(request):
     else:
         context = {'report_type': 'enrollment'}
     
-    return render(request, 'admin/reports.html', context)
+    return context
 
 @staff_member_required
 def api_dashboard(request):
@@ -313,3 +354,9 @@ def api_dashboard(request):
     }
     
     return render(request, 'admin/api_dashboard.html', context)
+
+
+@staff_member_required
+def db_pool_stats(request):
+    """Connection reuse counters for the worker serving this request"""
+    return JsonResponse(db_pool.stats())
@@ -0,0 +1,110 @@
+"""
+Static asset bundles.
+
+Stylesheets and scripts live as plain files under static/css and static/js.
+The ``build_assets`` command concatenates and minifies each bundle into
+static/dist. In production the manifest storage (see config/production.py)
+adds a content hash to every collected file name, so whitenoise can serve the
+bundles with far-future cache headers. With DEBUG on, the ``{% bundle %}`` tag
+links the unminified sources so edits show up without a rebuild.
+"""
+import posixpath
+import re
+
+from django.contrib.staticfiles import finders
+
+DIST_DIR = 'dist'
+
+ADMIN_PAGES = ('api_dashboard', 'audit_logs', 'bulk_operations', 'csv_import', 'dashboard', 'reports')
+
+# Bundle name -> source files (static paths), in cascade/execution order
+BUNDLES = {
+    'css/skylark.css': ['css/base.css', 'css/site.css'],
+    'css/pages/home.css': ['css/pages/home.css'],
+    'css/pages/courses.css': ['css/pages/courses.css'],
+    'css/pages/course_detail.css': ['css/pages/course_detail.css'],
+    'css/pages/password_reset.css': ['css/pages/password_reset.css'],
+    **{f'css/admin/{page}.css': [f'css/admin/{page}.css'] for page in ADMIN_PAGES},
+    **{f'js/admin/{page}.js': [f'js/admin/{page}.js'] for page in ADMIN_PAGES},
+}
+
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+CSS_URL = re.compile(r'url\(\s*([\'"]?)(.*?)\1\s*\)')
+EXTERNAL_URL = ('http:', 'https:', '//', 'data:', '#', '/')
+
+
+class AssetError(Exception):
+    pass
+
+
+def sources(name):
+    try:
+        return BUNDLES[name]
+    except KeyError:
+        raise AssetError(f"Unknown asset bundle '{name}'")
+
+
+def output_path(name) -> str:
+    """Static path of a built bundle: css/skylark.css -> dist/css/skylark.min.css"""
+    root, ext = posixpath.splitext(name)
+    return f'{DIST_DIR}/{root}.min{ext}'
+
+
+def minify_css(text) -> str:
+    text = CSS_COMMENT.sub('', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}').strip() + '\n'
+
+
+def minify_js(text) -> str:
+    """Drop indentation, blank lines and comment-only lines.
+
+    Line breaks are kept so automatic semicolon insertion behaves exactly as
+    in the source; template literals are copied untouched.
+    """
+    lines = []
+    in_template = False
+    for line in text.splitlines():
+        if not in_template:
+            line = line.strip()
+            if not line or line.startswith('//'):
+                continue
+        lines.append(line)
+        if line.count('`') % 2:
+            in_template = not in_template
+    return '\n'.join(lines) + '\n'
+
+
+def rewrite_css_urls(text, source, output) -> str:
+    """Point relative url() references at the same files from the bundle's location"""
+    def replace(match):
+        quote, url = match.groups()
+        if url.startswith(EXTERNAL_URL):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(source), url))
+        if finders.find(re.split(r'[?#]', target)[0]) is None:
+            raise AssetError(f"{source}: url({url}) does not resolve to a static file")
+        return f'url({quote}{posixpath.relpath(target, posixpath.dirname(output))}{quote})'
+
+    return CSS_URL.sub(replace, text)
+
+
+def build(name):
+    """Return (source bytes, minified contents) for a bundle; raises AssetError on missing references"""
+    output = output_path(name)
+    parts = []
+    for source in sources(name):
+        path = finders.find(source)
+        if path is None:
+            raise AssetError(f"{name}: source '{source}' not found")
+        with open(path, encoding='utf-8') as f:
+            parts.append(f.read())
+        if name.endswith('.css'):
+            parts[-1] = rewrite_css_urls(parts[-1], source, output)
+
+    source_size = sum(len(part.encode()) for part in parts)
+    if name.endswith('.css'):
+        return source_size, minify_css('\n'.join(parts))
+    return source_size, minify_js(';\n'.join(parts))
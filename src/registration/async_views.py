@@ -0,0 +1,184 @@
+"""
+Async (ASGI) variants of the read-only catalog views.
+
+These mirror ``home``, ``courses``, ``course_detail``, ``modules``,
+``module_detail``, ``api_modules`` and the availability stream in views.py
+using Django's async ORM, so a request waiting on the database does not hold
+a worker thread. Everything a template needs is loaded before rendering,
+because lazy queries cannot run inside the event loop. Enabled with
+ASYNC_CATALOG_VIEWS (see registration/urls.py and config/gunicorn_asgi.py).
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db.models import Count, Q
+from django.http import JsonResponse
+from django.shortcuts import aget_object_or_404, render
+
+from . import availability
+from .forms import ModuleSearchForm
+from .models import Course, Module, Registration, Student, User
+from .routers import replica_reads
+from .singleflight import make_key, single_flight
+from .terms import current_term
+from .versioning import CATALOG
+from .views import (
+    MODULE_CARD_FIELDS, can_register_for, enrolled_students, filter_modules, module_api_data, restrict_to_course,
+    with_seat_counts,
+)
+
+
+async def _load_user(request):
+    """Resolve the user and student profile so templates and student_context never hit the DB"""
+    user = await request.auser()
+    profile = User._meta.get_field('student_profile')
+    # The cached auth backend usually attaches the profile already
+    if user.is_authenticated and not profile.is_cached(user):
+        student = await Student.objects.select_related('course').filter(user_id=user.pk).afirst()
+        # Cache the reverse one-to-one, including "no profile" (None)
+        profile.set_cached_value(user, student)
+    # The auth context processor reads request.user, which is resolved separately
+    request.user = user
+    return user
+
+
+async def _apaginate(queryset, per_page, page_number):
+    """Async counterpart of Paginator.get_page for querysets"""
+    paginator = Paginator(queryset, per_page)
+    # Prime the cached count so the paginator does not count synchronously
+    paginator.count = await queryset.acount()
+    page = paginator.get_page(page_number)
+    page.object_list = [obj async for obj in page.object_list]
+    return page
+
+
+@replica_reads
+async def home(request):
+    """Home page with featured modules"""
+    await _load_user(request)
+    featured_modules = [m async for m in Module.objects.filter(availability=True).only(*MODULE_CARD_FIELDS)[:6]]
+    context = {
+        'featured_modules': featured_modules,
+    }
+    return render(request, 'registration/home.html', context)
+
+
+@replica_reads
+async def courses(request):
+    """Display all available courses"""
+    await _load_user(request)
+    courses_list = Course.objects.filter(is_active=True).annotate(student_count=Count('students'))
+    context = {
+        'courses': [course async for course in courses_list],
+    }
+    return render(request, 'registration/courses.html', context)
+
+
+@replica_reads
+async def course_detail(request, course_code):
+    """Display detailed information about a specific course"""
+    await _load_user(request)
+    course = await aget_object_or_404(Course, code=course_code, is_active=True)
+
+    modules = Module.objects.filter(
+        Q(courses=course) | Q(courses__isnull=True),
+        availability=True
+    ).only(*MODULE_CARD_FIELDS)
+    students = enrolled_students(course)
+
+    context = {
+        'course': course,
+        'modules': [module async for module in modules],
+        'students': [student async for student in students],
+        'enrolled_count': await course.students.acount(),
+    }
+    return render(request, 'registration/course_detail.html', context)
+
+
+@login_required
+@replica_reads
+async def modules(request):
+    """Modules listing with search and pagination"""
+    await _load_user(request)
+    modules_list = Module.objects.filter(availability=True).only(*MODULE_CARD_FIELDS)
+
+    search_form = ModuleSearchForm(request.GET)
+    # Validating the course choice reads the choice cache (a query on a miss), so keep it off the event loop
+    if await sync_to_async(search_form.is_valid)():
+        modules_list = filter_modules(modules_list, search_form.cleaned_data)
+
+    student = request.student_context.student
+    if student and student.course:
+        modules_list = restrict_to_course(modules_list, student.course)
+
+    term = await sync_to_async(current_term)()
+    modules_page = await _apaginate(with_seat_counts(modules_list, term), 10, request.GET.get('page'))
+
+    registered_modules = set()
+    if student:
+        registered_modules = {
+            module_id async for module_id in
+            Registration.objects.filter(student=student, term=term).values_list('module_id', flat=True)
+        }
+    for module in modules_page:
+        module.seats_left = max(0, module.courses_allowed - module.registered_count)
+        module.is_registered = module.id in registered_modules
+        module.can_register = bool(student and student.course is not None)
+
+    context = {
+        'modules': modules_page,
+        'search_form': search_form,
+        'live_availability': True,
+    }
+    return render(request, 'registration/modules.html', context)
+
+
+@replica_reads
+async def module_detail(request, module_code):
+    """Module detail page showing module info and registered students"""
+    await _load_user(request)
+    module = await aget_object_or_404(Module, code=module_code)
+
+    term = await sync_to_async(current_term)()
+    registrations = [
+        registration async for registration in
+        Registration.objects.filter(module=module, term=term, status='A').select_related('student__user')
+    ]
+    allowed_courses = [course async for course in module.courses.all()]
+
+    is_registered = False
+    can_register = False
+    student = request.student_context.student
+    if student:
+        is_registered = await Registration.objects.filter(student=student, module=module, term=term).aexists()
+        if student.course:
+            module_courses = [course.id for course in allowed_courses]
+            can_register = can_register_for(module, module_courses, student, is_registered)
+
+    context = {
+        'module': module,
+        'registrations': registrations,
+        'registered_count': len(registrations),
+        'allowed_courses': allowed_courses,
+        'is_registered': is_registered,
+        'can_register': can_register,
+        'available_slots': module.courses_allowed - len(registrations),
+        'live_availability': True,
+    }
+    return render(request, 'registration/module_detail.html', context)
+
+
+@replica_reads
+async def api_modules(request):
+    """API endpoint for modules"""
+    def shared_data():
+        key = make_key('api_modules', depends_on=(CATALOG,))
+        return single_flight.do(key, module_api_data)
+
+    # Coalesced with concurrent identical requests; waiting must stay off the event loop
+    return JsonResponse({'modules': await sync_to_async(shared_data)()})
+
+
+async def module_availability_stream(request):
+    """Server-Sent Events stream of live module seat availability"""
+    return availability.sse_response(availability.astream(availability.requested_modules(request)))
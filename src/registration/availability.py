@@ -0,0 +1,222 @@
+"""
+Live module seat availability pushed to browsers with Server-Sent Events.
+
+Registration and module writes publish a small availability event. The event
+is built with one COUNT query per write, never per client. Each worker process
+owns one broadcaster that fans events out to all of its connected streams.
+Events are also appended to a short log in the Django cache. One pump thread
+per worker polls that log so streams served by other workers see them too.
+Each tenant has its own broadcaster and event log (registration/tenants.py).
+
+Streams are only served by the async views (ASYNC_CATALOG_VIEWS): under WSGI
+each open page would hold a worker thread for the stream's whole lifetime.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import StreamingHttpResponse
+
+from .models import Module, Registration, current_term_id
+from .tenants import current_tenant, use_tenant
+
+logger = logging.getLogger(__name__)
+
+EVENT_TTL = 60  # Seconds an event stays in the cross-worker log
+POLL_INTERVAL = 1.0  # Seconds between cross-worker log polls
+QUEUE_SIZE = 100  # Events buffered per stream before new ones are dropped
+STREAM_HEARTBEAT = 15  # Seconds between keep-alive comments
+STREAM_LIFETIME = 300  # Seconds before a stream closes; EventSource reconnects
+SEQ_KEY = 'availability:seq'
+
+
+def module_availability(module_ids):
+    """Build availability events for the given modules with a single query"""
+    term_id = current_term_id()
+    rows = Module.objects.filter(pk__in=module_ids).annotate(
+        registered=Count('registrations', filter=Q(registrations__status='A', registrations__term_id=term_id))
+    ).values('code', 'courses_allowed', 'availability', 'registered')
+    return [
+        {
+            'module': row['code'],
+            'registered': row['registered'],
+            'capacity': row['courses_allowed'],
+            'available': max(0, row['courses_allowed'] - row['registered']),
+            'open': row['availability'],
+        }
+        for row in rows
+    ]
+
+
+class AvailabilityBroadcaster:
+    """Fans a tenant's availability events out to its streams connected to this worker"""
+
+    def __init__(self, tenant):
+        self.tenant = tenant
+        self.origin = uuid.uuid4().hex
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._pump = None
+        self._last_seq = None
+
+    def asubscribe(self):
+        """Register a stream served by the running event loop; returns an asyncio.Queue"""
+        loop = asyncio.get_running_loop()
+        q = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+        def put(event):
+            loop.call_soon_threadsafe(self._put_async, q, event)
+
+        self._add(q, put)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.pop(q, None)
+
+    def publish(self, events):
+        """Deliver events locally and append them to the cross-worker log"""
+        for event in events:
+            cache.add(SEQ_KEY, 0)
+            try:
+                seq = cache.incr(SEQ_KEY)
+            except ValueError:
+                # The counter was evicted between add() and incr()
+                cache.set(SEQ_KEY, 1)
+                seq = 1
+            cache.set(f'availability:event:{seq}', {'origin': self.origin, 'event': event}, EVENT_TTL)
+            self._deliver(event)
+
+    def _add(self, q, put):
+        with self._lock:
+            self._subscribers[q] = put
+            if self._pump is None or not self._pump.is_alive():
+                self._last_seq = cache.get(SEQ_KEY, 0)
+                self._pump = threading.Thread(target=self._poll, name='availability-pump', daemon=True)
+                self._pump.start()
+
+    @staticmethod
+    def _put_async(q, event):
+        try:
+            q.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    def _deliver(self, event):
+        with self._lock:
+            puts = list(self._subscribers.values())
+        for put in puts:
+            try:
+                put(event)
+            except RuntimeError:
+                # Slow consumer or closed event loop; the stream catches up on reconnect
+                pass
+
+    def _poll(self):
+        """Relay events published by other workers while anyone is listening"""
+        with use_tenant(self.tenant):
+            self._relay()
+
+    def _relay(self):
+        while True:
+            time.sleep(POLL_INTERVAL)
+            with self._lock:
+                if not self._subscribers:
+                    self._pump = None
+                    return
+            seq = cache.get(SEQ_KEY, 0)
+            if seq < self._last_seq:
+                # Counter reset (cache flush or eviction)
+                self._last_seq = seq
+            if seq == self._last_seq:
+                continue
+            keys = [f'availability:event:{n}' for n in range(self._last_seq + 1, seq + 1)]
+            self._last_seq = seq
+            for key, entry in sorted(cache.get_many(keys).items(), key=lambda item: int(item[0].rsplit(':', 1)[1])):
+                if entry['origin'] != self.origin:
+                    self._deliver(entry['event'])
+
+
+_broadcasters = {}  # tenant name -> AvailabilityBroadcaster
+_broadcasters_lock = threading.Lock()
+
+
+def get_broadcaster() -> AvailabilityBroadcaster:
+    """This worker's broadcaster for the current tenant"""
+    tenant = current_tenant()
+    with _broadcasters_lock:
+        if tenant.name not in _broadcasters:
+            _broadcasters[tenant.name] = AvailabilityBroadcaster(tenant)
+        return _broadcasters[tenant.name]
+
+
+def publish_modules(module_ids):
+    """Publish availability for modules once the current transaction commits"""
+    module_ids = set(module_ids)
+    if not module_ids:
+        return
+
+    def send():
+        try:
+            get_broadcaster().publish(module_availability(module_ids))
+        except Exception as e:
+            # Live updates are best-effort and must never break a write
+            logger.error(f"[AVAILABILITY] Failed to publish for modules {sorted(module_ids)}: {e}")
+
+    transaction.on_commit(send, using=router.db_for_write(Registration))
+
+
+def format_event(event) -> str:
+    return f"event: availability\ndata: {json.dumps(event)}\n\n"
+
+
+async def astream(wanted=None):
+    """Event stream for an event-loop-served (ASGI) response"""
+    broadcaster = get_broadcaster()
+    q = broadcaster.asubscribe()
+    try:
+        yield 'retry: 3000\n\n'
+        deadline = time.monotonic() + STREAM_LIFETIME
+        while time.monotonic() < deadline:
+            try:
+                event = await asyncio.wait_for(q.get(), timeout=STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            if not wanted or event['module'] in wanted:
+                yield format_event(event)
+    finally:
+        broadcaster.unsubscribe(q)
+
+
+def sse_response(events) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop reverse proxies (nginx) from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def requested_modules(request):
+    """Module codes from ?modules=CS101,CS201 (empty means all modules)"""
+    return {code for code in request.GET.get('modules', '').split(',') if code}
+
+
+@receiver(post_save, sender=Registration)
+@receiver(post_delete, sender=Registration)
+def registration_changed(sender, instance, **kwargs):
+    publish_modules([instance.module_id])
+
+
+@receiver(post_save, sender=Module)
+def module_changed(sender, instance, created, **kwargs):
+    if not created:
+        publish_modules([instance.pk])
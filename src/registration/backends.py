@@ -0,0 +1,95 @@
+"""
+Authentication backend that caches the request principal across requests.
+
+AuthenticationMiddleware asks the backend for the logged-in user on every
+request. CachedModelBackend answers from the Django cache with the user, its
+student profile and course already attached, plus the user's group names in
+``user.group_names``. Cache keys embed the user's version stamp and the
+group and catalog versions (see versioning.py). Any save of the user, its
+student profile, its group memberships, a group or a course invalidates the
+entry at once. The TTL only bounds memory.
+
+Permission sets are cached the same way, keyed on the user's version and
+the group and permissions versions. They are attached to the user object in
+the attributes ModelBackend uses for its per-object cache, so every
+has_perm / has_module_perms check in a request (admin changelists, staff
+views) and both configured backends read them without a query.
+
+Version stamps only invalidate entries for processes that share the cache,
+so the backend needs a cache every worker sees. With a per-process cache a
+revoked permission would still be granted by the other workers until the
+TTL ran out, so the check (registration.E002) is repeated when the backend
+is loaded: gunicorn never runs system checks.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core import checks
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+from .models import User
+from .versioning import CATALOG, GROUPS, PERMISSIONS, get_versions, per_process_cache, user_version
+
+PRINCIPAL_TTL = 3600  # Seconds; invalidation is by version, not by expiry
+
+
+def versioned_key(prefix, user_id, *names) -> str:
+    versions = get_versions(user_version(user_id), *names)
+    return f"{prefix}:{user_id}:{':'.join(str(versions[name]) for name in sorted(versions))}"
+
+
+def principal_key(user_id) -> str:
+    return versioned_key('principal', user_id, GROUPS, CATALOG)
+
+
+def permissions_key(user_id) -> str:
+    return versioned_key('perms', user_id, GROUPS, PERMISSIONS)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if 'registration.backends.CachedModelBackend' not in settings.AUTHENTICATION_BACKENDS or not per_process_cache():
+        return []
+    return [checks.Error(
+        'CachedModelBackend needs a cache shared by all worker processes',
+        hint='Point CACHE_BACKEND at a shared cache such as Redis, or remove the backend from AUTHENTICATION_BACKENDS.',
+        id='registration.E002',
+    )]
+
+
+def load_principal(user_id):
+    """Load a user with student profile, course and group names in two queries"""
+    user = User._default_manager.select_related('student_profile__course').filter(pk=user_id).first()
+    if user is not None:
+        user.group_names = list(user.groups.values_list('name', flat=True))
+    return user
+
+
+class CachedModelBackend(ModelBackend):
+    def __init__(self):
+        super().__init__()
+        if per_process_cache():
+            raise ImproperlyConfigured(
+                'CachedModelBackend needs a cache shared by all worker processes (see registration.E002)'
+            )
+
+    def get_user(self, user_id):
+        key = principal_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = load_principal(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, PRINCIPAL_TTL)
+        return user if self.user_can_authenticate(user) else None
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if user_obj.is_active and not user_obj.is_anonymous and obj is None and not hasattr(user_obj, '_perm_cache'):
+            key = permissions_key(user_obj.pk)
+            cached = cache.get(key)
+            if cached is None:
+                super().get_all_permissions(user_obj)
+                cache.set(key, (user_obj._user_perm_cache, user_obj._group_perm_cache, user_obj._perm_cache), PRINCIPAL_TTL)
+            else:
+                user_obj._user_perm_cache, user_obj._group_perm_cache, user_obj._perm_cache = cached
+        return super().get_all_permissions(user_obj, obj)
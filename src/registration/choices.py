@@ -0,0 +1,141 @@
+"""
+Cached choices for model choice fields.
+
+A ChoiceProvider caches the rows behind a ModelChoiceField's queryset (the
+primary key plus the fields the option label needs), keyed on data versions
+(see versioning.py). CachedModelChoiceField renders its ``<option>`` list
+from those rows and validates a submitted value against the cached ids. It
+returns an instance built from the cached row, with the remaining fields
+deferred. Rendering or validating the field runs no query while the cache
+is warm.
+
+A per-process cache never sees the version bumps of other workers, so then
+the rows skip the cache and are read once per request instead.
+"""
+from django import forms
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.signals import request_started
+from django.dispatch import receiver
+
+from .models import Course
+from .routers import use_primary
+from .tenants import current_tenant
+from .versioning import CATALOG, get_versions, per_process_cache
+
+# Every provider, so their rows can be forgotten at the start of a request
+_providers = []
+
+
+class ChoiceProvider:
+    def __init__(self, name, queryset, fields, depends_on):
+        self.name = name
+        self.queryset = queryset
+        # from_db() takes values in model field order
+        order = [field.attname for field in queryset.model._meta.concrete_fields]
+        self.fields = tuple(sorted(fields, key=order.index))
+        self.depends_on = tuple(depends_on)
+        # Tenant name -> (cache key, rows, row by pk) last seen by this process
+        self._loaded = {}
+        _providers.append(self)
+
+    @property
+    def model(self):
+        return self.queryset.model
+
+    def _key(self) -> str:
+        versions = get_versions(*self.depends_on)
+        return f"choices:{self.name}:{':'.join(str(versions[name]) for name in self.depends_on)}"
+
+    def _load(self):
+        tenant = current_tenant().name
+        key = self._key()
+        loaded = self._loaded.get(tenant)
+        if loaded is None or loaded[0] != key:
+            shared = not per_process_cache()
+            rows = cache.get(key) if shared else None
+            if rows is None:
+                # Cached with no expiry: never fill it from a lagging replica
+                with use_primary():
+                    rows = list(self.queryset.values_list('pk', *self.fields))
+                if shared:
+                    cache.set(key, rows, None)
+            loaded = self._loaded[tenant] = (key, rows, {row[0]: row for row in rows})
+        return loaded
+
+    def rows(self) -> list:
+        """``(pk, *fields)`` tuples in queryset order"""
+        return self._load()[1]
+
+    def instance(self, row):
+        """A model instance from a cached row; other fields load on access"""
+        return self.model.from_db(self.queryset.db, (self.model._meta.pk.attname, *self.fields), row)
+
+    def get(self, pk):
+        """The choice with primary key ``pk``, or None"""
+        row = self._load()[2].get(pk)
+        return self.instance(row) if row is not None else None
+
+
+@receiver(request_started)
+def forget_choices(sender, **kwargs):
+    if per_process_cache():
+        for provider in _providers:
+            provider._loaded.clear()
+
+
+class CachedModelChoiceIterator(forms.models.ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        provider = self.field.provider
+        for row in provider.rows():
+            yield (row[0], self.field.label_from_instance(provider.instance(row)))
+
+    def __len__(self):
+        return len(self.field.provider.rows()) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.provider.rows())
+
+
+class CachedModelChoiceField(forms.ModelChoiceField):
+    iterator = CachedModelChoiceIterator
+
+    def __init__(self, provider, **kwargs):
+        kwargs.pop('queryset', None)
+        self.provider = provider
+        super().__init__(provider.queryset, **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.provider.model):
+            value = value.pk
+        try:
+            pk = self.provider.model._meta.pk.to_python(value)
+        except ValidationError:
+            pk = None
+        choice = self.provider.get(pk) if pk is not None else None
+        if choice is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return choice
+
+    @classmethod
+    def replacing(cls, field, provider, **kwargs):
+        """A cached copy of a form's generated model choice field"""
+        options = {
+            'required': field.required, 'label': field.label, 'help_text': field.help_text,
+            'widget': field.widget, 'empty_label': field.empty_label,
+        }
+        options.update(kwargs)
+        return cls(provider, **options)
+
+
+ACTIVE_COURSES = ChoiceProvider(
+    'active-courses', Course.objects.filter(is_active=True), fields=('code', 'name'), depends_on=(CATALOG,),
+)
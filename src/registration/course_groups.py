@@ -0,0 +1,116 @@
+"""
+Course group membership.
+
+Every course has one Django group, ``Course_<code>`` (Course.get_group_name).
+A student belongs to exactly the group of their current course. Memberships
+change only when a student's course changes (Student.save) or the student is
+deleted, and each change is a single DELETE and INSERT on the user/group
+through table. Group ids for all courses are cached, keyed on the catalog
+and group versions, so a profile save that keeps the course runs no group
+queries at all. A per-process cache never sees the bumps of other workers,
+so then the ids are read from the database on every call instead.
+
+The through table is written directly, which bypasses m2m_changed, so the
+affected users' versions are bumped here. ``manage.py sync_course_groups``
+reconciles every student in bulk, e.g. after queryset.update(course=...).
+"""
+import logging
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Course, Student, User
+from .versioning import CATALOG, GROUPS, bump_user_versions, bump_version, get_versions, per_process_cache
+
+logger = logging.getLogger(__name__)
+
+Membership = User.groups.through
+
+
+def course_group_ids() -> dict:
+    """Group id by course id for every course, creating missing groups"""
+    key = 'course-groups:' + ':'.join(str(v) for v in get_versions(CATALOG, GROUPS).values())
+    shared = not per_process_cache()
+    group_ids = cache.get(key) if shared else None
+    if group_ids is None:
+        names = {course.pk: course.get_group_name() for course in Course.objects.only('pk', 'code')}
+        existing = dict(Group.objects.filter(name__in=names.values()).values_list('name', 'pk'))
+        missing = [Group(name=name) for name in names.values() if name not in existing]
+        if missing:
+            Group.objects.bulk_create(missing, ignore_conflicts=True)
+            existing = dict(Group.objects.filter(name__in=names.values()).values_list('name', 'pk'))
+            logger.info(f"[GROUPS] Created {len(missing)} course groups")
+        group_ids = {course_id: existing[name] for course_id, name in names.items()}
+        if shared:
+            cache.set(key, group_ids, None)
+    return group_ids
+
+
+def move_student(user_id, course_id):
+    """Make ``course_id``'s group the user's only course group"""
+    group_ids = course_group_ids()
+    target = group_ids.get(course_id)
+    with transaction.atomic(using=router.db_for_write(Membership)):
+        Membership.objects.filter(
+            user_id=user_id, group_id__in=[g for g in group_ids.values() if g != target],
+        ).delete()
+        if target is not None:
+            Membership.objects.bulk_create([Membership(user_id=user_id, group_id=target)], ignore_conflicts=True)
+    bump_user_versions([user_id])
+
+
+def sync_all(batch_size=1000, dry_run=False):
+    """Reconcile every course group with the students' courses; returns (added, removed)"""
+    group_ids = course_group_ids()
+    desired = {
+        (user_id, group_ids[course_id])
+        for user_id, course_id in Student.objects.filter(course__isnull=False).values_list('user_id', 'course_id')
+        if course_id in group_ids
+    }
+    current = set(
+        Membership.objects.filter(group_id__in=group_ids.values()).values_list('user_id', 'group_id')
+    )
+    to_add = sorted(desired - current)
+    to_remove = sorted(current - desired)
+    if dry_run:
+        return len(to_add), len(to_remove)
+
+    with transaction.atomic(using=router.db_for_write(Membership)):
+        Membership.objects.bulk_create(
+            [Membership(user_id=user_id, group_id=group_id) for user_id, group_id in to_add],
+            batch_size=batch_size, ignore_conflicts=True,
+        )
+        by_group = {}
+        for user_id, group_id in to_remove:
+            by_group.setdefault(group_id, []).append(user_id)
+        for group_id, user_ids in by_group.items():
+            for start in range(0, len(user_ids), batch_size):
+                Membership.objects.filter(group_id=group_id, user_id__in=user_ids[start:start + batch_size]).delete()
+    bump_user_versions({user_id for user_id, _ in to_add + to_remove})
+    return len(to_add), len(to_remove)
+
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    if instance.course_id is not None:
+        move_student(instance.user_id, None)
+
+
+@receiver(post_delete, sender=Course)
+def course_deleted(sender, instance, **kwargs):
+    # Bumps GROUPS through the Group delete receivers
+    Group.objects.filter(name=instance.get_group_name()).delete()
+
+
+@receiver(pre_save, sender=Course)
+def course_renamed(sender, instance, raw=False, **kwargs):
+    """Keep the course's group (and its members) when the course code changes"""
+    if raw or instance.pk is None:
+        return
+    old_code = Course.objects.filter(pk=instance.pk).values_list('code', flat=True).first()
+    if old_code is not None and old_code != instance.code:
+        Group.objects.filter(name=Course(code=old_code).get_group_name()).update(name=instance.get_group_name())
+        bump_version(GROUPS)
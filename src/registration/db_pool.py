@@ -0,0 +1,94 @@
+"""
+Database connection reuse and pool metrics.
+
+Connections are persistent (CONN_MAX_AGE) with health checks, so each
+worker thread opens its connection once and reuses it across requests;
+MySQL's init_command runs once per connection instead of once per request.
+Postgres deployments can instead use psycopg's own pool (DB_POOL=true, see
+config/production.py), bounded at DB_POOL_MAX_SIZE connections per worker.
+
+The counters below are per worker process:
+- connects: connections opened;
+- reconnects: connections opened by a thread that already had one (expired
+  by CONN_MAX_AGE, or dropped by a failed health check);
+- checkouts: requests that used a database connection;
+- reused: checkouts served by a connection opened in an earlier request.
+With psycopg's pool its own statistics (waits, wait time, lost connections)
+are included per alias.
+"""
+import os
+import threading
+
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_lock = threading.Lock()
+_local = threading.local()
+_counters = {'connects': 0, 'reconnects': 0, 'checkouts': 0, 'reused': 0}
+
+
+def _count(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def _mark_used(execute, sql, params, many, context):
+    used = getattr(_local, 'used', None)
+    if used is not None:
+        used.add(context['connection'].alias)
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    _count('connects')
+    seen = getattr(_local, 'aliases', None)
+    if seen is None:
+        seen = _local.aliases = set()
+    if connection.alias in seen:
+        _count('reconnects')
+    seen.add(connection.alias)
+    opened = getattr(_local, 'opened', None)
+    if opened is not None:
+        opened.add(connection.alias)
+    # The wrapper object outlives its connections, so install the hook once
+    if _mark_used not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_mark_used)
+
+
+@receiver(request_started)
+def request_began(sender, **kwargs):
+    _local.used = set()
+    _local.opened = set()
+
+
+@receiver(request_finished)
+def request_ended(sender, **kwargs):
+    used = getattr(_local, 'used', None)
+    if used:
+        _count('checkouts', len(used))
+        _count('reused', len(used - _local.opened))
+    _local.used = _local.opened = None
+
+
+def stats() -> dict:
+    """This worker's connection counters plus psycopg pool statistics"""
+    with _lock:
+        result = {'pid': os.getpid(), **_counters}
+    pools = {}
+    for conn in connections.all(initialized_only=True):
+        pool = getattr(conn, 'pool', None)
+        if pool is not None:
+            pools[conn.alias] = pool.get_stats()
+    result['pools'] = pools
+    result['settings'] = {
+        conn.alias: {
+            'conn_max_age': conn.settings_dict['CONN_MAX_AGE'],
+            'health_checks': conn.settings_dict['CONN_HEALTH_CHECKS'],
+            'pool': conn.settings_dict['OPTIONS'].get('pool', False),
+        }
+        for conn in connections.all()
+    }
+    return result
@@ -0,0 +1,14 @@
+"""
+Low-write sessions kept in django_session only.
+
+The session engine for a per-process cache: the same save stamping as
+registration.sessions, without the cached copy each worker would otherwise
+keep after another worker logged the session out (see sessions.py).
+"""
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+from .sessions import RefreshStampMixin
+
+
+class SessionStore(RefreshStampMixin, DBStore):
+    pass
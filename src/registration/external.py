@@ -0,0 +1,214 @@
+"""
+Client for fetching data from external HTTP APIs.
+
+All outbound calls share one pooled ``requests.Session`` per process and are
+bounded by connect/read timeouts. Responses are cached in the Django cache
+with stale-while-revalidate semantics, and a circuit breaker stops calling an
+upstream that keeps failing, serving the last cached value instead.
+
+The base URL and every limit come from ``settings.EXTERNAL_DATA`` (or the
+constructor), so the client can be pointed at a local stub server.
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.cache import cache
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BASE_URL': 'https://jsonplaceholder.typicode.com',
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 5.0,
+    'POOL_MAXSIZE': 10,
+    'CACHE_TTL': 60,
+    'STALE_WHILE_REVALIDATE': 300,
+    'STALE_IF_ERROR': 86400,
+    'FAILURE_THRESHOLD': 5,
+    'RECOVERY_TIMEOUT': 30,
+    'CACHE_PREFIX': 'external-data',
+}
+
+
+class ExternalDataError(Exception):
+    """Raised when the upstream fails and no cached value can be served"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker shared by all threads of a worker"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold, recovery_timeout):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Return True if a call to the upstream may be attempted now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                # Let exactly one probe through; everyone else keeps failing fast
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"[EXTERNAL] Circuit opened after {self.failures} failure(s)")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class ExternalDataClient:
+    """Pooled, cached and time-bounded JSON client for one upstream"""
+
+    def __init__(self, base_url=None, **options):
+        conf = {**DEFAULTS, **getattr(settings, 'EXTERNAL_DATA', {}), **options}
+        self.base_url = (base_url or conf['BASE_URL']).rstrip('/')
+        self.timeout = (conf['CONNECT_TIMEOUT'], conf['READ_TIMEOUT'])
+        self.pool_maxsize = conf['POOL_MAXSIZE']
+        self.cache_ttl = conf['CACHE_TTL']
+        self.stale_while_revalidate = conf['STALE_WHILE_REVALIDATE']
+        self.stale_if_error = conf['STALE_IF_ERROR']
+        self.cache_prefix = conf['CACHE_PREFIX']
+        self.breaker = CircuitBreaker(conf['FAILURE_THRESHOLD'], conf['RECOVERY_TIMEOUT'])
+        self._session = None
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    @property
+    def session(self) -> 'requests.Session':
+        """Lazily build the pooled session (one per client, reused across requests)"""
+        if self._session is None:
+            # Imported on first use: requests is slow to import and most workers never call out
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # No transparent retries: a failing upstream must trip the breaker quickly
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def get_json(self, path, params=None):
+        """Return decoded JSON for ``path``, from cache when fresh enough"""
+        key = self._cache_key(path, params)
+        entry = cache.get(key)
+        age = time.time() - entry['fetched_at'] if entry else None
+
+        if entry and age < self.cache_ttl:
+            return entry['data']
+
+        if entry and age < self.cache_ttl + self.stale_while_revalidate:
+            self._refresh_in_background(key, path, params)
+            return entry['data']
+
+        try:
+            return self._fetch_and_store(key, path, params)
+        except ExternalDataError:
+            if entry:
+                logger.warning(f"[EXTERNAL] Serving cached {path} ({int(age)}s old) while upstream is failing")
+                return entry['data']
+            raise
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _cache_key(self, path, params) -> str:
+        raw = json.dumps([self.base_url, path, params or {}], sort_keys=True)
+        return f"{self.cache_prefix}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+    def _fetch_and_store(self, key, path, params):
+        if not self.breaker.allow_request():
+            raise ExternalDataError(f"Circuit open for {self.base_url}")
+
+        import requests
+
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        succeeded = False
+        try:
+            response = self.session.get(url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            succeeded = True
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"[EXTERNAL] GET {url} failed: {e}")
+            raise ExternalDataError(str(e)) from e
+        finally:
+            # Any outcome, including an unexpected exception, settles a half-open probe
+            if succeeded:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+        cache.set(
+            key,
+            {'data': data, 'fetched_at': time.time()},
+            self.cache_ttl + max(self.stale_while_revalidate, self.stale_if_error),
+        )
+        return data
+
+    def _refresh_in_background(self, key, path, params):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._fetch_and_store(key, path, params)
+            except ExternalDataError:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        # Copy the context so the refresh stores under the requesting tenant's cache keys
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(refresh,), name='external-data-refresh', daemon=True).start()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ExternalDataClient:
+    """Return the process-wide client configured from settings"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ExternalDataClient()
+    return _client
@@ -0,0 +1,93 @@
+"""
+Choice columns stored as small integers.
+
+EncodedChoiceField keeps the string codes the code base, the API and CSV
+files use ('A', 'CS', 'UPDATE', ...) as the Python value. In the database it
+stores a fixed small integer per code, so filters, indexes and GROUP BY work
+on 2-byte integers instead of strings. Lookups accept the codes:
+``filter(status='A')`` and ``status__in=['A', 'P']`` keep working unchanged.
+
+The ``encoding`` mapping is the storage format. Never renumber a code; give
+a new choice the next free number (and write a migration).
+
+``get_<field>_display()`` reads a dict built once per field instead of
+rebuilding it from the choices on every call.
+"""
+from functools import partialmethod
+
+from django.core import checks, exceptions
+from django.db import models
+
+
+UNKNOWN = 0  # Stored for no code: encodings start at 1
+
+
+def _display(obj, field):
+    value = getattr(obj, field.attname)
+    return field.labels.get(value, value)
+
+
+class EncodedChoiceField(models.PositiveSmallIntegerField):
+    description = 'Choice code stored as a small integer'
+
+    def __init__(self, *args, encoding, **kwargs):
+        self.encoding = dict(encoding)
+        self.decoding = {number: code for code, number in self.encoding.items()}
+        super().__init__(*args, **kwargs)
+        self.labels = dict(self.flatchoices or ())
+
+    def check(self, **kwargs):
+        errors = super().check(**kwargs)
+        missing = [code for code in self.labels if code not in self.encoding]
+        if missing or len(self.decoding) != len(self.encoding) or UNKNOWN in self.decoding:
+            errors.append(checks.Error(
+                f'Every choice needs its own number, from 1 up, in encoding (missing: {missing})',
+                obj=self, id='registration.E001',
+            ))
+        return errors
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['encoding'] = self.encoding
+        return name, path, args, kwargs
+
+    def contribute_to_class(self, cls, name, *args, **kwargs):
+        overridden = f'get_{name}_display' in cls.__dict__
+        super().contribute_to_class(cls, name, *args, **kwargs)
+        if not overridden:
+            setattr(cls, f'get_{name}_display', partialmethod(_display, field=self))
+
+    @property
+    def validators(self):
+        # The Python value is a code, so the integer range validators do not apply
+        return list(self._validators)
+
+    def get_prep_value(self, value):
+        if isinstance(value, str):
+            # Filtering on a code that does not exist matches nothing, as it
+            # did on the string column
+            return self.encoding.get(value, UNKNOWN)
+        return value
+
+    def get_db_prep_save(self, value, connection):
+        if value is not None and not isinstance(value, models.expressions.Expression):
+            if value not in self.encoding and value not in self.decoding:
+                raise ValueError(f'{self.name!r} has no choice {value!r}')
+        return super().get_db_prep_save(value, connection)
+
+    def from_db_value(self, value, expression, connection):
+        return self.decoding.get(value, value)
+
+    def to_python(self, value):
+        if value is None or value in self.encoding:
+            return value
+        if isinstance(value, int) and value in self.decoding:
+            return self.decoding[value]
+        if isinstance(value, str) and value.isdigit() and int(value) in self.decoding:
+            return self.decoding[int(value)]
+        raise exceptions.ValidationError(
+            self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value},
+        )
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
@@ -2,7 +2,8 @@ from django import forms
 from django.db import models  # type: ignore
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import get_user_model
-from .models import Student, Module, Course
+from .choices import ACTIVE_COURSES, CachedModelChoiceField
+from .models import Student, Module
 from django.core.validators import RegexValidator
 
 # Get the custom user model
@@ -40,9 +41,10 @@ class StudentProfileForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Only show active courses
-        self.fields['course'].queryset = Course.objects.filter(is_active=True)
-        self.fields['course'].empty_label = "Select a course"
+        # Only show active courses (cached choices; see choices.py)
+        self.fields['course'] = CachedModelChoiceField.replacing(
+            self.fields['course'], ACTIVE_COURSES, empty_label="Select a course",
+        )
 
 # [NEW] Personal details update form (excludes course and enrollment)
 class StudentPersonalDetailsForm(forms.ModelForm):
@@ -93,11 +95,10 @@ class StudentRegistrationForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Only show active courses
-        self.fields['course'].queryset = Course.objects.filter(is_active=True)
-        self.fields['course'].empty_label = "Select a course"
-        # Make course required
-        self.fields['course'].required = True
+        # Only show active courses (cached choices; see choices.py)
+        self.fields['course'] = CachedModelChoiceField.replacing(
+            self.fields['course'], ACTIVE_COURSES, empty_label="Select a course", required=True,
+        )
 
 class ContactForm(forms.Form):
     name = forms.CharField(max_length=100, required=True)
@@ -117,8 +118,8 @@ class ContactForm(forms.Form):
 class ModuleSearchForm(forms.Form):
     search = forms.CharField(max_length=100, required=False, widget=forms.TextInput(attrs={'placeholder': 'Search modules...'}))
     category = forms.ChoiceField(choices=[('', 'All Categories')] + Module.CATEGORY_CHOICES, required=False)
-    course = forms.ModelChoiceField(
-        queryset=Course.objects.filter(is_active=True), 
+    course = CachedModelChoiceField(
+        ACTIVE_COURSES,
         required=False, 
         empty_label="All Courses",
         widget=forms.Select(attrs={'class': 'form-select'})
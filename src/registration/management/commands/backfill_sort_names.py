@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from registration.sort_names import backfill
+
+
+class Command(BaseCommand):
+    help = 'Fill or repair Student.sort_name from the users\' names in primary-key chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Students per UPDATE')
+        parser.add_argument('--dry-run', action='store_true', help='Only count stale rows')
+
+    def handle(self, *args, **options):
+        changed = backfill(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = 'Would update' if options['dry_run'] else 'Updated'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {changed} student sort names.'))
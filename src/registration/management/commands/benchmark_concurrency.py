@@ -0,0 +1,120 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f'Server on port {port} did not start within {timeout:.0f}s')
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = 'Compare single-process throughput and latency of the WSGI and ASGI deployments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/courses/', help='Catalog path to request')
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--threads', type=int, default=4, help='Threads for the WSGI gthread worker')
+        parser.add_argument('--wsgi-url', help='Benchmark a running WSGI server instead of spawning one')
+        parser.add_argument('--asgi-url', help='Benchmark a running ASGI server instead of spawning one')
+
+    def handle(self, *args, **options):
+        results = []
+        for label, url in (('WSGI', options['wsgi_url']), ('ASGI', options['asgi_url'])):
+            if url:
+                results.append((label, self.run_load(url, options)))
+                continue
+            port = free_port()
+            process = self.spawn(label, port, options['threads'])
+            try:
+                wait_for_port(port)
+                results.append((label, self.run_load(f"http://127.0.0.1:{port}{options['path']}", options)))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+        self.stdout.write('')
+        self.stdout.write(f"{'Server':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for label, stats in results:
+            self.stdout.write(
+                f"{label:<6} {stats['rps']:>8.1f} {stats['p50']:>8.1f} {stats['p95']:>8.1f} "
+                f"{stats['p99']:>8.1f} {stats['errors']:>7}"
+            )
+        self.stdout.write(self.style.SUCCESS('Both servers ran as a single process; compare req/s and latency at equal concurrency.'))
+
+    def spawn(self, label, port, threads):
+        """Start a one-process gunicorn for the given deployment"""
+        env = os.environ.copy()
+        cmd = [sys.executable, '-m', 'gunicorn', '--workers', '1', '--bind', f'127.0.0.1:{port}', '--log-level', 'warning']
+        if label == 'WSGI':
+            env['ASYNC_CATALOG_VIEWS'] = 'false'
+            cmd += ['--threads', str(threads), 'config.wsgi:application']
+        else:
+            env['ASYNC_CATALOG_VIEWS'] = 'true'
+            cmd += ['--worker-class', 'uvicorn.workers.UvicornWorker', 'config.asgi:application']
+        self.stdout.write(f"Starting {label} server on port {port}...")
+        return subprocess.Popen(cmd, cwd=settings.BASE_DIR, env=env)
+
+    def run_load(self, url, options):
+        self.stdout.write(f"Loading {url} with {options['requests']} requests at concurrency {options['concurrency']}...")
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+
+        def fetch(_):
+            nonlocal errors
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=60) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, OSError):
+                ok = False
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(fetch, range(options['requests'])))
+        total = time.perf_counter() - started
+
+        if not latencies:
+            raise CommandError(f'Every request to {url} failed')
+        return {
+            'rps': len(latencies) / total,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'errors': errors,
+        }
@@ -0,0 +1,160 @@
+import statistics
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, models
+
+from registration.models import Registration
+from registration.tenants import current_tenant
+
+STATUS_FIELD = Registration._meta.get_field('status')
+
+# Status mix of a mature term: mostly approved, some pending and waitlisted
+MIX = [('A', 70), ('P', 15), ('W', 8), ('R', 4), ('D', 3)]
+
+
+def scratch_model(name, status_field):
+    """An unregistered registration-shaped model for a scratch table"""
+    meta = type('Meta', (), {'app_label': 'registration', 'db_table': f'bench_{name}', 'managed': False})
+    attrs = {
+        '__module__': __name__, 'Meta': meta,
+        'student_id': models.IntegerField(), 'module_id': models.IntegerField(), 'status': status_field,
+    }
+    model = type(f'Bench{name.title()}', (models.Model,), attrs)
+    # Keep the throwaway class out of the app registry
+    apps.all_models['registration'].pop(model._meta.model_name, None)
+    apps.clear_cache()
+    return model
+
+
+def scratch_indexes(model):
+    """The registration_module_status and registration_status indexes, added after loading"""
+    table = model._meta.db_table
+    return [
+        models.Index(fields=['module_id', 'status'], name=f'{table}_module_status'),
+        models.Index(fields=['status'], name=f'{table}_status'),
+    ]
+
+
+def status_expression(encoded) -> str:
+    """SQL CASE spreading rows over the statuses in MIX by n % 100, escaped for params"""
+    parts, bound = [], 0
+    for code, share in MIX:
+        bound += share
+        value = STATUS_FIELD.encoding[code] if encoded else f"'{code}'"
+        parts.append(f'WHEN n %% 100 < {bound} THEN {value}')
+    return f"CASE {' '.join(parts)} END"
+
+
+class Command(BaseCommand):
+    help = 'Compare index size and GROUP BY / filter speed of a string and a small-integer status column'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000_000)
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query; the median is reported')
+        parser.add_argument('--modules', type=int, default=500)
+        parser.add_argument('--database', help="Database alias to build the tables in (default: the current tenant's database)")
+
+    def handle(self, *args, **options):
+        self.connection = connections[options['database'] or current_tenant().alias]
+        variants = [
+            ('string', scratch_model('string', models.CharField(max_length=1)), False),
+            ('smallint', scratch_model('smallint', models.PositiveSmallIntegerField()), True),
+        ]
+        results = []
+        try:
+            for label, model, encoded in variants:
+                self.stdout.write(f"Building {options['rows']:,} rows with a {label} status column...")
+                results.append((label, self.measure(model, encoded, options)))
+        finally:
+            with self.connection.schema_editor() as editor:
+                for label, model, encoded in variants:
+                    if model._meta.db_table in self.connection.introspection.table_names():
+                        editor.delete_model(model)
+
+        names = list(results[0][1])
+        self.stdout.write(f"{'':<34}" + ''.join(f'{label:>12}' for label, _ in results))
+        for name in names:
+            self.stdout.write(f'{name:<34}' + ''.join(f'{values[name]:>12.1f}' for _, values in results))
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['rows']:,} rows on {self.connection.vendor}; sizes in KB, times are the median ms of "
+            f"{options['repeat']} runs."
+        ))
+
+    def measure(self, model, encoded, options):
+        table = self.connection.ops.quote_name(model._meta.db_table)
+        with self.connection.schema_editor() as editor:
+            editor.create_model(model)
+        self.fill(table, encoded, options)
+
+        results = {}
+        for index in scratch_indexes(model):
+            before = self.index_size(model, index)
+            with self.connection.schema_editor() as editor:
+                editor.add_index(model, index)
+            results[f"index ({', '.join(index.fields)}) KB"] = (self.index_size(model, index) - before) / 1024
+        self.analyze(table)
+
+        approved = STATUS_FIELD.encoding['A'] if encoded else "'A'"
+        seated = f"{STATUS_FIELD.encoding['A']}, {STATUS_FIELD.encoding['P']}" if encoded else "'A', 'P'"
+        queries = {
+            'GROUP BY status ms': f'SELECT status, COUNT(*) FROM {table} GROUP BY status',
+            'GROUP BY module, status ms': f'SELECT module_id, status, COUNT(*) FROM {table} GROUP BY module_id, status',
+            "COUNT WHERE status = 'A' ms": f'SELECT COUNT(*) FROM {table} WHERE status = {approved}',
+            'seat count of one module ms': f'SELECT COUNT(*) FROM {table} WHERE module_id = 17 AND status IN ({seated})',
+        }
+        with self.connection.cursor() as cursor:
+            for name, sql in queries.items():
+                times = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    cursor.execute(sql)
+                    cursor.fetchall()
+                    times.append((time.perf_counter() - started) * 1000)
+                results[name] = statistics.median(times)
+        return results
+
+    def fill(self, table, encoded, options):
+        rows, status = options['rows'], status_expression(encoded)
+        columns = f'{table} (student_id, module_id, status)'
+        select = f"SELECT n %% 50000 + 1, n %% {options['modules']} + 1, {status}"
+        with self.connection.cursor() as cursor:
+            if self.connection.vendor == 'postgresql':
+                cursor.execute(f'INSERT INTO {columns} {select} FROM generate_series(1, %s) AS seq(n)', [rows])
+                return
+            if self.connection.vendor == 'mysql':
+                cursor.execute('SET SESSION cte_max_recursion_depth = %s', [rows + 1])
+            elif self.connection.vendor != 'sqlite':
+                raise CommandError(f'No row generator for the {self.connection.vendor} backend')
+            cursor.execute(
+                f'INSERT INTO {columns} WITH RECURSIVE seq (n) AS '
+                f'(SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s) {select} FROM seq',
+                [rows],
+            )
+
+    def index_size(self, model, index) -> int:
+        """Bytes used by the index (SQLite: by the whole file, so callers take a difference)"""
+        with self.connection.cursor() as cursor:
+            if self.connection.vendor == 'postgresql':
+                cursor.execute('SELECT COALESCE(pg_relation_size(to_regclass(%s)), 0)', [index.name])
+                return cursor.fetchone()[0]
+            if self.connection.vendor == 'mysql':
+                cursor.execute(f'ANALYZE TABLE {self.connection.ops.quote_name(model._meta.db_table)}')
+                cursor.fetchall()
+                cursor.execute(
+                    "SELECT COALESCE(SUM(stat_value), 0) * @@innodb_page_size FROM mysql.innodb_index_stats "
+                    "WHERE database_name = DATABASE() AND table_name = %s AND index_name = %s AND stat_name = 'size'",
+                    [model._meta.db_table, index.name],
+                )
+                return int(cursor.fetchone()[0])
+            cursor.execute('PRAGMA page_count')
+            pages = cursor.fetchone()[0]
+            cursor.execute('PRAGMA page_size')
+            return pages * cursor.fetchone()[0]
+
+    def analyze(self, table):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {table}')
+            if self.connection.vendor == 'mysql':
+                cursor.fetchall()
@@ -0,0 +1,136 @@
+import statistics
+import time
+import tracemalloc
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from registration import admin_views, views
+from registration.models import Course, Module, Registration, Student, User
+from registration.student_context import StudentContext
+from registration.tenants import current_tenant
+
+WORDS = 'students explore core concepts through lectures seminars projects and assessed practical work'.split()
+
+
+def value_size(value) -> int:
+    """Bytes a column value takes on the wire, roughly"""
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, (date, datetime, Decimal)):
+        return len(str(value))
+    return 8
+
+
+def result_bytes(queries, using) -> tuple:
+    """Re-run the captured SELECTs and add up the size of what they return"""
+    rows = size = 0
+    with connections[using].cursor() as cursor:
+        for query in queries:
+            if not query['sql'].lstrip().upper().startswith('SELECT'):
+                continue
+            cursor.execute(query['sql'])
+            for row in cursor.fetchall():
+                rows += 1
+                size += sum(value_size(value) for value in row)
+    return rows, size
+
+
+class Command(BaseCommand):
+    help = 'Measure rows, result bytes and peak Python memory per request for the module list pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modules', type=int, default=60, help='Extra modules to create')
+        parser.add_argument('--words', type=int, default=300, help='Words per module description')
+        parser.add_argument('--registrations', type=int, default=2000, help='Extra registrations for bulk_operations')
+        parser.add_argument('--repeat', type=int, default=5, help='Requests per page; medians are reported')
+
+    def handle(self, *args, **options):
+        course = Course.objects.filter(is_active=True).first()
+        if course is None:
+            raise CommandError('Needs an active course; run populate_courses first')
+
+        # The ORM writes go to the current tenant's database, so roll back there
+        self.using = current_tenant().alias
+        results = []
+        with transaction.atomic(using=self.using), override_settings(TEMPLATE_FRAGMENT_CACHE=False):
+            staff, student = self.populate(course, options)
+            pages = [
+                ('home', views.home, '/', staff),
+                ('modules', views.modules, '/modules/', student.user),
+                ('course_detail', views.course_detail, f'/courses/{course.code}/', staff),
+                ('bulk_operations', admin_views.bulk_operations, '/admin/bulk-operations/', staff),
+            ]
+            for name, view, path, user in pages:
+                kwargs = {'course_code': course.code} if name == 'course_detail' else {}
+                results.append((name, self.measure(view, path, user, kwargs, options['repeat'])))
+            # Leave none of the benchmark rows behind
+            transaction.set_rollback(True, using=self.using)
+
+        self.stdout.write(f"{'Page':<16} {'queries':>8} {'rows':>8} {'result KB':>10} {'peak KB':>10} {'ms':>8}")
+        for name, (queries, rows, size, peak, ms) in results:
+            self.stdout.write(f'{name:<16} {queries:>8} {rows:>8} {size / 1024:>10.1f} {peak / 1024:>10.1f} {ms:>8.1f}')
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['modules']} extra modules with {options['words']}-word descriptions, "
+            f"{options['registrations']} extra registrations; fragment caching off; "
+            f"peak memory and time are medians of {options['repeat']} requests."
+        ))
+
+    def populate(self, course, options):
+        description = ' '.join(WORDS[i % len(WORDS)] for i in range(options['words']))
+        modules = [
+            Module.objects.create(
+                code=f'BENCH{n:04d}', name=f'Benchmark module {n}', credit=10, category='CS',
+                description=description, courses_allowed=10 ** 6,
+            )
+            for n in range(options['modules'])
+        ]
+        staff = User.objects.create(username='bench_projections_staff', is_staff=True, is_student=False, is_teacher=False)
+        per_student = 5
+        users = User.objects.bulk_create([
+            User(
+                username=f'bench_projections_{n}', first_name='Bench', last_name=f'Student {n}',
+                is_student=True, is_teacher=False,
+            )
+            for n in range(max(1, options['registrations'] // per_student))
+        ])
+        students = Student.objects.bulk_create([
+            Student(
+                user=user, student_id=f'BP{n:06d}', course=course, city='Bench', country='Bench',
+                sort_name=Student.sort_key(user.first_name, user.last_name),
+            )
+            for n, user in enumerate(users)
+        ])
+        Registration.objects.bulk_create([
+            Registration(student=student, module=modules[(n + i) % len(modules)], status='A')
+            for n, student in enumerate(students)
+            for i in range(min(per_student, len(modules)))
+        ], batch_size=500)
+        return staff, students[0]
+
+    def measure(self, view, path, user, kwargs, repeat):
+        factory = RequestFactory()
+        peaks, times = [], []
+        for _ in range(repeat):
+            request = factory.get(path)
+            request.user = User.objects.get(pk=user.pk)
+            request.student_context = StudentContext(request)
+            tracemalloc.start()
+            started = time.perf_counter()
+            with CaptureQueriesContext(connections[self.using]) as captured:
+                response = view(request, **kwargs)
+            times.append((time.perf_counter() - started) * 1000)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            if response.status_code != 200:
+                raise CommandError(f'{path} returned {response.status_code}')
+        rows, size = result_bytes(captured.captured_queries, self.using)
+        return len(captured), rows, size, statistics.median(peaks), statistics.median(times)
@@ -0,0 +1,148 @@
+import logging
+import multiprocessing
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Q
+from django.test import Client
+from django.urls import reverse
+
+from registration.models import Course, Module, Registration, Student, User
+from registration.tenants import current_tenant
+
+# SQLite as Django configures it without the production profile
+LEGACY_OPTIONS = {}
+
+# Filled in by the parent before forking; each worker uses its own slice
+_clients = []
+
+
+def worker(args):
+    """Register and unregister random (student, module) pairs until the deadline"""
+    path, options, indexes, modules, seconds, seed, using = args
+    db = connections[using]
+    db.settings_dict['NAME'] = path
+    db.settings_dict['OPTIONS'] = options
+    rng = random.Random(seed)
+    free = [(i, module) for i in indexes for module in modules]
+    registered = errors = 0
+    latencies = []
+    deadline = time.monotonic() + seconds
+    while free and time.monotonic() < deadline:
+        pair = free.pop(rng.randrange(len(free)))
+        client, student_id = _clients[pair[0]]
+        code, module_id = pair[1]
+        started = time.perf_counter()
+        client.post(reverse('register_module', args=[code]))
+        elapsed = (time.perf_counter() - started) * 1000
+        if not Registration.objects.filter(student_id=student_id, module_id=module_id).exists():
+            # The view reports a failed write (e.g. "database is locked") as a message
+            errors += 1
+            free.append(pair)
+            continue
+        registered += 1
+        latencies.append(elapsed)
+        response = client.post(reverse('unregister_module', args=[code]))
+        if response.status_code == 302:
+            free.append(pair)
+        else:
+            errors += 1
+    db.close()
+    return registered, errors, latencies
+
+
+class Command(BaseCommand):
+    help = 'Measure sustained module registrations per second on SQLite with several worker processes, default vs tuned profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Worker processes, like gunicorn workers')
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--students', type=int, default=8, help='Benchmark students per worker')
+        parser.add_argument('--modules', type=int, default=10)
+
+    def handle(self, *args, **options):
+        # The ORM reads and writes the current tenant's database, so that is the one copied
+        using = current_tenant().alias
+        if connections[using].vendor != 'sqlite':
+            raise CommandError('Needs an SQLite database, e.g. config.production without DATABASE_URL')
+        course = Course.objects.filter(is_active=True).first()
+        if course is None:
+            raise CommandError('Needs an active course; run populate_data first')
+        modules = list(
+            Module.objects.filter(Q(courses=None) | Q(courses=course), availability=True)
+            .values_list('code', 'pk').distinct()[:options['modules']]
+        )
+        if not modules:
+            raise CommandError(f'No available modules are open to {course.code}')
+
+        # Request logging would dominate the timings (and fill debug.log)
+        logging.disable(logging.CRITICAL)
+        source = connections[using].settings_dict['NAME']
+        results = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for label, db_options in (('default', LEGACY_OPTIONS), ('tuned', settings.SQLITE_OPTIONS)):
+                path = str(Path(tmp) / f'{label}.sqlite3')
+                self.copy(source, path)
+                results.append((label, self.run(path, db_options, course, modules, options, using)))
+        logging.disable(logging.NOTSET)
+
+        self.stdout.write(f"{'Profile':<8} {'registered':>11} {'per s':>8} {'p50 ms':>8} {'p95 ms':>8} {'failed':>7}")
+        seconds = options['seconds']
+        for label, (registered, errors, latencies) in results:
+            p50 = statistics.median(latencies) if latencies else 0
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else p50
+            self.stdout.write(
+                f'{label:<8} {registered:>11} {registered / seconds:>8.1f} {p50:>8.1f} {p95:>8.1f} {errors:>7}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['workers']} processes registering and unregistering for {options['seconds']:.0f}s through "
+            'the register_module view, each against a fresh copy of the database; failed = writes lost to '
+            '"database is locked".'
+        ))
+
+    def copy(self, source, path):
+        """Snapshot the database and reset it to SQLite's default rollback journal"""
+        with sqlite3.connect(source) as src, sqlite3.connect(path) as dest:
+            src.backup(dest)
+            dest.execute('PRAGMA journal_mode=DELETE')
+
+    def run(self, path, db_options, course, modules, options, using):
+        db = connections[using]
+        original = db.settings_dict['NAME'], db.settings_dict['OPTIONS']
+        db.close()
+        db.settings_dict['NAME'], db.settings_dict['OPTIONS'] = path, db_options
+        try:
+            # Room for everyone, so only lock contention can fail a registration
+            Module.objects.filter(pk__in=[pk for code, pk in modules]).update(courses_allowed=10 ** 6)
+            _clients.clear()
+            for n in range(options['workers'] * options['students']):
+                user = User.objects.create_user(username=f'reg-bench-{n}', password=None, is_student=True, is_teacher=False)
+                student = Student.objects.create(
+                    user=user, student_id=f'BENCH{n:05d}', course=course, city='', country='',
+                )
+                client = Client(raise_request_exception=False)
+                client.force_login(user)
+                _clients.append((client, student.pk))
+            db.close()
+
+            per_worker = options['students']
+            jobs = [
+                (path, db_options, range(w * per_worker, (w + 1) * per_worker), modules, options['seconds'], w, using)
+                for w in range(options['workers'])
+            ]
+            with multiprocessing.get_context('fork').Pool(options['workers']) as pool:
+                outcomes = pool.map(worker, jobs)
+        finally:
+            db.close()
+            db.settings_dict['NAME'], db.settings_dict['OPTIONS'] = original
+        registered = sum(outcome[0] for outcome in outcomes)
+        errors = sum(outcome[1] for outcome in outcomes)
+        latencies = [ms for outcome in outcomes for ms in outcome[2]]
+        return registered, errors, latencies
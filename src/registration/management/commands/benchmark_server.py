@@ -0,0 +1,129 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from .benchmark_concurrency import free_port
+
+
+def child_pids(parent):
+    """Pids whose parent is ``parent`` (gunicorn workers of a master)"""
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as stat:
+                # The command name may contain spaces; ppid follows the closing parenthesis
+                fields = stat.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent:
+            pids.append(int(entry))
+    return pids
+
+
+def memory_kb(pid):
+    """(PSS, private) of a process in KB, from /proc/<pid>/smaps_rollup"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            key, _, rest = line.partition(':')
+            if key in ('Pss', 'Private_Clean', 'Private_Dirty'):
+                values[key] = int(rest.split()[0])
+    return values['Pss'], values['Private_Clean'] + values['Private_Dirty']
+
+
+class Command(BaseCommand):
+    help = 'Measure cold start and memory per worker of the gunicorn launch profile, with and without preload'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--config', default='config/gunicorn.py', help='Gunicorn launch profile (relative to src/)')
+        parser.add_argument('--app', default='config.wsgi:application')
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--path', default='/courses/', help='Path requested to detect readiness and load workers')
+        parser.add_argument('--requests', type=int, default=200, help='Requests sent before memory is sampled')
+        parser.add_argument('--runs', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if not os.path.isdir('/proc'):
+            raise CommandError('benchmark_server reads /proc and runs on Linux only')
+        results = []
+        for preload in ('true', 'false'):
+            samples = [self.run(preload, options) for _ in range(options['runs'])]
+            results.append((preload, {
+                key: statistics.median(sample[key] for sample in samples) for key in samples[0]
+            }))
+
+        self.stdout.write('')
+        self.stdout.write(
+            f"{'Preload':<8} {'cold start ms':>14} {'first req ms':>13} {'PSS/worker MB':>14} "
+            f"{'private/worker MB':>18} {'total PSS MB':>13}"
+        )
+        for preload, r in results:
+            self.stdout.write(
+                f"{preload:<8} {r['ready']:>14.0f} {r['first']:>13.1f} {r['pss'] / 1024:>14.1f} "
+                f"{r['private'] / 1024:>18.1f} {r['total'] / 1024:>13.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Medians of {options['runs']} starts with {options['workers']} workers; "
+            'cold start is spawn to first successful response.'
+        ))
+
+    def run(self, preload, options):
+        port = free_port()
+        env = os.environ.copy()
+        env.update({
+            'GUNICORN_PRELOAD': preload,
+            'WEB_CONCURRENCY': str(options['workers']),
+            'GUNICORN_BIND': f'127.0.0.1:{port}',
+        })
+        cmd = [
+            sys.executable, '-m', 'gunicorn', '-c', options['config'],
+            '--log-level', 'warning', '--access-logfile', os.devnull, options['app'],
+        ]
+        url = f"http://127.0.0.1:{port}{options['path']}"
+        started = time.perf_counter()
+        process = subprocess.Popen(cmd, cwd=settings.BASE_DIR, env=env)
+        try:
+            ready, first = self.wait_ready(url, started, process)
+            for _ in range(options['requests']):
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+            workers = child_pids(process.pid)
+            memory = [memory_kb(pid) for pid in workers]
+            master_pss = memory_kb(process.pid)[0]
+        finally:
+            process.terminate()
+            process.wait(timeout=60)
+        if not memory:
+            raise CommandError('No gunicorn workers found')
+        return {
+            'ready': ready,
+            'first': first,
+            'pss': statistics.mean(pss for pss, _ in memory),
+            'private': statistics.mean(private for _, private in memory),
+            'total': master_pss + sum(pss for pss, _ in memory),
+        }
+
+    def wait_ready(self, url, started, process, timeout=60.0):
+        """Poll until the server answers; return (ms to ready, ms of that first request)"""
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise CommandError(f'gunicorn exited with status {process.returncode}')
+            request_started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+            except (urllib.error.URLError, OSError):
+                time.sleep(0.05)
+                continue
+            now = time.perf_counter()
+            return (now - started) * 1000, (now - request_started) * 1000
+        raise CommandError(f'Server did not answer {url} within {timeout:.0f}s')
@@ -0,0 +1,67 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from registration.models import User
+from registration.tenants import current_tenant
+
+SESSION_WRITE = re.compile(r'^\s*(INSERT|UPDATE|DELETE)\b.*\bdjango_session\b', re.I | re.S)
+
+# The previous configuration: plain DB sessions saved on every request
+LEGACY = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'SESSION_SAVE_EVERY_REQUEST': True,
+    'MIDDLEWARE': [
+        'django.contrib.sessions.middleware.SessionMiddleware' if m == 'registration.sessions.SessionMiddleware' else m
+        for m in settings.MIDDLEWARE
+    ],
+}
+
+
+class Command(BaseCommand):
+    help = 'Count django_session writes for the same browsing load under the legacy and low-write session setups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--requests', type=int, default=25, help='Page views per user')
+
+    def handle(self, *args, **options):
+        paths = [reverse(name) for name in ('home', 'courses', 'modules', 'about')]
+        # Sessions and users live in the current tenant's database
+        self.using = current_tenant().alias
+        results = []
+        for label, overrides in (('legacy', LEGACY), ('low-write', {})):
+            with override_settings(**overrides), transaction.atomic(using=self.using):
+                results.append((label, self.run_load(paths, options)))
+                # Leave no benchmark users or sessions behind
+                transaction.set_rollback(True, using=self.using)
+
+        self.stdout.write(f"{'Setup':<10} {'requests':>9} {'writes':>7} {'writes/req':>11}")
+        for label, (requests, writes) in results:
+            self.stdout.write(f'{label:<10} {requests:>9} {writes:>7} {writes / requests:>11.3f}')
+        legacy_writes, low_writes = results[0][1][1], results[1][1][1]
+        reduction = 100 * (1 - low_writes / legacy_writes) if legacy_writes else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Session writes reduced by {reduction:.1f}%. An unchanged session is re-saved at most once '
+            f'per SESSION_REFRESH_INTERVAL ({settings.SESSION_REFRESH_INTERVAL}s) to slide its expiry.'
+        ))
+
+    def run_load(self, paths, options):
+        requests = writes = 0
+        for n in range(options['users']):
+            user = User.objects.create_user(username=f'session-bench-{n}', password=None, is_student=True, is_teacher=False)
+            client = Client()
+            client.force_login(user)
+            with CaptureQueriesContext(connections[self.using]) as queries:
+                for i in range(options['requests']):
+                    response = client.get(paths[i % len(paths)])
+                    if response.status_code >= 400:
+                        raise CommandError(f'{paths[i % len(paths)]} returned {response.status_code}')
+                    requests += 1
+            writes += sum(1 for query in queries.captured_queries if SESSION_WRITE.match(query['sql']))
+        return requests, writes
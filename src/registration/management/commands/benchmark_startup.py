@@ -0,0 +1,81 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter so every sample is a cold worker start
+PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+marks = {}
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+marks['import'] = time.perf_counter()
+django.setup(set_prefix=False)
+marks['setup'] = time.perf_counter()
+if sys.argv[2] == 'legacy':
+    # What the old RegistrationConfig.ready() did in every process
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    marks['setup'] = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+marks['app'] = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+environ = {'PATH_INFO': sys.argv[1]}
+setup_testing_defaults(environ)
+status = []
+body = b''.join(application(environ, lambda s, h, exc_info=None: status.append(s)))
+marks['first'] = time.perf_counter()
+heavy = sorted(m for m in ('requests', 'urllib3', 'MySQLdb', 'decouple') if m in sys.modules)
+print(json.dumps({
+    'status': status[0], 'heavy': heavy,
+    **{k: (v - started) * 1000 for k, v in marks.items()},
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Measure cold worker start: import and setup time and time to first request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per variant')
+        parser.add_argument('--path', default='/', help='Path of the first request')
+        parser.add_argument(
+            '--legacy', action='store_true',
+            help='Also time a start that migrates in-process, as ready() used to on every start',
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        variants = ['current'] + (['legacy'] if options['legacy'] else [])
+
+        self.stdout.write(
+            f"{'Variant':<8} {'import ms':>10} {'setup ms':>9} {'app ms':>7} {'first req ms':>13}  heavy modules loaded"
+        )
+        for variant in variants:
+            samples = [self.probe(env, options['path'], variant) for _ in range(options['runs'])]
+            median = {k: statistics.median(s[k] for s in samples) for k in ('import', 'setup', 'app', 'first')}
+            self.stdout.write(
+                f"{variant:<8} {median['import']:>10.1f} {median['setup']:>9.1f} {median['app']:>7.1f} "
+                f"{median['first']:>13.1f}  {', '.join(samples[0]['heavy']) or '-'}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Medians of {options['runs']} fresh interpreters; times are cumulative from interpreter start, "
+            f"first request {options['path']} -> {samples[0]['status']}"
+        ))
+
+    def probe(self, env, path, variant):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE, path, variant],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Startup probe failed:\n{result.stderr[-2000:]}')
+        return json.loads(result.stdout.strip().splitlines()[-1])
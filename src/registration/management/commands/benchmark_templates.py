@@ -0,0 +1,99 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.template.backends.django import Template
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from registration.models import Student
+from registration.versioning import CATALOG, bump_version, per_process_cache
+from registration.tenants import current_tenant
+
+PAGES = ('home', 'courses', 'modules')
+
+
+@contextmanager
+def timed_renders(samples):
+    """Record (template name, seconds) for every page render, not the form widgets inside it"""
+    original = Template.render
+    depth = 0
+
+    def render(self, context=None, request=None):
+        nonlocal depth
+        started = time.perf_counter()
+        depth += 1
+        try:
+            return original(self, context, request)
+        finally:
+            depth -= 1
+            if depth == 0:
+                samples.append((self.template.name, time.perf_counter() - started))
+
+    Template.render = render
+    try:
+        yield
+    finally:
+        Template.render = original
+
+
+class Command(BaseCommand):
+    help = 'Compare template render time without fragment caching, with cold fragments and with warm fragments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Requests per page and mode')
+
+    def handle(self, *args, **options):
+        student = Student.objects.select_related('user').first()
+        if student is None:
+            raise CommandError('Needs at least one student; run populate_data and register a student first')
+        if per_process_cache():
+            raise CommandError('Fragments are only cached with a shared cache; set CACHE_BACKEND, e.g. to Redis')
+
+        modes = (
+            ('uncached', False, False),
+            ('cold', True, True),  # the catalog changed before every request
+            ('warm', True, False),
+        )
+        self.using = current_tenant().alias
+        results = {}
+        with transaction.atomic(using=self.using):
+            client = Client()
+            client.force_login(student.user)
+            for label, enabled, invalidate in modes:
+                with override_settings(TEMPLATE_FRAGMENT_CACHE=enabled):
+                    for page in PAGES:
+                        results[label, page] = self.run(client, reverse(page), options['requests'], invalidate)
+            # Leave no benchmark session behind
+            transaction.set_rollback(True, using=self.using)
+
+        self.stdout.write(f"{'Page':<10} {'Template':<34} " + ' '.join(f'{label + " ms":>12}' for label, _, _ in modes)
+                          + f" {'queries':>16}")
+        for page in PAGES:
+            name = results['uncached', page][0]
+            times = ' '.join(f'{results[label, page][1]:>12.2f}' for label, _, _ in modes)
+            queries = '/'.join(str(results[label, page][2]) for label, _, _ in modes)
+            self.stdout.write(f'{page:<10} {name:<34} {times} {queries:>16}')
+        self.stdout.write(self.style.SUCCESS(
+            f"Median template render time over {options['requests']} requests per page as a logged-in student; "
+            'queries are per request (uncached/cold/warm).'
+        ))
+
+    def run(self, client, path, count, invalidate):
+        client.get(path)  # Compile templates and warm unrelated caches
+        samples = []
+        queries = 0
+        with timed_renders(samples):
+            for _ in range(count):
+                if invalidate:
+                    bump_version(CATALOG)
+                with CaptureQueriesContext(connections[self.using]) as captured:
+                    response = client.get(path)
+                if response.status_code != 200:
+                    raise CommandError(f'GET {path} returned {response.status_code}')
+                queries = len(captured)
+        name = samples[0][0]
+        return name, statistics.median(seconds for template, seconds in samples if template == name) * 1000, queries
@@ -0,0 +1,151 @@
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from decouple import config
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from registration.tenants import all_tenants, current_tenant, provision
+from registration.terms import ensure_current_term
+
+
+class Command(BaseCommand):
+    help = (
+        'Prepare the database: create it if needed (MySQL), migrate, and optionally load sample data. '
+        'Runs for the TENANT setting\'s tenant, or for every tenant in parallel with --all-tenants'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--populate', action='store_true',
+            help='Load sample courses and modules (default: the AUTO_POPULATE_DB setting)',
+        )
+        parser.add_argument('--no-populate', action='store_true', help='Never load sample data')
+        parser.add_argument(
+            '--all-tenants', action='store_true',
+            help='Bootstrap every tenant in settings.TENANTS, each in its own process',
+        )
+        parser.add_argument('--jobs', type=int, default=4, help='Tenants bootstrapped at once with --all-tenants')
+
+    def handle(self, *args, **options):
+        if options['all_tenants']:
+            return self.bootstrap_tenants(options)
+
+        tenant = current_tenant()
+        self.stdout.write("🚀 Starting database setup..." + ('' if tenant.is_default else f" (tenant {tenant.name})"))
+
+        # Step 1: Create database if it doesn't exist (MySQL; any server for tenants)
+        if tenant.is_default:
+            self.create_database_if_needed()
+        elif provision(tenant):
+            self.stdout.write(self.style.SUCCESS(f"✅ Created the database for tenant {tenant.name}"))
+
+        # Step 2: Run migrations. The tenant stays active, so data migrations write to its database
+        self.stdout.write("🔄 Running database migrations...")
+        call_command('migrate', database=tenant.alias, verbosity=options['verbosity'])
+        self.stdout.write(self.style.SUCCESS("✅ Migrations completed successfully"))
+
+        # Step 3: Fill denormalized columns added by migrations (a no-op once done)
+        call_command('backfill_sort_names', verbosity=options['verbosity'])
+
+        # Step 4: Make a term current if none is (requests only read it)
+        term = ensure_current_term()
+        if term is not None:
+            self.stdout.write(self.style.SUCCESS(f"✅ Made term {term.code} current"))
+
+        # Step 5: Populate database if enabled
+        populate = options['populate'] or config('AUTO_POPULATE_DB', default='false').lower() in ['true', '1', 'yes']
+        if populate and not options['no_populate']:
+            self.populate_database(options['verbosity'])
+
+        self.stdout.write(self.style.SUCCESS("🎉 Database setup completed!"))
+
+    def bootstrap_tenants(self, options):
+        """Run this command for every tenant, --jobs tenants at a time"""
+        tenants = all_tenants()
+        if not tenants:
+            raise CommandError('No tenants configured; set TENANTS')
+        cmd = [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'bootstrap', f"--verbosity={options['verbosity']}"]
+        if options['populate']:
+            cmd.append('--populate')
+        if options['no_populate']:
+            cmd.append('--no-populate')
+
+        def run(tenant):
+            # A process per tenant: migrations are not thread-safe, and TENANT scopes the whole run
+            env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE, 'TENANT': tenant.name}
+            started = time.monotonic()
+            result = subprocess.run(cmd, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+            return result, time.monotonic() - started
+
+        self.stdout.write(f"🚀 Bootstrapping {len(tenants)} tenants, {options['jobs']} at a time...")
+        started = time.monotonic()
+        failed = []
+        with ThreadPoolExecutor(max_workers=max(1, options['jobs'])) as executor:
+            futures = {executor.submit(run, tenant): tenant for tenant in tenants}
+            for future in as_completed(futures):
+                tenant = futures[future]
+                result, seconds = future.result()
+                if result.returncode == 0:
+                    self.stdout.write(self.style.SUCCESS(f"✅ {tenant.name} ready in {seconds:.1f}s"))
+                else:
+                    failed.append(tenant.name)
+                    self.stderr.write(f"❌ {tenant.name} failed after {seconds:.1f}s:\n{result.stderr[-2000:]}")
+        if failed:
+            raise CommandError(f"Bootstrap failed for {', '.join(sorted(failed))}")
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 {len(tenants)} tenants ready in {time.monotonic() - started:.1f}s"
+        ))
+
+    def create_database_if_needed(self):
+        """Create MySQL database if it doesn't exist"""
+        db_settings = settings.DATABASES['default']
+        if db_settings['ENGINE'] != 'django.db.backends.mysql':
+            return
+
+        try:
+            import MySQLdb
+        except ImportError:
+            raise CommandError("MySQLdb not installed. Install with: pip install mysqlclient")
+
+        self.stdout.write("🔧 Checking MySQL database...")
+        # Connect to MySQL server without specifying database
+        connection = MySQLdb.connect(
+            host=config('DB_HOST', default='localhost'),
+            user=config('DB_USER', default='root'),
+            passwd=config('DB_PASSWORD', default='somrup7'),
+            port=int(config('DB_PORT', default='3306'))
+        )
+        try:
+            cursor = connection.cursor()
+            database_name = config('DB_NAME', default='skylark_academy')
+
+            # Check if database exists
+            cursor.execute("SHOW DATABASES LIKE %s", [database_name])
+            if cursor.fetchone():
+                self.stdout.write(f"✅ MySQL database already exists: {database_name}")
+            else:
+                cursor.execute(f"CREATE DATABASE `{database_name}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+                self.stdout.write(self.style.SUCCESS(f"✅ Created MySQL database: {database_name}"))
+            cursor.close()
+        finally:
+            connection.close()
+
+    def populate_database(self, verbosity):
+        """Populate database with initial data"""
+        self.stdout.write("🔄 Populating database with sample data...")
+
+        # Use transaction to ensure all-or-nothing population
+        with transaction.atomic(using=current_tenant().alias):
+            # Populate courses first (dependencies)
+            call_command('populate_courses', verbosity=verbosity)
+            self.stdout.write("✅ Courses populated successfully")
+
+            # Then populate modules
+            call_command('populate_data', verbosity=verbosity)
+            self.stdout.write("✅ Modules populated successfully")
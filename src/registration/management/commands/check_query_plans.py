@@ -0,0 +1,103 @@
+import json
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from registration.models import AdminAuditLog, Registration, RegistrationArchive, Student
+from registration.tenants import current_tenant
+
+
+def hot_queries():
+    """(description, queryset) for the registration, student and audit log access paths"""
+    now = timezone.now()
+    month_ago = now - timedelta(days=30)
+    registrations = Registration.objects.all()
+    this_term = registrations.filter(term_id=1)
+    archive = RegistrationArchive.objects.all()
+    audit = AdminAuditLog.objects.all()
+    students = Student.objects.all()
+    # .count() drops the default ordering, so the counting paths are checked without it
+    return [
+        ('module_detail: approved registrations of a module', this_term.filter(module_id=1, status='A')),
+        ('register_module: registrations of a module', this_term.filter(module_id=1).order_by().values('pk')),
+        ('my_registrations: a student\'s registrations, newest first', this_term.filter(student_id=1)),
+        ('profile: a student\'s approved registrations', this_term.filter(student_id=1, status='A')),
+        ('dashboard: registrations in a month (trend counts)', registrations.filter(registration_date__gte=month_ago, registration_date__lte=now).order_by().values('pk')),
+        ('dashboard: recent registrations', registrations.order_by('-registration_date')[:10]),
+        ('dashboard: approved registration count', registrations.filter(status='A').order_by().values('pk')),
+        ('my_registrations: a student\'s past terms', archive.filter(student_id=1)),
+        ('reports: a past term\'s approved registrations of a module', archive.filter(term_id=1, module_id=1, status='A')),
+        ('students: first page in default (name) order', students[:25]),
+        ('course_detail: a course\'s active students in name order', students.filter(course_id=1, is_active=True)),
+        ('audit log: recent actions', audit.order_by('-timestamp')[:10]),
+        ('audit log: by action', audit.filter(action='UPDATE')),
+        ('audit log: by model', audit.filter(model_name='Module')),
+        ('audit log: by date', audit.filter(timestamp__gte=month_ago)),
+    ]
+
+
+def full_scans(queryset, using):
+    """Return (plan text, True if the query's own table is read with a full scan on ``using``)"""
+    queryset = queryset.using(using)
+    table = queryset.model._meta.db_table
+    vendor = connections[using].vendor
+    if vendor == 'sqlite':
+        plan = queryset.explain()
+        scanned = any(
+            match.group(1) == table and 'USING' not in match.group(2)
+            for match in re.finditer(r'\bSCAN (?:TABLE )?(\S+)(.*)', plan)
+        )
+    elif vendor == 'postgresql':
+        with transaction.atomic(using=using):
+            # Tiny tables are always seq-scanned; only report scans no index can avoid
+            with connections[using].cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+        scanned = f'Seq Scan on {table}' in plan
+    elif vendor == 'mysql':
+        plan = queryset.explain(format='json')
+        scanned = any(
+            node.get('table_name') == table and node.get('access_type') == 'ALL'
+            for node in walk(json.loads(plan))
+        )
+    else:
+        raise CommandError(f'No plan check for the {vendor} backend')
+    return plan, scanned
+
+
+def walk(node):
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from walk(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from walk(value)
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the registration hot queries and fail if any reads its table with a full scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--show-plans', action='store_true', help='Print every plan, not only failing ones')
+        parser.add_argument('--database', help="Database alias to check (default: the current tenant's database)")
+
+    def handle(self, *args, **options):
+        using = options['database'] or current_tenant().alias
+        failures = []
+        for description, queryset in hot_queries():
+            plan, scanned = full_scans(queryset, using)
+            if scanned:
+                failures.append(description)
+                self.stdout.write(self.style.ERROR(f'FULL SCAN  {description}'))
+            else:
+                self.stdout.write(f'ok         {description}')
+            if scanned or options['show_plans']:
+                self.stdout.write('    ' + plan.replace('\n', '\n    '))
+
+        if failures:
+            raise CommandError(f'{len(failures)} hot queries fall back to a full scan; add or fix an index')
+        self.stdout.write(self.style.SUCCESS(f'All {len(hot_queries())} hot queries use an index ({using}, {connections[using].vendor}).'))
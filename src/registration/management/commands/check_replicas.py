@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+
+from registration.models import Course, Module, Registration
+from registration.routers import REPLICA_MODELS, ReplicaRouter, replica_lag, replicas, use_replicas
+
+
+class Command(BaseCommand):
+    help = 'Report the lag of each read replica and where catalog reads are routed'
+
+    def handle(self, *args, **options):
+        aliases = replicas()
+        if not aliases:
+            raise CommandError('No replicas configured (DB_REPLICA_HOSTS or DATABASE_REPLICA_URLS)')
+
+        self.stdout.write(f"{'Alias':<12} {'vendor':<11} {'lag s':>8} {'usable':>7} {'courses':>8} {'modules':>8} {'registrations':>14}")
+        for alias in ('default', *aliases):
+            try:
+                lag = 0.0 if alias == 'default' else replica_lag(alias)
+                counts = [model.objects.using(alias).count() for model in (Course, Module, Registration)]
+            except DatabaseError as e:
+                self.stdout.write(self.style.ERROR(f'{alias:<12} unreachable: {e}'))
+                continue
+            usable = lag is not None and lag <= settings.REPLICA_MAX_LAG
+            lag_text = f'{lag:.1f}' if lag is not None else 'stopped'
+            self.stdout.write(
+                f'{alias:<12} {connections[alias].vendor:<11} {lag_text:>8} {"yes" if usable else "no":>7} '
+                + ' '.join(f'{count:>{width}}' for count, width in zip(counts, (8, 8, 14)))
+            )
+
+        router = ReplicaRouter()
+        with use_replicas():
+            target = router.db_for_read(Module) or 'default'
+        self.stdout.write(self.style.SUCCESS(
+            f'Catalog reads in a replica scope go to {target} '
+            f'(models: {", ".join(sorted(REPLICA_MODELS))}; max lag {settings.REPLICA_MAX_LAG}s).'
+        ))
@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from registration.snapshots import SnapshotError, read_manifest, restore
+from registration.tenants import current_tenant
+
+
+class Command(BaseCommand):
+    help = "Replace the data in a snapshot's tables with the snapshot's rows, using the database's bulk loader"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Directory written by the snapshot command')
+        parser.add_argument('--database', help="Database alias to load (default: the current tenant's database)")
+        parser.add_argument(
+            '--skip-migration-check', action='store_true',
+            help='Load even if this database is at other migrations than the snapshot',
+        )
+        parser.add_argument(
+            '--noinput', '--no-input', action='store_false', dest='interactive',
+            help='Do not ask for confirmation',
+        )
+
+    def handle(self, *args, **options):
+        using = options['database'] or current_tenant().alias
+        try:
+            manifest = read_manifest(options['path'])
+        except (OSError, ValueError, SnapshotError) as e:
+            raise CommandError(f"Cannot read the snapshot in {options['path']}: {e}")
+        total = sum(entry['rows'] for entry in manifest['tables'])
+        if options['interactive']:
+            answer = input(
+                f"This deletes every row in {len(manifest['tables'])} tables of the '{using}' database and loads "
+                f"{total} rows taken {manifest['created_at']}. Type 'yes' to continue: "
+            )
+            if answer != 'yes':
+                raise CommandError('Restore cancelled')
+
+        started = time.monotonic()
+        try:
+            loaded = restore(
+                options['path'], using, check_migrations=not options['skip_migration_check'], progress=self.report,
+            )
+        except SnapshotError as e:
+            raise CommandError(str(e))
+        seconds = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Restored {loaded} rows into {using} in {seconds:.1f}s ({loaded / max(seconds, 0.001):,.0f} rows/s)"
+        ))
+
+    def report(self, table, rows, seconds):
+        self.stdout.write(f'{table:<40} {rows:>10} rows {seconds:>8.1f}s')
@@ -0,0 +1,39 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from registration.models import Term
+from registration.terms import rollover
+
+
+class Command(BaseCommand):
+    help = 'Start a new term: clone the module catalog into it and archive earlier terms\' registrations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('code', help='Term code, e.g. 2027-SPR; an existing term is reused')
+        parser.add_argument('--name', help='Display name (new terms; defaults to the code)')
+        parser.add_argument('--starts', type=date.fromisoformat, help='First day, YYYY-MM-DD (new terms)')
+        parser.add_argument('--ends', type=date.fromisoformat, help='Last day, YYYY-MM-DD (new terms)')
+        parser.add_argument('--keep-registrations', action='store_true', help='Do not archive earlier terms')
+
+    def handle(self, *args, **options):
+        term = Term.objects.filter(code=options['code']).first()
+        if term is None:
+            if not (options['starts'] and options['ends']):
+                raise CommandError(f"Term {options['code']} does not exist; give --starts and --ends to create it")
+            if options['ends'] < options['starts']:
+                raise CommandError('--ends is before --starts')
+            term = Term.objects.create(
+                code=options['code'], name=options['name'] or options['code'],
+                starts_on=options['starts'], ends_on=options['ends'],
+            )
+            self.stdout.write(f'Created term {term.code} ({term.starts_on} to {term.ends_on}).')
+        elif term.is_current:
+            raise CommandError(f'{term.code} is already the current term')
+
+        result = rollover(term, archive=not options['keep_registrations'])
+        previous = result['previous'].code if result['previous'] else 'none'
+        self.stdout.write(self.style.SUCCESS(
+            f"{term.code} is now the current term (was {previous}): {result['cloned']} offerings cloned, "
+            f"{result['applied']} modules updated, {result['archived']} registrations archived."
+        ))
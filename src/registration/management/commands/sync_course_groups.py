@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from registration.course_groups import sync_all
+
+
+class Command(BaseCommand):
+    help = 'Reconcile course group memberships with every student\'s course in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT / DELETE')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+
+    def handle(self, *args, **options):
+        added, removed = sync_all(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = 'Would add' if options['dry_run'] else 'Added'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {added} and {"would remove" if options["dry_run"] else "removed"} {removed} course group memberships.'
+        ))
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+LEGACY_SUFFIX = '_Group'
+
+
+def merge_legacy_course_groups(apps, schema_editor):
+    """Fold each Course_<code>_Group into Course_<code> (members and permissions)"""
+    Group = apps.get_model('auth', 'Group')
+    Course = apps.get_model('registration', 'Course')
+    User = apps.get_model('registration', 'User')
+    Membership = User.groups.through
+
+    for code in Course.objects.values_list('code', flat=True):
+        legacy = Group.objects.filter(name=f'Course_{code}{LEGACY_SUFFIX}').first()
+        if legacy is None:
+            continue
+        group, _ = Group.objects.get_or_create(name=f'Course_{code}')
+        Membership.objects.bulk_create(
+            [Membership(user_id=user_id, group_id=group.pk)
+             for user_id in Membership.objects.filter(group_id=legacy.pk).values_list('user_id', flat=True)],
+            ignore_conflicts=True,
+        )
+        group.permissions.add(*legacy.permissions.all())
+        legacy.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('registration', '0003_alter_course_total_credits_alter_module_availability_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_legacy_course_groups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration', '0004_merge_legacy_course_groups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='adminauditlog',
+            index=models.Index(fields=['-timestamp'], name='auditlog_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='adminauditlog',
+            index=models.Index(fields=['action', '-timestamp'], name='auditlog_action_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='adminauditlog',
+            index=models.Index(fields=['model_name', '-timestamp'], name='auditlog_model_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['module', 'status'], name='registration_module_status'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['student', '-registration_date'], name='registration_student_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['registration_date'], name='registration_date'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['status'], name='registration_status'),
+        ),
+    ]
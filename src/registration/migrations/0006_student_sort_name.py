@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration', '0005_registration_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='student',
+            options={'ordering': ['sort_name'], 'verbose_name': 'Student', 'verbose_name_plural': 'Students'},
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='sort_name',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=301),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['course', 'sort_name'], name='student_course_name'),
+        ),
+    ]
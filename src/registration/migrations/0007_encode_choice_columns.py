@@ -0,0 +1,117 @@
+"""
+Store status, category, action and model name codes as small integers.
+
+Each column is converted through a temporary integer column: add it, fill
+it with one UPDATE ... CASE, drop the string column and rename the new one.
+Indexes on the converted columns are dropped first and rebuilt at the end.
+Reversible: going back rebuilds the string columns from the integers.
+"""
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+import registration.fields
+
+STATUS = {'P': 1, 'A': 2, 'R': 3, 'W': 4, 'D': 5}
+COURSE_CATEGORY = {'CS': 1, 'MATH': 2, 'ENG': 3, 'BUS': 4, 'ART': 5, 'MED': 6, 'LAW': 7, 'EDU': 8, 'SCI': 9, 'HUM': 10}
+MODULE_CATEGORY = {'CS': 1, 'MATH': 2, 'ENG': 3, 'BUS': 4, 'ART': 5}
+ACTION = {'CREATE': 1, 'UPDATE': 2, 'DELETE': 3, 'VIEW': 4}
+MODEL_NAME = {
+    'Course': 1, 'Module': 2, 'Student': 3, 'Registration': 4, 'Group': 5, 'User': 6, 'PageContent': 7,
+}
+
+
+def encode(model_name, field, encoding):
+    def forwards(apps, schema_editor):
+        model = apps.get_model('registration', model_name)
+        unknown = set(model.objects.exclude(**{f'{field}__in': encoding}).values_list(field, flat=True).distinct())
+        if unknown:
+            raise ValueError(
+                f'{model_name}.{field} has values without a number: {sorted(unknown)}; '
+                'add them to the choices and encoding first'
+            )
+        model.objects.update(**{f'{field}_code': Case(
+            *[When(**{field: code}, then=Value(number)) for code, number in encoding.items()],
+        )})
+
+    def backwards(apps, schema_editor):
+        model = apps.get_model('registration', model_name)
+        model.objects.update(**{field: Case(
+            *[When(**{f'{field}_code': number}, then=Value(code)) for code, number in encoding.items()],
+        )})
+
+    return forwards, backwards
+
+
+def convert(model_name, field, encoding, max_length, new_field):
+    """Operations that turn one string column into an encoded one"""
+    forwards, backwards = encode(model_name, field, encoding)
+    return [
+        migrations.AddField(model_name, f'{field}_code', models.PositiveSmallIntegerField(null=True)),
+        migrations.RunPython(forwards, backwards, elidable=False),
+        # State only: when migrating backwards the string column is re-added
+        # with a default, so existing rows get '' until the data is restored
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(model_name, field, models.CharField(max_length=max_length, default='')),
+        ]),
+        migrations.RemoveField(model_name, field),
+        migrations.RenameField(model_name, f'{field}_code', field),
+        migrations.AlterField(model_name, field, new_field),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration', '0006_student_sort_name'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(model_name='registration', name='registration_module_status'),
+        migrations.RemoveIndex(model_name='registration', name='registration_status'),
+        migrations.RemoveIndex(model_name='adminauditlog', name='auditlog_action_recent'),
+        migrations.RemoveIndex(model_name='adminauditlog', name='auditlog_model_recent'),
+        *convert('registration', 'status', STATUS, 1, registration.fields.EncodedChoiceField(
+            choices=[('P', 'Pending'), ('A', 'Approved'), ('R', 'Rejected'), ('W', 'Waitlisted'), ('D', 'Dropped')],
+            default='P', encoding=STATUS,
+        )),
+        *convert('course', 'category', COURSE_CATEGORY, 10, registration.fields.EncodedChoiceField(
+            choices=[
+                ('CS', 'Computer Science'), ('MATH', 'Mathematics'), ('ENG', 'Engineering'), ('BUS', 'Business'),
+                ('ART', 'Arts'), ('MED', 'Medicine'), ('LAW', 'Law'), ('EDU', 'Education'), ('SCI', 'Science'),
+                ('HUM', 'Humanities'),
+            ],
+            encoding=COURSE_CATEGORY,
+        )),
+        *convert('module', 'category', MODULE_CATEGORY, 10, registration.fields.EncodedChoiceField(
+            'category',
+            choices=[('CS', 'Computer Science'), ('MATH', 'Mathematics'), ('ENG', 'Engineering'), ('BUS', 'Business'), ('ART', 'Arts')],
+            encoding=MODULE_CATEGORY,
+        )),
+        *convert('adminauditlog', 'action', ACTION, 10, registration.fields.EncodedChoiceField(
+            choices=[('CREATE', 'Create'), ('UPDATE', 'Update'), ('DELETE', 'Delete'), ('VIEW', 'View')],
+            encoding=ACTION,
+        )),
+        *convert('adminauditlog', 'model_name', MODEL_NAME, 50, registration.fields.EncodedChoiceField(
+            choices=[
+                ('Course', 'Course'), ('Module', 'Module'), ('Student', 'Student'), ('Registration', 'Registration'),
+                ('Group', 'Group'), ('User', 'User'), ('PageContent', 'Page Content'),
+            ],
+            encoding=MODEL_NAME,
+        )),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['module', 'status'], name='registration_module_status'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['status'], name='registration_status'),
+        ),
+        migrations.AddIndex(
+            model_name='adminauditlog',
+            index=models.Index(fields=['action', '-timestamp'], name='auditlog_action_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='adminauditlog',
+            index=models.Index(fields=['model_name', '-timestamp'], name='auditlog_model_recent'),
+        ),
+    ]
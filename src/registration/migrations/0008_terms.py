@@ -0,0 +1,145 @@
+"""
+Academic terms, term-scoped registrations and the registration archive.
+
+Existing registrations and modules are assigned to one initial term, made
+current. On PostgreSQL and MySQL the archive table is rebuilt as a LIST
+partitioned table on term_id (its primary key becomes (id, term_id));
+registration/terms.py adds a partition per archived term.
+"""
+from datetime import date, timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Min
+from django.utils import timezone
+
+import registration.fields
+import registration.models
+
+ARCHIVE_TABLE = 'registration_registrationarchive'
+
+
+def create_initial_term(apps, schema_editor):
+    Term = apps.get_model('registration', 'Term')
+    Module = apps.get_model('registration', 'Module')
+    ModuleOffering = apps.get_model('registration', 'ModuleOffering')
+    Registration = apps.get_model('registration', 'Registration')
+
+    first = Registration.objects.aggregate(first=Min('registration_date'))['first']
+    year = (timezone.localtime(first) if first else timezone.localtime()).year
+    starts_on = date(year, 1, 1)
+    term = Term.objects.create(
+        code=str(year), name=str(year), starts_on=starts_on,
+        ends_on=date(year + 1, 1, 1) - timedelta(days=1), is_current=True,
+    )
+    ModuleOffering.objects.bulk_create([
+        ModuleOffering(term=term, module_id=pk, capacity=capacity, availability=availability)
+        for pk, capacity, availability in Module.objects.values_list('pk', 'courses_allowed', 'availability')
+    ], batch_size=500)
+    Registration.objects.update(term=term)
+
+
+def partition_archive(apps, schema_editor):
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    table = quote(ARCHIVE_TABLE)
+    if connection.vendor == 'postgresql':
+        old = f'{ARCHIVE_TABLE}_old'
+        schema_editor.execute(f'ALTER TABLE {table} RENAME TO {quote(old)}')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexdef FROM pg_indexes "
+                "WHERE schemaname = current_schema() AND tablename = %s AND indexname <> %s",
+                [old, f'{ARCHIVE_TABLE}_pkey'],
+            )
+            indexes = [row[0] for row in cursor.fetchall()]
+        schema_editor.execute(
+            f'CREATE TABLE {table} (LIKE {quote(old)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY LIST ({quote("term_id")})'
+        )
+        schema_editor.execute(f'DROP TABLE {quote(old)}')
+        schema_editor.execute(f'ALTER TABLE {table} ADD PRIMARY KEY ({quote("id")}, {quote("term_id")})')
+        for indexdef in indexes:
+            schema_editor.execute(indexdef.replace(f'.{old} ', f'.{ARCHIVE_TABLE} '))
+        # Rows of a term without its own partition (should rollover be interrupted)
+        schema_editor.execute(f'CREATE TABLE {quote(f"{ARCHIVE_TABLE}_default")} PARTITION OF {table} DEFAULT')
+    elif connection.vendor == 'mysql':
+        schema_editor.execute(f'ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `term_id`)')
+        schema_editor.execute(f'ALTER TABLE {table} PARTITION BY LIST (`term_id`) (PARTITION t0 VALUES IN (0))')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration', '0007_encode_choice_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Term',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(help_text='e.g. 2026-AUT', max_length=20, unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('starts_on', models.DateField()),
+                ('ends_on', models.DateField()),
+                ('is_current', models.BooleanField(default=False, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-starts_on'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_current', True)), fields=('is_current',), name='term_single_current')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ModuleOffering',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('capacity', models.IntegerField(default=30)),
+                ('availability', models.BooleanField(default=True)),
+                ('module', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offerings', to='registration.module')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offerings', to='registration.term')),
+            ],
+            options={
+                'ordering': ['module__code'],
+                'unique_together': {('term', 'module')},
+            },
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='term',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='registrations', to='registration.term'),
+        ),
+        migrations.RunPython(create_initial_term, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='registration',
+            name='term',
+            field=models.ForeignKey(default=registration.models.current_term_id, on_delete=django.db.models.deletion.PROTECT, related_name='registrations', to='registration.term'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='registration',
+            unique_together={('term', 'student', 'module')},
+        ),
+        migrations.CreateModel(
+            name='RegistrationArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', registration.fields.EncodedChoiceField(choices=[('P', 'Pending'), ('A', 'Approved'), ('R', 'Rejected'), ('W', 'Waitlisted'), ('D', 'Dropped')], encoding={'A': 2, 'D': 5, 'P': 1, 'R': 3, 'W': 4})),
+                ('grade', models.CharField(blank=True, max_length=2, null=True)),
+                ('registration_date', models.DateTimeField()),
+                ('last_modified', models.DateTimeField()),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField()),
+                ('module', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_registrations', to='registration.module')),
+                ('student', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_registrations', to='registration.student')),
+                ('term', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='archived_registrations', to='registration.term')),
+            ],
+            options={
+                'verbose_name': 'Archived Registration',
+                'verbose_name_plural': 'Archived Registrations',
+                'ordering': ['-registration_date'],
+                'indexes': [models.Index(fields=['student', '-registration_date'], name='archive_student_recent'), models.Index(fields=['term', 'module', 'status'], name='archive_term_module_status')],
+            },
+        ),
+        migrations.RunPython(partition_archive, migrations.RunPython.noop),
+    ]
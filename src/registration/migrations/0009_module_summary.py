@@ -0,0 +1,34 @@
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+# Module.SUMMARY_WORDS and the summary column length at the time of writing
+SUMMARY_WORDS = 25
+SUMMARY_LENGTH = 300
+
+
+def fill_summaries(apps, schema_editor):
+    Module = apps.get_model('registration', 'Module')
+    modules = []
+    for module in Module.objects.only('pk', 'description').iterator(chunk_size=500):
+        module.summary = Truncator(Truncator(module.description or '').words(SUMMARY_WORDS, truncate=' …')).chars(SUMMARY_LENGTH)
+        modules.append(module)
+        if len(modules) == 500:
+            Module.objects.bulk_update(modules, ['summary'])
+            modules = []
+    Module.objects.bulk_update(modules, ['summary'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration', '0008_terms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='module',
+            name='summary',
+            field=models.CharField(blank=True, default='', editable=False, max_length=300, verbose_name='summary'),
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
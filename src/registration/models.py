@@ -3,6 +3,9 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser, Group
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from django.utils.text import Truncator
+
+from .fields import EncodedChoiceField
 
 # Custom User Model
 class User(AbstractUser):
@@ -55,7 +58,9 @@ class Course(models.Model):
     
     name = models.CharField(max_length=200)
     code = models.CharField(max_length=20, unique=True)
-    category = models.CharField(max_length=10, choices=COURSE_CHOICES)
+    category = EncodedChoiceField(choices=COURSE_CHOICES, encoding={
+        'CS': 1, 'MATH': 2, 'ENG': 3, 'BUS': 4, 'ART': 5, 'MED': 6, 'LAW': 7, 'EDU': 8, 'SCI': 9, 'HUM': 10,
+    })
     description = models.TextField()
     duration_years = models.IntegerField(
         default=3, 
@@ -110,8 +115,13 @@ class Module(models.Model):
         'credit',
         validators=[MinValueValidator(1), MaxValueValidator(30)]
     )
-    category = models.CharField('category', max_length=10, choices=CATEGORY_CHOICES)
+    category = EncodedChoiceField('category', choices=CATEGORY_CHOICES, encoding={
+        'CS': 1, 'MATH': 2, 'ENG': 3, 'BUS': 4, 'ART': 5,
+    })
     description = models.TextField('description')
+    # The description's first SUMMARY_WORDS words, kept by save() so cards and
+    # list pages never load or truncate the full text
+    summary = models.CharField('summary', max_length=300, blank=True, default='', editable=False)
     availability = models.BooleanField('availability', default=True)
     courses_allowed = models.IntegerField('courses allowed', default=30)
     # Link module to specific courses
@@ -128,15 +138,32 @@ class Module(models.Model):
     if TYPE_CHECKING:
         registrations: 'models.Manager'  # type: ignore
     
+    SUMMARY_WORDS = 25
+    
     def __str__(self):
         return f"{self.code} - {self.name}"
+    
+    @classmethod
+    def summarize(cls, description) -> str:
+        """Value of summary: what ``description|truncatewords:25`` renders"""
+        summary = Truncator(description or '').words(cls.SUMMARY_WORDS, truncate=' …')
+        return Truncator(summary).chars(cls._meta.get_field('summary').max_length)
+    
+    def save(self, *args, **kwargs):
+        """Save with summary taken from the description"""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'description' in update_fields:
+            self.summary = self.summarize(self.description)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'summary'}
+        super().save(*args, **kwargs)
         
     def registered_students_count(self) -> int:
-        return self.registrations.count()
+        return self.registrations.filter(term_id=current_term_id()).count()
     registered_students_count.short_description = 'Registered Students'
     
     def available_slots(self) -> int:
-        return max(0, self.courses_allowed - self.registrations.count())
+        return max(0, self.courses_allowed - self.registered_students_count())
     available_slots.short_description = 'Available Slots'
     
     class Meta:
@@ -193,11 +220,19 @@ class Student(models.Model):
     enrollment_date = models.DateField(default=timezone.now)
     expected_graduation = models.DateField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
+    # The user's "last_name first_name", copied here so the default ordering
+    # is one indexed column instead of a join to registration_user; kept in
+    # sync by save() and registration/sort_names.py
+    sort_name = models.CharField(max_length=301, blank=True, default='', editable=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['user__last_name', 'user__first_name']
+        ordering = ['sort_name']
+        indexes = [
+            # A course's students in name order without a sort step (course_detail, reports)
+            models.Index(fields=['course', 'sort_name'], name='student_course_name'),
+        ]
         verbose_name = 'Student'
         verbose_name_plural = 'Students'
     
@@ -207,39 +242,37 @@ class Student(models.Model):
             return f"{user.get_full_name()} ({self.student_id})"
         return f"Student ({self.student_id})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored course so save() only touches groups when it changes
+        instance._saved_course_id = instance.__dict__.get('course_id')
+        return instance
+
+    @staticmethod
+    def sort_key(first_name, last_name) -> str:
+        """Value of sort_name for a user; the same string the backfill builds in SQL"""
+        return f'{last_name} {first_name}'
+
     def save(self, *args, **kwargs):
-        """Override save to automatically add user to course group"""
+        """Save with sort_name taken from the user, then move the user to the new course's group if the course changed"""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'sort_name' in update_fields:
+            self.sort_name = self.sort_key(self.user.first_name, self.user.last_name)
         super().save(*args, **kwargs)
-        # Only proceed if course is set
-        if hasattr(self, 'course') and self.course is not None:
-            # Get the course instance
-            course = self.course
-            # Create group name based on course code or ID
-            course_code = getattr(course, 'code', None)
-            if course_code is None:
-                # If course has no code attribute, use its string representation
-                course_code = str(course) if course else 'unknown'
-            group_name = f"Course_{course_code}_Group"
-            group, _ = Group.objects.get_or_create(name=group_name)
-            # Add user to the course group
-            user = getattr(self, 'user', None)
-            if user is not None and hasattr(user, 'groups'):
-                user.groups.add(group)
-    
+        if update_fields is not None and 'course' not in update_fields and 'course_id' not in update_fields:
+            return
+        if self.course_id != getattr(self, '_saved_course_id', None):
+            from .course_groups import move_student
+            move_student(self.user_id, self.course_id)
+            self._saved_course_id = self.course_id
+
     def get_course_group(self) -> Optional[Group]:
         """Get the Django Group for this student's course"""
-        if not hasattr(self, 'course') or not self.course:
+        if not self.course_id:
             return None
-            
-        course = self.course
-        course_code = getattr(course, 'code', None)
-        if course_code is None:
-            # If course has no code attribute, use its string representation
-            course_code = str(course) if course else 'unknown'
-        group_name = f"Course_{course_code}_Group"
-        group, _ = Group.objects.get_or_create(name=group_name)
-        return group
-    
+        return self.course.ensure_group_exists()
+
     def get_enrolled_modules(self):
         """Get all modules the student is registered for"""
         from .models import Module, Registration
@@ -251,17 +284,69 @@ class Student(models.Model):
         )
 
     def get_total_credits(self) -> int:
-        """Get total credits earned by the student"""
+        """Get total credits earned by the student, in this and earlier terms"""
         from django.db.models import Sum
-        from .models import Registration
+        from .models import Registration, RegistrationArchive
         
-        result = Registration.objects.filter(
-            student_id=self.pk,
-            status='A'
-        ).aggregate(
-            total=Sum('module__credit')
-        )
-        return int(result['total']) if result['total'] is not None else 0
+        total = 0
+        for model in (Registration, RegistrationArchive):
+            result = model.objects.filter(
+                student_id=self.pk,
+                status='A'
+            ).aggregate(
+                total=Sum('module__credit')
+            )
+            total += int(result['total']) if result['total'] is not None else 0
+        return total
+
+
+def current_term_id():
+    """Primary key of the current term; the default term of new registrations"""
+    from .terms import current_term
+    return current_term().pk
+
+
+class Term(models.Model):
+    """An academic term; registrations and module capacity belong to one"""
+    objects = models.Manager()
+
+    code = models.CharField(max_length=20, unique=True, help_text='e.g. 2026-AUT')
+    name = models.CharField(max_length=100)
+    starts_on = models.DateField()
+    ends_on = models.DateField()
+    # Exactly one term is current: new registrations and seat counts use it.
+    # Change it with ``manage.py rollover_term``, which also archives the
+    # registrations of earlier terms.
+    is_current = models.BooleanField(default=False, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-starts_on']
+        constraints = [
+            models.UniqueConstraint(fields=['is_current'], condition=models.Q(is_current=True), name='term_single_current'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class ModuleOffering(models.Model):
+    """A module in one term's catalog, with that term's capacity and availability"""
+    objects = models.Manager()
+
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name='offerings')
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name='offerings')
+    # The current term's offering mirrors Module.courses_allowed and
+    # Module.availability; a later term's can be edited ahead of rollover
+    capacity = models.IntegerField(default=30)
+    availability = models.BooleanField(default=True)
+
+    class Meta:
+        unique_together = ('term', 'module')
+        ordering = ['module__code']
+
+    def __str__(self):
+        return f"{self.term.code} {self.module.code}"
 
 class Registration(models.Model):
     objects = models.Manager()
@@ -273,26 +358,77 @@ class Registration(models.Model):
         ('D', 'Dropped')
     ]
     
+    STATUS_ENCODING = {'P': 1, 'A': 2, 'R': 3, 'W': 4, 'D': 5}
+    
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='registrations')
     module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name='registrations')
-    status = models.CharField(max_length=1, choices=STATUS_CHOICES, default='P')
+    term = models.ForeignKey(Term, on_delete=models.PROTECT, related_name='registrations', default=current_term_id)
+    status = EncodedChoiceField(choices=STATUS_CHOICES, encoding=STATUS_ENCODING, default='P')
     grade = models.CharField(max_length=2, blank=True, null=True)
     registration_date = models.DateTimeField(auto_now_add=True)
     last_modified = models.DateTimeField(auto_now=True)
     notes = models.TextField(blank=True, null=True)
     
     class Meta:
-        unique_together = ('student', 'module')
+        # Only the current term's registrations live here (earlier terms are
+        # in RegistrationArchive), so a student can take a module again later
+        unique_together = ('term', 'student', 'module')
         ordering = ['-registration_date']
+        # Hot access paths; `manage.py check_query_plans` verifies they are used
+        indexes = [
+            # Seat counts and approved lists per module
+            models.Index(fields=['module', 'status'], name='registration_module_status'),
+            # A student's registrations, newest first
+            models.Index(fields=['student', '-registration_date'], name='registration_student_recent'),
+            # Dashboard trends, recent registrations, admin date hierarchy
+            models.Index(fields=['registration_date'], name='registration_date'),
+            # Dashboard status counts
+            models.Index(fields=['status'], name='registration_status'),
+        ]
         verbose_name = 'Module Registration'
         verbose_name_plural = 'Module Registrations'
     
     def __str__(self):
         return f"{self.student} - {self.module}"
-    
-    def get_status_display(self):
-        """Get the display name for the status"""
-        return dict(self.STATUS_CHOICES).get(self.status, self.status)
+
+
+class RegistrationArchive(models.Model):
+    """
+    Registrations of terms before the current one, moved here in bulk at
+    rollover (registration/terms.py). Rows keep their original id. On
+    PostgreSQL and MySQL the table is LIST-partitioned by term, so the
+    foreign keys are not enforced by the database.
+    """
+    objects = models.Manager()
+
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(
+        Student, on_delete=models.CASCADE, related_name='archived_registrations', db_constraint=False, db_index=False,
+    )
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name='archived_registrations', db_constraint=False)
+    term = models.ForeignKey(
+        Term, on_delete=models.PROTECT, related_name='archived_registrations', db_constraint=False, db_index=False,
+    )
+    status = EncodedChoiceField(choices=Registration.STATUS_CHOICES, encoding=Registration.STATUS_ENCODING)
+    grade = models.CharField(max_length=2, blank=True, null=True)
+    registration_date = models.DateTimeField()
+    last_modified = models.DateTimeField()
+    notes = models.TextField(blank=True, null=True)
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-registration_date']
+        indexes = [
+            # A student's academic history
+            models.Index(fields=['student', '-registration_date'], name='archive_student_recent'),
+            # Per-term reports
+            models.Index(fields=['term', 'module', 'status'], name='archive_term_module_status'),
+        ]
+        verbose_name = 'Archived Registration'
+        verbose_name_plural = 'Archived Registrations'
+
+    def __str__(self):
+        return f"{self.student} - {self.module} ({self.term})"
 
 # Content Management Model for static pages
 class PageContent(models.Model):
@@ -330,10 +466,22 @@ class AdminAuditLog(models.Model):
         ('DELETE', 'Delete'),
         ('VIEW', 'View'),
     ]
+    # The models admin actions are logged for
+    MODEL_CHOICES = [
+        ('Course', 'Course'),
+        ('Module', 'Module'),
+        ('Student', 'Student'),
+        ('Registration', 'Registration'),
+        ('Group', 'Group'),
+        ('User', 'User'),
+        ('PageContent', 'Page Content'),
+    ]
     
     admin_user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
-    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
-    model_name = models.CharField(max_length=50)
+    action = EncodedChoiceField(choices=ACTION_CHOICES, encoding={'CREATE': 1, 'UPDATE': 2, 'DELETE': 3, 'VIEW': 4})
+    model_name = EncodedChoiceField(choices=MODEL_CHOICES, encoding={
+        'Course': 1, 'Module': 2, 'Student': 3, 'Registration': 4, 'Group': 5, 'User': 6, 'PageContent': 7,
+    })
     object_id = models.CharField(max_length=50)
     object_repr = models.CharField(max_length=200)
     timestamp = models.DateTimeField(auto_now_add=True)
@@ -341,6 +489,12 @@ class AdminAuditLog(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        # Admin changelist: newest first, filtered by action, model or date
+        indexes = [
+            models.Index(fields=['-timestamp'], name='auditlog_recent'),
+            models.Index(fields=['action', '-timestamp'], name='auditlog_action_recent'),
+            models.Index(fields=['model_name', '-timestamp'], name='auditlog_model_recent'),
+        ]
         verbose_name = 'Admin Audit Log'
         verbose_name_plural = 'Admin Audit Logs'
     
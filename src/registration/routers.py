@@ -0,0 +1,237 @@
+"""
+Read-replica routing.
+
+Reads go to a replica only inside a replica scope: views decorated with
+``@replica_reads`` (catalog pages, admin dashboard and reports, CSV exports)
+or code run under ``use_replicas()``. Only the models in REPLICA_MODELS are
+read there. Users, groups, permissions and sessions always come from the
+primary. Writes always go to the primary.
+
+Read-your-writes: after a request writes anything, ReplicaMiddleware sets a
+cookie that keeps that browser's reads on the primary for
+REPLICA_STICKY_SECONDS. Later reads in the same request or scope also stay
+on the primary.
+
+Each replica's lag is checked at most every REPLICA_CHECK_INTERVAL seconds
+per process. A replica that is further behind than REPLICA_MAX_LAG, or that
+cannot be reached, is skipped until the next check. When no replica is
+usable, reads fall back to the primary. Versioned cache fills (choices,
+template fragments) run under ``use_primary()``, so a lagging replica
+never stores old rows under a new version.
+
+Replicas are the aliases listed in settings.DATABASE_REPLICAS (see
+config/settings.py and config/production.py).
+"""
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = 'replica_pin'
+
+# Catalog, report and export data; never auth or session rows
+REPLICA_MODELS = {
+    'registration.course', 'registration.module', 'registration.student',
+    'registration.registration', 'registration.pagecontent', 'registration.adminauditlog',
+    'registration.term', 'registration.moduleoffering', 'registration.registrationarchive',
+}
+
+
+class _State:
+    __slots__ = ('replica', 'primary', 'pinned', 'wrote')
+
+    def __init__(self, pinned=False):
+        self.replica = 0  # Depth of replica scopes
+        self.primary = 0  # Depth of use_primary() blocks
+        self.pinned = pinned
+        self.wrote = False
+
+
+# A mutable object, so writes made in sync_to_async threads are seen by the request
+_state = ContextVar('replica_routing', default=None)
+
+
+def replicas() -> list:
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+@contextmanager
+def _scope(attr):
+    state = _state.get()
+    token = None
+    if state is None:
+        state = _State()
+        token = _state.set(state)
+    setattr(state, attr, getattr(state, attr) + 1)
+    try:
+        yield state
+    finally:
+        setattr(state, attr, getattr(state, attr) - 1)
+        if token is not None:
+            _state.reset(token)
+
+
+def use_replicas():
+    """Context manager: read REPLICA_MODELS from a replica until the block ends"""
+    return _scope('replica')
+
+
+def use_primary():
+    """Context manager: read from the primary, even inside a replica scope"""
+    return _scope('primary')
+
+
+def replica_reads(view):
+    """Decorator for read-mostly views and admin actions (sync or async)"""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            with use_replicas():
+                return await view(*args, **kwargs)
+    else:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with use_replicas():
+                return view(*args, **kwargs)
+    return wrapper
+
+
+def replica_lag(alias):
+    """Seconds the replica is behind its primary; None if replication is broken"""
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # An idle primary sends nothing to replay, so a caught-up replica counts as 0
+            cursor.execute(
+                'SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() '
+                'THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+            )
+            return float(cursor.fetchone()[0] or 0)
+        if connection.vendor == 'mysql':
+            try:
+                cursor.execute('SHOW REPLICA STATUS')
+            except DatabaseError:
+                cursor.execute('SHOW SLAVE STATUS')  # MySQL before 8.0.22, MariaDB
+            row = cursor.fetchone()
+            if row is None:
+                return 0.0  # Not replicating: a standalone copy
+            status = dict(zip((column[0] for column in cursor.description), row))
+            lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+            return float(lag) if lag is not None else None
+        # SQLite and others have no replication; check the copy is readable
+        cursor.execute('SELECT 1')
+        return 0.0
+
+
+_health = {}  # alias -> (checked at, usable)
+
+
+def is_usable(alias) -> bool:
+    checked_at, usable = _health.get(alias, (None, False))
+    now = time.monotonic()
+    if checked_at is not None and now - checked_at < settings.REPLICA_CHECK_INTERVAL:
+        return usable
+    try:
+        lag = replica_lag(alias)
+    except DatabaseError as e:
+        lag, reason = None, f'is unreachable ({e})'
+    else:
+        reason = 'is not replicating' if lag is None else f'lags {lag:.1f}s'
+    usable = lag is not None and lag <= settings.REPLICA_MAX_LAG
+    if not usable and _health.get(alias, (None, True))[1]:
+        logger.warning(f"[REPLICA] {alias} {reason}; reading from the primary")
+    elif usable and checked_at is not None and not _health[alias][1]:
+        logger.info(f"[REPLICA] {alias} is back within {settings.REPLICA_MAX_LAG}s")
+    _health[alias] = (now, usable)
+    return usable
+
+
+def health() -> dict:
+    """Usable flag per replica as of the last check in this process"""
+    return {alias: _health.get(alias, (None, None))[1] for alias in replicas()}
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.replica or state.primary or state.pinned or state.wrote:
+            return None
+        if model._meta.label_lower not in REPLICA_MODELS:
+            return None
+        usable = [alias for alias in replicas() if is_usable(alias)]
+        return random.choice(usable) if usable else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        # Saving an instance that was read from a replica
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in replicas():
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        same_data = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in same_data and obj2._state.db in same_data:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema from the primary
+        return False if db in replicas() else None
+
+
+class ReplicaMiddleware:
+    """Pins a browser's reads to the primary for a few seconds after it writes"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state = _State(pinned=self.is_pinned(request))
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(request, response, state)
+
+    async def __acall__(self, request):
+        state = _State(pinned=self.is_pinned(request))
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(request, response, state)
+
+    def is_pinned(self, request) -> bool:
+        try:
+            return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def pin(self, request, response, state):
+        if state.wrote and replicas():
+            sticky = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                PIN_COOKIE, f'{time.time() + sticky:.0f}', max_age=sticky,
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        return response
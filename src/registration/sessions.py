@@ -0,0 +1,88 @@
+"""
+Low-write sessions.
+
+SessionStore is Django's cached_db store, so reads come from the cache and
+writes go to both the cache and django_session. Each save stamps the session
+with its save time. SessionMiddleware writes an unchanged session again only
+once that stamp is older than SESSION_REFRESH_INTERVAL. The expiry still
+slides forward for active users, but most requests write nothing. This
+replaces SESSION_SAVE_EVERY_REQUEST, which wrote on every authenticated hit.
+
+The cached store needs a cache shared by all worker processes. With a
+per-process cache a logout or cycle_key in one worker would leave the old
+session in the others' caches, so settings pick registration.db_sessions
+(the same stamping over django_session alone) instead, and the check
+(registration.E003) is repeated when the middleware is loaded.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.middleware import SessionMiddleware as DjangoSessionMiddleware
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+from .versioning import per_process_cache
+
+REFRESHED_KEY = '_session_refreshed'
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.SESSION_ENGINE != __name__ or not per_process_cache():
+        return []
+    return [checks.Error(
+        'The registration.sessions engine needs a cache shared by all worker processes',
+        hint='Point CACHE_BACKEND at a shared cache such as Redis, or set SESSION_ENGINE to registration.db_sessions.',
+        id='registration.E003',
+    )]
+
+
+class RefreshStampMixin:
+    """Stamp each save so an unchanged session is re-saved only once per SESSION_REFRESH_INTERVAL"""
+
+    def _stamp(self, must_create):
+        session = self._get_session(no_load=must_create)
+        if session:
+            session[REFRESHED_KEY] = int(time.time())
+
+    def save(self, must_create=False):
+        self._stamp(must_create)
+        super().save(must_create)
+
+    async def asave(self, must_create=False):
+        self._stamp(must_create)
+        await super().asave(must_create)
+
+    def is_empty(self):
+        # The save stamp alone does not make a session worth keeping
+        try:
+            return not self._session_key and not (self._session_cache.keys() - {REFRESHED_KEY})
+        except AttributeError:
+            return True
+
+    def needs_refresh(self) -> bool:
+        """True when the stored expiry should slide forward although nothing changed"""
+        refreshed = self.get(REFRESHED_KEY)
+        return refreshed is None or time.time() - refreshed >= settings.SESSION_REFRESH_INTERVAL
+
+
+class SessionStore(RefreshStampMixin, CachedDBStore):
+    pass
+
+
+class SessionMiddleware(DjangoSessionMiddleware):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if settings.SESSION_ENGINE == __name__ and per_process_cache():
+            raise ImproperlyConfigured(
+                'The registration.sessions engine needs a cache shared by all worker processes (see registration.E003)'
+            )
+
+    def process_response(self, request, response):
+        session = getattr(request, 'session', None)
+        needs_refresh = getattr(session, 'needs_refresh', None)
+        if needs_refresh and session.session_key and not session.modified and needs_refresh():
+            # Re-save to extend the expiry in the database and the cookie
+            session.modified = True
+        return super().process_response(request, response)
@@ -1,8 +1,7 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.contrib.auth.models import Group
 from django.utils import timezone
-from .models import Course, Module, Student, Registration, AdminAuditLog
+from .models import Module, Registration, AdminAuditLog
 
 # Import models safely to avoid circular imports
 def get_models():
@@ -45,15 +44,7 @@ def register_signals():
 # Register signals when the function is called
 register_signals()
 
-@receiver(post_save, sender=Course)
-def course_post_save(sender, instance, created, **kwargs):
-    """Signal to handle course changes and ensure immediate effect"""
-    if created:
-        # Create course group when new course is created
-        instance.ensure_group_exists()
-    else:
-        # Update course group when course is modified
-        instance.ensure_group_exists()
+# Course group membership is maintained by registration/course_groups.py
 
 @receiver(post_save, sender=Module)
 def module_post_save(sender, instance, created, **kwargs):
@@ -61,44 +52,12 @@ def module_post_save(sender, instance, created, **kwargs):
     # Any additional module-specific logic can be added here
     pass
 
-@receiver(post_save, sender=Student)
-def student_post_save(sender, instance, created, **kwargs):
-    """Signal to handle student changes and ensure immediate effect"""
-    if instance.course:
-        # Ensure student is added to course group
-        course_group = instance.course.ensure_group_exists()
-        if course_group and instance.user:
-            instance.user.groups.add(course_group)
-
 @receiver(post_save, sender=Registration)
 def registration_post_save(sender, instance, created, **kwargs):
     """Signal to handle registration changes and ensure immediate effect"""
     # Any additional registration-specific logic can be added here
     pass
 
-@receiver(post_delete, sender=Course)
-def course_post_delete(sender, instance, **kwargs):
-    """Signal to handle course deletion"""
-    # Clean up course group when course is deleted
-    try:
-        group_name = instance.get_group_name()
-        group = Group.objects.get(name=group_name)
-        group.delete()
-    except Group.DoesNotExist:
-        pass
-
-@receiver(post_delete, sender=Student)
-def student_post_delete(sender, instance, **kwargs):
-    """Signal to handle student deletion"""
-    # Remove student from course group when student is deleted
-    if instance.course and instance.user:
-        try:
-            group_name = instance.course.get_group_name()
-            group = Group.objects.get(name=group_name)
-            instance.user.groups.remove(group)
-        except Group.DoesNotExist:
-            pass
-
 # Admin action logging signal
 @receiver(post_save, sender=AdminAuditLog)
 def admin_audit_log_post_save(sender, instance, created, **kwargs):
@@ -0,0 +1,52 @@
+"""
+Student sign-up.
+
+``sign_up`` turns a validated UserRegistrationForm into a logged-in student.
+The password is hashed once, by the form. The new user is logged in directly
+instead of going through authenticate(), which would hash it a second time.
+The user, the Students group membership and the student profile are created
+in one transaction with three INSERTs. The Students group is looked up (one
+indexed SELECT) in the same transaction, so a group deleted or recreated by
+another worker is never referenced.
+"""
+from django.conf import settings
+from django.contrib.auth import login
+from django.contrib.auth.models import Group
+from django.db import router, transaction
+
+from .models import Student, User
+
+STUDENTS_GROUP = 'Students'
+
+
+def create_student(form) -> User:
+    """Create the user, Students membership and empty profile from a valid form"""
+    with transaction.atomic(using=router.db_for_write(User)):
+        group_id = Group.objects.get_or_create(name=STUDENTS_GROUP)[0].pk
+        # Hashes the password (once)
+        user = form.save(commit=False)
+        user.is_student = True
+        user.is_teacher = False  # Explicitly set to False for student registration
+        user.save()
+
+        # A brand-new user has no memberships, so skip groups.add()'s lookup
+        User.groups.through.objects.create(user_id=user.pk, group_id=group_id)
+
+        # Create student profile with default values
+        Student.objects.create(
+            user=user,
+            student_id=f"STU{user.id:05d}",  # Generate a student ID
+            date_of_birth='2000-01-01',
+            address='',
+            city='',
+            country='',
+            # Note: course will need to be set later in profile completion
+        )
+    return user
+
+
+def sign_up(request, form) -> User:
+    """Create a student from a valid UserRegistrationForm and log them in"""
+    user = create_student(form)
+    login(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
+    return user
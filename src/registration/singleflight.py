@@ -0,0 +1,108 @@
+"""
+Single-flight coalescing for expensive read computations.
+
+Concurrent callers asking for the same key share one computation. Within a
+worker, followers block on the leader's in-flight call. Across workers, the
+leader holds a short lock in the Django cache, and the other workers poll for
+the result it publishes there. Keys embed the data versions the computation
+depends on (see versioning.py), so a shared result is never stale.
+
+Cross-worker coalescing needs a shared cache backend (CACHE_BACKEND); with
+the default local-memory cache only the in-process half applies.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+
+from .versioning import get_versions
+
+logger = logging.getLogger(__name__)
+
+RESULT_TTL = 30  # Seconds a finished result is shared with late arrivals
+LOCK_TIMEOUT = 60  # Seconds before a crashed leader's lock expires
+POLL_INTERVAL = 0.05  # Seconds between result polls by other workers
+
+_MISSING = object()
+
+
+def make_key(view_name, params=None, depends_on=()) -> str:
+    """Key for a computation: view name, request parameters and data versions"""
+    raw = json.dumps(
+        [view_name, sorted((params or {}).items()), get_versions(*depends_on) if depends_on else {}],
+        sort_keys=True, default=str,
+    )
+    return f"{view_name}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, ttl=RESULT_TTL):
+        """Return ``fn()``, sharing one evaluation among concurrent callers of ``key``"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_shared(key, fn, ttl)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _do_shared(self, key, fn, ttl):
+        result_key = f'singleflight:result:{key}'
+        lock_key = f'singleflight:lock:{key}'
+
+        result = cache.get(result_key, _MISSING)
+        if result is not _MISSING:
+            return result
+
+        if cache.add(lock_key, 1, LOCK_TIMEOUT):
+            try:
+                result = fn()
+                cache.set(result_key, result, ttl)
+                return result
+            finally:
+                cache.delete(lock_key)
+
+        # Another worker is computing the same thing; wait for it to publish
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            result = cache.get(result_key, _MISSING)
+            if result is not _MISSING:
+                return result
+            if cache.get(lock_key) is None:
+                # The leader gave up without a result (error); compute ourselves
+                break
+        logger.warning(f"[SINGLEFLIGHT] No shared result for {key}; computing locally")
+        return fn()
+
+
+single_flight = SingleFlight()
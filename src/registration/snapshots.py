@@ -0,0 +1,318 @@
+"""
+Dataset snapshots: copy every table to gzipped CSV files and load them back.
+
+``snapshot`` streams each table from one consistent read transaction into
+``<table>.csv.gz`` and writes manifest.json (tables, columns, row counts and
+the applied migrations). Values are written in one neutral form: NULL as
+``\\N``, booleans as 1/0 and datetimes as naive UTC, so a snapshot taken on
+one backend loads on another.
+
+``restore`` empties the snapshot's tables and loads them with the backend's
+bulk path: COPY FROM STDIN on PostgreSQL, LOAD DATA LOCAL INFILE on MySQL
+(batched inserts when local_infile is disabled) and batched executemany on
+SQLite. Foreign keys are checked once at commit (PostgreSQL's deferrable
+constraints, SQLite's defer_foreign_keys) or not at all during the load
+(MySQL's foreign_key_checks). Rows are copied as stored, so no model
+save() or signals run; sequences are reset, statistics refreshed and the
+cache cleared afterwards.
+"""
+import csv
+import gzip
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management.color import no_style
+from django.db import DatabaseError, connections, transaction
+from django.db.migrations.recorder import MigrationRecorder
+from django.utils import timezone
+
+from .models import RegistrationArchive, Term
+from .terms import add_archive_partition, archive_partitioned
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+NULL = '\\N'
+BATCH_SIZE = 5000  # Rows per fetchmany() and executemany()
+COPY_CHUNK = 1 << 20  # Bytes per write into COPY
+EXCLUDE = {'sessions.session'}  # Never copy live sessions off a server
+
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+
+class SnapshotError(Exception):
+    """A snapshot that cannot be read or does not fit this database"""
+
+
+def snapshot_models(exclude=()) -> list:
+    """Models whose tables a snapshot holds, one per table, in registry order"""
+    exclude = EXCLUDE | {label.lower() for label in exclude}
+    models, tables = [], set()
+    for model in apps.get_models(include_auto_created=True):
+        opts = model._meta
+        if not opts.managed or opts.proxy or opts.swapped or opts.label_lower in exclude or opts.db_table in tables:
+            continue
+        tables.add(opts.db_table)
+        models.append(model)
+    return models
+
+
+def applied_migrations(using) -> dict:
+    applied = {}
+    for app_label, name in MigrationRecorder(connections[using]).applied_migrations():
+        applied.setdefault(app_label, []).append(name)
+    return {app_label: sorted(names) for app_label, names in sorted(applied.items())}
+
+
+def encode(value):
+    """A column value in the snapshot's neutral text form"""
+    if value is None:
+        return NULL
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = value.astimezone(dt_timezone.utc).replace(tzinfo=None)
+        return value.isoformat(' ')
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, (bytes, memoryview)):
+        raise SnapshotError('Binary columns are not supported in snapshots')
+    return value
+
+
+def _stream_cursor(connection):
+    """A cursor that fetches rows from the server as they are read"""
+    if connection.vendor == 'mysql':
+        # mysqlclient's default cursor buffers the whole result in memory
+        from MySQLdb.cursors import SSCursor
+
+        connection.ensure_connection()
+        return connection.connection.cursor(SSCursor)
+    # A named (server-side) cursor on PostgreSQL; SQLite reads lazily anyway
+    return connection.chunked_cursor()
+
+
+def snapshot(path, using, exclude=(), compresslevel=1, progress=None) -> dict:
+    """Write every table to ``path``; returns the manifest"""
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    os.makedirs(path, exist_ok=True)
+    manifest = {
+        'format': FORMAT_VERSION,
+        'created_at': timezone.now().isoformat(),
+        'vendor': connection.vendor,
+        'migrations': applied_migrations(using),
+        'tables': [],
+    }
+    # One read transaction, so every table comes from the same moment
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+        for model in snapshot_models(exclude):
+            started = time.monotonic()
+            table = model._meta.db_table
+            columns = [field.column for field in model._meta.local_concrete_fields]
+            filename = f'{table}.csv.gz'
+            rows = 0
+            cursor = _stream_cursor(connection)
+            try:
+                cursor.execute(f"SELECT {', '.join(quote(column) for column in columns)} FROM {quote(table)}")
+                with gzip.open(os.path.join(path, filename), 'wt', compresslevel=compresslevel, newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f, lineterminator='\n')
+                    writer.writerow(columns)
+                    while batch := cursor.fetchmany(BATCH_SIZE):
+                        writer.writerows([encode(value) for value in row] for row in batch)
+                        rows += len(batch)
+            finally:
+                cursor.close()
+            manifest['tables'].append({
+                'model': model._meta.label_lower, 'table': table, 'columns': columns, 'rows': rows, 'file': filename,
+            })
+            if progress:
+                progress(table, rows, time.monotonic() - started)
+    with open(os.path.join(path, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(path) -> dict:
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot format {manifest.get('format')}")
+    return manifest
+
+
+def _read_rows(filename):
+    """Rows of a snapshot file as DB-API parameters, header skipped"""
+    with gzip.open(filename, 'rt', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            yield [None if value == NULL else value for value in row]
+
+
+def _insert_batches(connection, table, columns, filename) -> int:
+    quote = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {quote(table)} ({', '.join(quote(column) for column in columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))})"
+    )
+    rows = 0
+    batch = []
+    with connection.cursor() as cursor:
+        for row in _read_rows(filename):
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                cursor.executemany(sql, batch)
+                rows += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            rows += len(batch)
+    return rows
+
+
+def _copy(connection, table, columns, filename) -> int:
+    """PostgreSQL: stream the gzipped CSV into COPY FROM STDIN"""
+    quote = connection.ops.quote_name
+    sql = (
+        f"COPY {quote(table)} ({', '.join(quote(column) for column in columns)}) "
+        f"FROM STDIN WITH (FORMAT csv, HEADER true, NULL '{NULL}')"
+    )
+    with connection.cursor() as cursor, gzip.open(filename, 'rb') as f:
+        raw = cursor.cursor
+        if hasattr(raw, 'copy'):  # psycopg 3
+            with raw.copy(sql) as copy:
+                while data := f.read(COPY_CHUNK):
+                    copy.write(data)
+        else:  # psycopg2
+            raw.copy_expert(sql, f, size=COPY_CHUNK)
+        return raw.rowcount
+
+
+def _load_data(connection, table, columns, filename) -> int:
+    """MySQL: LOAD DATA LOCAL INFILE from a decompressed copy of the file"""
+    quote = connection.ops.quote_name
+    variables = [f'@c{n}' for n in range(len(columns))]
+    assignments = ', '.join(f'{quote(column)} = NULLIF({var}, %s)' for column, var in zip(columns, variables))
+    with tempfile.NamedTemporaryFile(suffix='.csv') as plain:
+        with gzip.open(filename, 'rb') as f:
+            shutil.copyfileobj(f, plain, COPY_CHUNK)
+        plain.flush()
+        with connection.cursor() as cursor:
+            # No backslash escapes: the file is plain CSV with doubled quotes
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {quote(table)} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                f"LINES TERMINATED BY '\\n' IGNORE 1 LINES ({', '.join(variables)}) SET {assignments}",
+                [plain.name, *[NULL] * len(columns)],
+            )
+            return cursor.rowcount
+
+
+def _archive_partitions(manifest, path, using):
+    """Create archive partitions for the snapshot's terms before loading (MySQL has no default partition)"""
+    tables = {entry['table']: entry for entry in manifest['tables']}
+    terms = tables.get(Term._meta.db_table)
+    if RegistrationArchive._meta.db_table not in tables or terms is None or not archive_partitioned(using):
+        return
+    position = terms['columns'].index(Term._meta.pk.column)
+    for row in _read_rows(os.path.join(path, terms['file'])):
+        add_archive_partition(row[position], using)
+
+
+def restore(path, using, check_migrations=True, progress=None) -> int:
+    """Replace the snapshot's tables in ``using`` with its rows; returns the number of rows loaded"""
+    manifest = read_manifest(path)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    models = []
+    for entry in manifest['tables']:
+        try:
+            models.append(apps.get_model(entry['model']))
+        except LookupError:
+            raise SnapshotError(f"Snapshot table {entry['table']} belongs to {entry['model']}, which is not installed")
+    if check_migrations:
+        applied = applied_migrations(using)
+        differ = sorted(
+            app_label for app_label in {*applied, *manifest['migrations']}
+            if applied.get(app_label) != manifest['migrations'].get(app_label)
+        )
+        if differ:
+            raise SnapshotError(
+                f"The snapshot was taken at other migrations of {', '.join(differ)}; migrate this database to match"
+            )
+
+    tables = [quote(entry['table']) for entry in manifest['tables']]
+    if connection.vendor == 'mysql':
+        # TRUNCATE and partition DDL commit implicitly, so they run before the load transaction
+        with connection.cursor() as cursor:
+            cursor.execute('SET foreign_key_checks = 0, unique_checks = 0')
+            for table in tables:
+                cursor.execute(f'TRUNCATE TABLE {table}')
+        _archive_partitions(manifest, path, using)
+
+    loaded = 0
+    try:
+        with transaction.atomic(using=using):
+            if connection.vendor == 'postgresql':
+                # Django creates foreign keys DEFERRABLE INITIALLY DEFERRED: checked at COMMIT
+                with connection.cursor() as cursor:
+                    cursor.execute(f"TRUNCATE {', '.join(tables)}")
+                _archive_partitions(manifest, path, using)
+            elif connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA defer_foreign_keys = ON')
+                    for table in tables:
+                        cursor.execute(f'DELETE FROM {table}')
+            local_infile = True
+            for entry in manifest['tables']:
+                started = time.monotonic()
+                filename = os.path.join(path, entry['file'])
+                if connection.vendor == 'postgresql':
+                    rows = _copy(connection, entry['table'], entry['columns'], filename)
+                    if rows < 0:
+                        rows = entry['rows']
+                elif connection.vendor == 'mysql' and local_infile:
+                    try:
+                        rows = _load_data(connection, entry['table'], entry['columns'], filename)
+                    except DatabaseError as e:
+                        # local_infile is off on the server or in the client OPTIONS
+                        logger.warning(f"[SNAPSHOT] LOAD DATA LOCAL unavailable ({e}); using batched inserts")
+                        local_infile = False
+                        rows = _insert_batches(connection, entry['table'], entry['columns'], filename)
+                else:
+                    rows = _insert_batches(connection, entry['table'], entry['columns'], filename)
+                loaded += rows
+                if progress:
+                    progress(entry['table'], rows, time.monotonic() - started)
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+    finally:
+        if connection.vendor == 'mysql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET foreign_key_checks = 1, unique_checks = 1')
+
+    # Fresh planner statistics, as on the server the snapshot came from
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('ANALYZE')
+        else:
+            for table in tables:
+                cursor.execute(f"{'ANALYZE TABLE' if connection.vendor == 'mysql' else 'ANALYZE'} {table}")
+    # Cached rows and version stamps describe the old data
+    cache.clear()
+    return loaded
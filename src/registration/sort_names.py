@@ -0,0 +1,55 @@
+"""
+Student.sort_name, the denormalized name the default Student ordering uses.
+
+Student.save() fills it from the user. Renaming a user updates the user's
+student row here, in one UPDATE. queryset.update() on user names bypasses
+signals; ``manage.py backfill_sort_names`` repairs such rows (and fills the
+column after the migration that added it) in primary-key chunks, building
+the expected value in SQL so no rows are loaded into Python.
+"""
+import logging
+
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Concat
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Student, User
+from .student_context import STUDENT_PROFILE
+from .versioning import STUDENTS, bump_version
+
+logger = logging.getLogger(__name__)
+
+NAME_FIELDS = {'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not NAME_FIELDS & set(update_fields)):
+        return
+    sort_name = Student.sort_key(instance.first_name, instance.last_name)
+    Student.objects.filter(user_id=instance.pk).exclude(sort_name=sort_name).update(sort_name=sort_name)
+    if STUDENT_PROFILE.is_cached(instance) and STUDENT_PROFILE.get_cached_value(instance) is not None:
+        STUDENT_PROFILE.get_cached_value(instance).sort_name = sort_name
+
+
+def backfill(batch_size=1000, dry_run=False) -> int:
+    """Set every stale sort_name, ``batch_size`` students at a time; returns the number changed"""
+    expected = Subquery(
+        User.objects.filter(pk=OuterRef('user_id'))
+        .annotate(sort_name=Concat('last_name', Value(' '), 'first_name'))
+        .values('sort_name')[:1]
+    )
+    changed = 0
+    last_pk = 0
+    while True:
+        ids = list(Student.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        last_pk = ids[-1]
+        stale = Student.objects.filter(pk__in=ids).alias(expected=expected).exclude(sort_name=F('expected'))
+        changed += stale.count() if dry_run else stale.update(sort_name=expected)
+    if changed and not dry_run:
+        bump_version(STUDENTS)
+        logger.info(f"[SORT_NAMES] Updated {changed} student sort names")
+    return changed
@@ -0,0 +1,74 @@
+"""
+Request-scoped student context.
+
+StudentContextMiddleware attaches ``request.student_context``. The
+``student_context`` context processor exposes the same object to templates.
+The object resolves the current user's student profile (with course) and a
+summary of their registrations. Each is loaded lazily, at most once per
+request, and reuses the profile the cached auth backend already attached.
+Views and templates read it instead of querying
+``Student.objects.get(user=...)`` or following ``user.student_profile``.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import cached_property
+
+from .models import Registration, Student, User, current_term_id
+
+STUDENT_PROFILE = User._meta.get_field('student_profile')
+
+
+class StudentContext:
+    def __init__(self, request):
+        self.request = request
+
+    @cached_property
+    def student(self):
+        """The user's Student with course loaded, or None"""
+        # Read request.user late: async views replace it after the middleware ran
+        user = self.request.user
+        if not user.is_authenticated:
+            return None
+        if STUDENT_PROFILE.is_cached(user):
+            return STUDENT_PROFILE.get_cached_value(user)
+        student = Student.objects.select_related('course').filter(user_id=user.pk).first()
+        STUDENT_PROFILE.set_cached_value(user, student)
+        if student is not None:
+            Student.user.field.set_cached_value(student, user)
+        return student
+
+    @property
+    def course(self):
+        return self.student.course if self.student else None
+
+    @cached_property
+    def registrations(self) -> dict:
+        """Registration status by module id for the student this term, from one query"""
+        if self.student is None:
+            return {}
+        return dict(
+            Registration.objects.filter(student=self.student, term_id=current_term_id()).values_list('module_id', 'status')
+        )
+
+    @property
+    def approved_count(self) -> int:
+        return sum(1 for status in self.registrations.values() if status == 'A')
+
+
+class StudentContextMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.student_context = StudentContext(request)
+        return self.get_response(request)
+
+
+def student_context(request):
+    """Template context processor: ``student_context``"""
+    context = getattr(request, 'student_context', None)
+    return {'student_context': context if context is not None else StudentContext(request)}
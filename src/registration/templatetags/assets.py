@@ -0,0 +1,17 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from registration.assets import output_path, sources
+
+register = template.Library()
+
+
+@register.simple_tag
+def bundle(name):
+    """Link a static asset bundle: the built file, or its sources when DEBUG is on"""
+    paths = sources(name) if settings.DEBUG else [output_path(name)]
+    if name.endswith('.css'):
+        return format_html_join('\n', '<link rel="stylesheet" href="{}">', ((static(path),) for path in paths))
+    return format_html_join('\n', '<script src="{}"></script>', ((static(path),) for path in paths))
@@ -0,0 +1,84 @@
+"""
+Template fragment caching keyed on the data a fragment shows.
+
+    {% load fragments %}
+    {% cachefragment 'module-card' module %} ... {% endcachefragment %}
+    {% cachefragment 'featured-modules' None user.is_authenticated %} ... {% endcachefragment %}
+
+The key combines the fragment name, the object's model, primary key and
+``updated_at``, the catalog version (see versioning.py) and any further
+vary-on values. Editing the object or anything in the catalog therefore
+changes the key; the TTL only bounds memory. Keep per-user or per-request
+output (CSRF tokens, registration state, live seat counts) outside the
+block, or pass it as a vary-on value.
+
+Caching is skipped when settings.TEMPLATE_FRAGMENT_CACHE is off, which is
+the default under DEBUG so template edits show up at once. It is also
+skipped with a per-process cache: the catalog bumps of one worker never
+reach the others, which would serve the old fragment until the TTL ran out.
+"""
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+
+from registration.routers import use_primary
+from registration.versioning import CATALOG, get_version, per_process_cache
+
+register = template.Library()
+
+FRAGMENT_TTL = 3600  # Seconds; invalidation is by key, not by expiry
+
+
+def fragment_key(name, obj, vary_on, catalog_version) -> str:
+    parts = [str(catalog_version)]
+    if obj is not None:
+        updated_at = getattr(obj, 'updated_at', None)
+        parts += [obj._meta.label_lower, str(obj.pk), updated_at.isoformat() if updated_at else '']
+    parts += [str(value) for value in vary_on]
+    digest = hashlib.md5(':'.join(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'fragment:{name}:{digest}'
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, name, obj, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.obj = obj
+        self.vary_on = vary_on
+
+    def render(self, context):
+        if not getattr(settings, 'TEMPLATE_FRAGMENT_CACHE', not settings.DEBUG) or per_process_cache():
+            return self.nodelist.render(context)
+        # One version read per template render, however many fragments it has
+        if 'fragment_catalog_version' not in context.render_context:
+            context.render_context['fragment_catalog_version'] = get_version(CATALOG)
+        key = fragment_key(
+            self.name.resolve(context),
+            self.obj.resolve(context),
+            [value.resolve(context) for value in self.vary_on],
+            context.render_context['fragment_catalog_version'],
+        )
+        fragment = cache.get(key)
+        if fragment is None:
+            # Lazy querysets in the block read the primary, so a lagging
+            # replica cannot store old content under the current version
+            with use_primary():
+                fragment = self.nodelist.render(context)
+            cache.set(key, fragment, FRAGMENT_TTL)
+        return fragment
+
+
+@register.tag
+def cachefragment(parser, token):
+    """Cache the enclosed output; see the module docstring"""
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name and an object (or None)")
+    nodelist = parser.parse(('endcachefragment',))
+    parser.delete_first_token()
+    return FragmentCacheNode(
+        nodelist, parser.compile_filter(bits[1]), parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
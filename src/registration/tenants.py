@@ -0,0 +1,210 @@
+"""
+Multi-tenant routing: one deployment serving several academies.
+
+settings.TENANTS maps each tenant's name to its host names. Every tenant has
+its own database alias, ``tenant_<name>`` (config/settings.py builds them):
+a database per tenant on the default database's server, or a schema per
+tenant in the default database with TENANT_ISOLATION=schema (PostgreSQL).
+
+TenantMiddleware activates the tenant that owns the request's host name.
+Hosts that belong to no tenant, management commands and other code run
+outside a request use settings.TENANT, or the default database when it is
+empty, so ``TENANT=north python manage.py rollover_term ...`` acts on one
+tenant. While a tenant is active, TenantRouter sends all of its queries to
+its alias (read replicas only serve the default database), cache keys carry
+its name (cache_key, the KEY_FUNCTION in settings.CACHES) and uploaded files
+live under MEDIA_ROOT/<name>/ (TenantFileSystemStorage). Tenants share the
+worker pool, the cache and the media volume without seeing each other's
+data. ``manage.py bootstrap --all-tenants`` creates and migrates every
+tenant's database in parallel.
+"""
+import logging
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import FileSystemStorage
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.dispatch import receiver
+from django.http.request import split_domain_port
+
+logger = logging.getLogger(__name__)
+
+
+class Tenant:
+    __slots__ = ('name', 'alias', 'hosts')
+
+    def __init__(self, name, hosts=()):
+        self.name = name
+        self.alias = f'tenant_{name}' if name else DEFAULT_DB_ALIAS
+        self.hosts = tuple(hosts)
+
+    @property
+    def is_default(self) -> bool:
+        return not self.name
+
+    def __repr__(self):
+        return f'<Tenant {self.name or "(default)"}>'
+
+
+DEFAULT_TENANT = Tenant('')
+
+_current = ContextVar('tenant', default=None)
+
+
+@lru_cache(maxsize=None)
+def _registry():
+    by_name = {name: Tenant(name, hosts) for name, hosts in settings.TENANTS.items()}
+    by_host = {host: tenant for tenant in by_name.values() for host in tenant.hosts}
+    return by_name, by_host
+
+
+@receiver(setting_changed)
+def tenants_changed(setting, **kwargs):
+    if setting == 'TENANTS':
+        _registry.cache_clear()
+
+
+def all_tenants() -> list:
+    """Configured tenants, in settings order"""
+    return list(_registry()[0].values())
+
+
+def get_tenant(name) -> Tenant:
+    """The tenant called ``name``; an empty name is the default database"""
+    if not name:
+        return DEFAULT_TENANT
+    try:
+        return _registry()[0][name]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown tenant {name!r}; TENANTS has {', '.join(_registry()[0]) or 'none'}")
+
+
+def fallback_tenant() -> Tenant:
+    """The tenant for unknown hosts and for code run outside a request"""
+    return get_tenant(settings.TENANT)
+
+
+def tenant_for_host(host) -> Tenant:
+    return _registry()[1].get(host.lower()) or fallback_tenant()
+
+
+def current_tenant() -> Tenant:
+    return _current.get() or fallback_tenant()
+
+
+@contextmanager
+def use_tenant(tenant):
+    """Context manager: route queries, cache keys and files to ``tenant`` (a Tenant or a name)"""
+    if not isinstance(tenant, Tenant):
+        tenant = get_tenant(tenant)
+    token = _current.set(tenant)
+    try:
+        yield tenant
+    finally:
+        _current.reset(token)
+
+
+class TenantRouter:
+    """Sends every query made for a tenant to its database; the default tenant falls through to ReplicaRouter"""
+
+    def db_for_read(self, model, **hints):
+        tenant = current_tenant()
+        return None if tenant.is_default else tenant.alias
+
+    def db_for_write(self, model, **hints):
+        tenant = current_tenant()
+        return None if tenant.is_default else tenant.alias
+
+
+class TenantMiddleware:
+    """Activates the tenant that owns the request's host name"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with use_tenant(self.resolve(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with use_tenant(self.resolve(request)):
+            return await self.get_response(request)
+
+    def resolve(self, request) -> Tenant:
+        host, _ = split_domain_port(request.get_host())
+        request.tenant = tenant_for_host(host)
+        return request.tenant
+
+
+def cache_key(key, key_prefix, version) -> str:
+    """KEY_FUNCTION for settings.CACHES: Django's key format, plus the tenant's name"""
+    tenant = current_tenant()
+    if tenant.is_default:
+        return f'{key_prefix}:{version}:{key}'
+    return f'{key_prefix}:{version}:@{tenant.name}:{key}'
+
+
+class TenantFileSystemStorage(FileSystemStorage):
+    """Media storage with each tenant's files in MEDIA_ROOT/<name>/, served from MEDIA_URL<name>/"""
+
+    @property
+    def location(self):
+        tenant = current_tenant()
+        location = super().location
+        return location if tenant.is_default else os.path.join(location, tenant.name)
+
+    @property
+    def base_url(self):
+        tenant = current_tenant()
+        base_url = super().base_url
+        return base_url if tenant.is_default or base_url is None else f'{base_url}{tenant.name}/'
+
+
+def provision(tenant) -> bool:
+    """Create the tenant's database or schema if it does not exist yet; True if it was created"""
+    connection = connections[tenant.alias]
+    name = str(connection.settings_dict['NAME'])
+    if settings.TENANT_ISOLATION == 'schema' and connection.vendor != 'postgresql':
+        raise ImproperlyConfigured('TENANT_ISOLATION=schema needs PostgreSQL')
+    if connection.vendor == 'sqlite':
+        # The file is created by the first connection
+        os.makedirs(os.path.dirname(os.path.abspath(name)), exist_ok=True)
+        return not os.path.exists(name)
+
+    # Database and schema DDL runs on the default database's server
+    server = connections[DEFAULT_DB_ALIAS]
+    quote = server.ops.quote_name
+    with server.cursor() as cursor:
+        if server.vendor == 'postgresql' and settings.TENANT_ISOLATION == 'schema':
+            cursor.execute('SELECT 1 FROM information_schema.schemata WHERE schema_name = %s', [tenant.name])
+            if cursor.fetchone():
+                return False
+            cursor.execute(f'CREATE SCHEMA {quote(tenant.name)}')
+        elif server.vendor == 'postgresql':
+            cursor.execute('SELECT 1 FROM pg_database WHERE datname = %s', [name])
+            if cursor.fetchone():
+                return False
+            # CREATE DATABASE cannot run in a transaction; the connection is in autocommit
+            cursor.execute(f'CREATE DATABASE {quote(name)}')
+        elif server.vendor == 'mysql':
+            cursor.execute('SELECT 1 FROM information_schema.schemata WHERE schema_name = %s', [name])
+            if cursor.fetchone():
+                return False
+            cursor.execute(f'CREATE DATABASE {quote(name)} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci')
+        else:
+            raise ImproperlyConfigured(f'Cannot create tenant databases on {server.vendor}')
+    logger.info(f"[TENANTS] Created {'schema' if settings.TENANT_ISOLATION == 'schema' else 'database'} for {tenant.name}")
+    return True
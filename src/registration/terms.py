@@ -0,0 +1,232 @@
+"""
+Academic terms: the current term and rolling over to the next one.
+
+Registration holds the current term's registrations. Rolling over to a new
+term moves the registrations of earlier terms to RegistrationArchive in one
+INSERT ... SELECT and one DELETE, so seat counts, reports and
+my_registrations only ever read the current term's rows. On PostgreSQL and
+MySQL the archive is natively LIST-partitioned by term (a partition is added
+per archived term); elsewhere it is a plain table indexed by term.
+
+Each term has a catalog of ModuleOffering rows (capacity and availability per
+module). Rollover clones the outgoing term's catalog into the new term in
+bulk, keeping any offerings already prepared for it, and applies the new
+term's offerings to the modules.
+"""
+import logging
+from datetime import date
+
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import OuterRef, Subquery
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .availability import publish_modules
+from .models import Module, ModuleOffering, Registration, RegistrationArchive, Term
+from .routers import use_primary
+from .tenants import current_tenant
+from .versioning import CATALOG, REGISTRATIONS, bump_version, get_version, per_process_cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_TIMEOUT = 300
+
+
+class NoCurrentTermError(Exception):
+    """Raised when no term is current; ``manage.py bootstrap`` or ``rollover_term`` makes one current"""
+
+
+# Tenant name -> (cache key, term) last seen by this process
+_loaded = {}
+
+
+def current_term() -> Term:
+    """The current term, cached per catalog version (per request with a per-process cache)"""
+    tenant = current_tenant().name
+    key = f'term:current:{get_version(CATALOG)}'
+    loaded_key, term = _loaded.get(tenant, (None, None))
+    if loaded_key == key:
+        return term
+    # rollover_term run from the command line bumps the version in its own
+    # cache only; workers that cannot see the bump re-read the term once per
+    # request instead (see forget_current_term)
+    shared = not per_process_cache()
+    term = cache.get(key) if shared else None
+    if term is None:
+        with use_primary():
+            term = Term.objects.filter(is_current=True).first()
+        if term is None:
+            raise NoCurrentTermError('No current term; run manage.py bootstrap or rollover_term')
+        if shared:
+            cache.set(key, term, CACHE_TIMEOUT)
+    _loaded[tenant] = (key, term)
+    return term
+
+
+@receiver(request_started)
+def forget_current_term(sender, **kwargs):
+    if per_process_cache():
+        _loaded.clear()
+
+
+def ensure_current_term():
+    """Make a term current on a database that has none; returns the term made current, or None"""
+    using = router.db_for_write(Term)
+    with transaction.atomic(using=using):
+        if Term.objects.filter(is_current=True).exists():
+            return None
+        term = Term.objects.order_by('-starts_on').first()
+        if term is None:
+            year = timezone.localdate().year
+            term, _ = Term.objects.get_or_create(code=str(year), defaults={
+                'name': str(year), 'starts_on': date(year, 1, 1), 'ends_on': date(year, 12, 31),
+            })
+        Term.objects.filter(pk=term.pk).update(is_current=True)
+    # A queryset update bypasses term_changed
+    bump_version(CATALOG)
+    logger.warning(f"[TERMS] No current term, made {term.code} current")
+    return term
+
+
+def archive_partitioned(using=DEFAULT_DB_ALIAS) -> bool:
+    return connections[using].vendor in ('postgresql', 'mysql')
+
+
+def add_archive_partition(term_id, using=DEFAULT_DB_ALIAS):
+    """Create the archive partition for a term if the database partitions the archive"""
+    connection = connections[using]
+    table = RegistrationArchive._meta.db_table
+    quote = connection.ops.quote_name
+    term_id = int(term_id)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {quote(f"{table}_t{term_id}")} '
+                f'PARTITION OF {quote(table)} FOR VALUES IN ({term_id})'
+            )
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT 1 FROM information_schema.partitions '
+                'WHERE table_schema = DATABASE() AND table_name = %s AND partition_name = %s',
+                [table, f't{term_id}'],
+            )
+            if cursor.fetchone() is None:
+                cursor.execute(f'ALTER TABLE {quote(table)} ADD PARTITION (PARTITION t{term_id} VALUES IN ({term_id}))')
+
+
+def archive_registrations(term_ids, using=DEFAULT_DB_ALIAS) -> int:
+    """Move the registrations of ``term_ids`` to the archive; returns the number moved"""
+    term_ids = sorted(int(pk) for pk in term_ids)
+    if not term_ids:
+        return 0
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in Registration._meta.concrete_fields)
+    placeholders = ', '.join(['%s'] * len(term_ids))
+    source = quote(Registration._meta.db_table)
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(RegistrationArchive._meta.db_table)} ({columns}, {quote("archived_at")}) '
+            f'SELECT {columns}, %s FROM {source} WHERE {quote("term_id")} IN ({placeholders})',
+            [connection.ops.adapt_datetimefield_value(timezone.now()), *term_ids],
+        )
+        cursor.execute(f'DELETE FROM {source} WHERE {quote("term_id")} IN ({placeholders})', term_ids)
+        moved = cursor.rowcount
+    return moved
+
+
+def clone_catalog(source, target) -> int:
+    """Give ``target`` an offering for every module it lacks, copied from ``source``; returns the number added"""
+    have = set(ModuleOffering.objects.filter(term=target).values_list('module_id', flat=True))
+    offered = {
+        module_id: (capacity, availability)
+        for module_id, capacity, availability in source.offerings.values_list('module_id', 'capacity', 'availability')
+    } if source else {}
+    # Modules created since the source term's catalog was set up
+    for module_id, capacity, availability in Module.objects.values_list('pk', 'courses_allowed', 'availability'):
+        offered.setdefault(module_id, (capacity, availability))
+    offerings = [
+        ModuleOffering(term=target, module_id=module_id, capacity=capacity, availability=availability)
+        for module_id, (capacity, availability) in offered.items()
+        if module_id not in have
+    ]
+    ModuleOffering.objects.bulk_create(offerings, batch_size=500)
+    return len(offerings)
+
+
+def apply_catalog(term) -> int:
+    """Set each module's capacity and availability from ``term``'s offerings; returns the number changed"""
+    offerings = {
+        module_id: (capacity, availability)
+        for module_id, capacity, availability in term.offerings.values_list('module_id', 'capacity', 'availability')
+    }
+    changed = []
+    for module in Module.objects.filter(pk__in=offerings).only('pk', 'courses_allowed', 'availability'):
+        capacity, availability = offerings[module.pk]
+        if (module.courses_allowed, module.availability) != (capacity, availability):
+            module.courses_allowed, module.availability = capacity, availability
+            changed.append(module)
+    Module.objects.bulk_update(changed, ['courses_allowed', 'availability'], batch_size=500)
+    return len(changed)
+
+
+def rollover(term, archive=True) -> dict:
+    """
+    Make ``term`` the current term: clone the current catalog into it, apply
+    it to the modules and archive the registrations of every earlier term.
+    """
+    using = router.db_for_write(Registration)
+    with use_primary():
+        previous = Term.objects.filter(is_current=True).first()
+        earlier = list(
+            Term.objects.filter(starts_on__lt=term.starts_on, registrations__isnull=False)
+            .exclude(pk=term.pk).distinct().values_list('pk', flat=True)
+        ) if archive else []
+    # Partition DDL first: MySQL commits implicitly on ALTER TABLE
+    if archive_partitioned(using):
+        for term_id in earlier:
+            add_archive_partition(term_id, using)
+
+    with transaction.atomic(using=using):
+        cloned = clone_catalog(previous, term)
+        applied = apply_catalog(term)
+        Term.objects.exclude(pk=term.pk).filter(is_current=True).update(is_current=False)
+        Term.objects.filter(pk=term.pk).update(is_current=True)
+        archived = archive_registrations(earlier, using)
+        publish_modules(term.offerings.values_list('module_id', flat=True))
+
+    # Queryset updates and raw SQL bypass the model signals
+    bump_version(CATALOG, REGISTRATIONS)
+    logger.info(
+        f"[TERMS] Rolled over from {previous.code if previous else '-'} to {term.code}: "
+        f"{cloned} offerings cloned, {applied} modules updated, {archived} registrations archived"
+    )
+    return {'cloned': cloned, 'applied': applied, 'archived': archived, 'previous': previous}
+
+
+def sync_offerings(module_ids):
+    """Copy modules' capacity and availability to the current term's offerings after a queryset update"""
+    module = Module.objects.filter(pk=OuterRef('module_id'))
+    ModuleOffering.objects.filter(term=current_term(), module_id__in=module_ids).update(
+        capacity=Subquery(module.values('courses_allowed')[:1]),
+        availability=Subquery(module.values('availability')[:1]),
+    )
+
+
+@receiver(post_save, sender=Module)
+def module_saved(sender, instance, raw=False, **kwargs):
+    """Keep the current term's offering in step with the module"""
+    if raw:
+        return
+    values = {'capacity': instance.courses_allowed, 'availability': instance.availability}
+    term_id = current_term().pk
+    if not ModuleOffering.objects.filter(term_id=term_id, module=instance).update(**values):
+        ModuleOffering.objects.get_or_create(term_id=term_id, module=instance, defaults=values)
+
+
+@receiver([post_save, post_delete], sender=Term)
+def term_changed(sender, **kwargs):
+    bump_version(CATALOG)
@@ -1 +1,222 @@
-# Create your tests here.
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+
+from django.core.cache import cache
+from django.db import DatabaseError, connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from . import routers
+from .external import CircuitBreaker, ExternalDataClient, ExternalDataError
+from .models import Module, User
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/ok answers with a hit counter, /slow sleeps past the read timeout, /fail returns 500"""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits += 1
+            hits = server.hits
+        if self.path.startswith('/slow'):
+            time.sleep(1)
+        if self.path.startswith('/fail'):
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = json.dumps({'hits': hits}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ExternalDataClientTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        cls.server.daemon_threads = True
+        cls.server.lock = threading.Lock()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.hits = 0
+        cache.clear()
+
+    def client_for(self, **options):
+        options = {'CONNECT_TIMEOUT': 1, 'READ_TIMEOUT': 0.2, 'CACHE_PREFIX': 'external-test', **options}
+        client = ExternalDataClient(self.base_url, **options)
+        self.addCleanup(client.close)
+        self.addCleanup(self.wait_for_refresh, client)
+        return client
+
+    def wait_for_refresh(self, client):
+        deadline = time.monotonic() + 5
+        while client._refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_read_timeout(self):
+        client = self.client_for()
+        started = time.monotonic()
+        with self.assertRaises(ExternalDataError):
+            client.get_json('/slow')
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_fresh_value_is_served_from_cache(self):
+        client = self.client_for(CACHE_TTL=60)
+        self.assertEqual(client.get_json('/ok'), {'hits': 1})
+        self.assertEqual(client.get_json('/ok'), {'hits': 1})
+        self.assertEqual(self.server.hits, 1)
+
+    def test_stale_value_is_served_while_revalidating(self):
+        client = self.client_for(CACHE_TTL=0, STALE_WHILE_REVALIDATE=60)
+        self.assertEqual(client.get_json('/ok'), {'hits': 1})
+        # Stale: returned at once, refreshed in the background
+        self.assertEqual(client.get_json('/ok'), {'hits': 1})
+        self.wait_for_refresh(client)
+        self.assertEqual(self.server.hits, 2)
+        self.assertEqual(client.get_json('/ok'), {'hits': 2})
+
+    def test_stale_value_is_served_while_upstream_fails(self):
+        client = self.client_for(CACHE_TTL=0, STALE_WHILE_REVALIDATE=0, STALE_IF_ERROR=60)
+        client.get_json('/ok')
+        with mock.patch.object(client.session, 'get', side_effect=requests.ConnectionError('refused')):
+            self.assertEqual(client.get_json('/ok'), {'hits': 1})
+
+    def test_breaker_opens_after_consecutive_failures(self):
+        client = self.client_for(FAILURE_THRESHOLD=2, RECOVERY_TIMEOUT=60)
+        for _ in range(2):
+            with self.assertRaises(ExternalDataError):
+                client.get_json('/fail')
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(ExternalDataError):
+            client.get_json('/ok')
+        self.assertEqual(self.server.hits, 2)
+
+    def test_breaker_half_opens_after_recovery_timeout(self):
+        client = self.client_for(FAILURE_THRESHOLD=1, RECOVERY_TIMEOUT=0.05)
+        with self.assertRaises(ExternalDataError):
+            client.get_json('/fail')
+        time.sleep(0.1)
+        # A failed probe opens the circuit again
+        with self.assertRaises(ExternalDataError):
+            client.get_json('/fail')
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+        time.sleep(0.1)
+        # A successful probe closes it
+        self.assertEqual(client.get_json('/ok'), {'hits': 3})
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_unexpected_error_in_probe_reopens_breaker(self):
+        client = self.client_for(FAILURE_THRESHOLD=1, RECOVERY_TIMEOUT=0.05)
+        with self.assertRaises(ExternalDataError):
+            client.get_json('/fail')
+        time.sleep(0.1)
+        with mock.patch.object(client.session, 'get', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                client.get_json('/ok')
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+
+REPLICA = 'replica_test'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], REPLICA_CHECK_INTERVAL=0, REPLICA_MAX_LAG=5)
+class ReplicaRoutingTests(TestCase):
+    """Routing between the test database and a second SQLite database acting as its replica"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Registered after TestCase set up its databases: the test runner neither
+        # creates this one nor wraps it in a transaction; it lives in a temporary file
+        cls.databases = cls.databases | {REPLICA}
+        handle, cls.replica_path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        connections.settings[REPLICA] = {
+            **connections.settings['default'],
+            'ENGINE': 'django.db.backends.sqlite3', 'NAME': cls.replica_path,
+            'USER': '', 'PASSWORD': '', 'HOST': '', 'PORT': '', 'OPTIONS': {}, 'CONN_MAX_AGE': 0,
+        }
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(Module)
+        # bulk_create sends no signals, so nothing else is written to the replica
+        Module.objects.using(REPLICA).bulk_create([Module(code='REP101', name='Replica copy', category='CS', credit=15, description='-')])
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        cls.databases = cls.databases - {REPLICA}
+        os.remove(cls.replica_path)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        Module.objects.create(code='REP101', name='Primary copy', category='CS', credit=15, description='-')
+
+    def setUp(self):
+        routers._health.clear()
+
+    def module_name(self):
+        return Module.objects.get(code='REP101').name
+
+    def test_reads_use_the_replica_inside_a_replica_scope(self):
+        self.assertEqual(self.module_name(), 'Primary copy')
+        with routers.use_replicas():
+            self.assertEqual(router.db_for_read(Module), REPLICA)
+            self.assertEqual(self.module_name(), 'Replica copy')
+            # Auth rows never come from a replica
+            self.assertEqual(router.db_for_read(User), 'default')
+            with routers.use_primary():
+                self.assertEqual(self.module_name(), 'Primary copy')
+
+    def test_pin_cookie_keeps_reads_on_the_primary_after_a_write(self):
+        factory = RequestFactory()
+
+        def write(request):
+            Module.objects.filter(code='REP101').update(courses_allowed=40)
+            return HttpResponse()
+
+        response = routers.ReplicaMiddleware(write)(factory.post('/'))
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+
+        names = []
+
+        @routers.replica_reads
+        def read(request):
+            names.append(self.module_name())
+            return HttpResponse()
+
+        routers.ReplicaMiddleware(read)(factory.get('/'))
+        factory.cookies[routers.PIN_COOKIE] = response.cookies[routers.PIN_COOKIE].value
+        routers.ReplicaMiddleware(read)(factory.get('/'))
+        self.assertEqual(names, ['Replica copy', 'Primary copy'])
+
+    def test_reads_fall_back_to_the_primary_when_the_lag_check_fails(self):
+        with mock.patch.object(routers, 'replica_lag', side_effect=DatabaseError('unreachable')):
+            with routers.use_replicas():
+                self.assertEqual(router.db_for_read(Module), 'default')
+                self.assertEqual(self.module_name(), 'Primary copy')
+        self.assertEqual(routers.health(), {REPLICA: False})
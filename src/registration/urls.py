@@ -1,11 +1,18 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 from . import admin_views
 from django.contrib.auth import views as auth_views
 
+# Read-only catalog views; async variants are used when served over ASGI
+if settings.ASYNC_CATALOG_VIEWS:
+    from . import async_views as catalog_views
+else:
+    catalog_views = views
+
 urlpatterns = [
     # Main pages
-    path('', views.home, name='home'),
+    path('', catalog_views.home, name='home'),
     path('about/', views.about, name='about'),
     path('contact/', views.contact, name='contact'),
     
@@ -19,13 +26,13 @@ urlpatterns = [
     path('accounts/reset/done/', auth_views.PasswordResetCompleteView.as_view(template_name='registration/password_reset_complete.html'), name='password_reset_complete'),
     
     # Courses
-    path('courses/', views.courses, name='courses'),
-    path('courses/<str:course_code>/', views.course_detail, name='course_detail'),
+    path('courses/', catalog_views.courses, name='courses'),
+    path('courses/<str:course_code>/', catalog_views.course_detail, name='course_detail'),
     path('courses/<str:course_code>/enroll/', views.enroll_course, name='enroll_course'),
     
     # Modules
-    path('modules/', views.modules, name='modules'),
-    path('modules/<str:module_code>/', views.module_detail, name='module_detail'),
+    path('modules/', catalog_views.modules, name='modules'),
+    path('modules/<str:module_code>/', catalog_views.module_detail, name='module_detail'),
     path('modules/<str:module_code>/register/', views.register_module, name='register_module'),
     path('modules/<str:module_code>/unregister/', views.unregister_module, name='unregister_module'),
     
@@ -34,7 +41,8 @@ urlpatterns = [
     path('my-registrations/', views.my_registrations, name='my_registrations'),
     
     # API endpoints
-    path('api/modules/', views.api_modules, name='api_modules'),
+    path('api/modules/', catalog_views.api_modules, name='api_modules'),
+    path('api/modules/availability/', catalog_views.module_availability_stream, name='api_module_availability'),
     path('api/external/', views.api_external_data, name='api_external'),
     
     # Admin-specific URLs
@@ -0,0 +1,158 @@
+"""
+Data version stamps kept in the Django cache.
+
+Each name ("catalog", "registrations", "students", "groups",
+"permissions", and "user:<id>" per user) has a counter that is bumped whenever the underlying
+rows change. Cache keys that embed the
+current versions never serve stale data, whatever their TTL. Writes that
+bypass model signals (``QuerySet.update()``) must call ``bump_version``.
+Bumps take effect when the write's transaction commits.
+"""
+import time
+
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Course, Module, Registration, Student, User
+from .tenants import current_tenant, use_tenant
+
+CATALOG = 'catalog'
+REGISTRATIONS = 'registrations'
+STUDENTS = 'students'
+GROUPS = 'groups'
+PERMISSIONS = 'permissions'
+
+
+def _key(name) -> str:
+    return f'version:{name}'
+
+
+def _initial() -> int:
+    # Start from the clock so a counter lost to eviction never repeats old values
+    return time.time_ns() // 1000
+
+
+def per_process_cache() -> bool:
+    """True if each worker process has its own copy of the cache, so bumps do not reach the others"""
+    return isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache)
+
+
+def user_version(user_id) -> str:
+    """Version name covering one user's row, student profile, group memberships and own permissions"""
+    return f'user:{user_id}'
+
+
+def get_versions(*names) -> dict:
+    """Return the current version for each name (one cache round trip)"""
+    found = cache.get_many([_key(name) for name in names])
+    versions = {}
+    for name in names:
+        value = found.get(_key(name))
+        if value is None:
+            value = _initial()
+            if not cache.add(_key(name), value, None):
+                value = cache.get(_key(name), value)
+        versions[name] = value
+    return versions
+
+
+def get_version(name) -> int:
+    return get_versions(name)[name]
+
+
+def bump_version(*names):
+    """Invalidate everything keyed on these versions once the current transaction commits"""
+    tenant = current_tenant()
+
+    def bump():
+        # Bumping before the commit would let a concurrent fill cache the old rows under the new version
+        with use_tenant(tenant):
+            for name in names:
+                try:
+                    cache.incr(_key(name))
+                except ValueError:
+                    cache.set(_key(name), _initial(), None)
+
+    transaction.on_commit(bump, using=tenant.alias)
+
+
+def bump_user_versions(user_ids):
+    bump_version(*(user_version(user_id) for user_id in user_ids))
+
+
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=Module)
+def catalog_changed(sender, **kwargs):
+    bump_version(CATALOG)
+
+
+@receiver(m2m_changed, sender=Module.courses.through)
+def module_courses_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_version(CATALOG)
+
+
+@receiver([post_save, post_delete], sender=Registration)
+def registrations_changed(sender, **kwargs):
+    bump_version(REGISTRATIONS)
+
+
+@receiver([post_save, post_delete], sender=Student)
+def students_changed(sender, instance, **kwargs):
+    bump_version(STUDENTS, user_version(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    bump_version(user_version(instance.pk))
+    # Logging in only touches last_login, which no shared page displays
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    bump_version(STUDENTS)
+
+
+@receiver([post_save, post_delete], sender=Group)
+def group_changed(sender, **kwargs):
+    bump_version(GROUPS)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_version(user_version(instance.pk))
+    elif pk_set:
+        # group.user_set.add(...) and friends
+        bump_user_versions(pk_set)
+    else:
+        # group.user_set.clear() does not say which users were affected
+        bump_version(GROUPS)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_version(PERMISSIONS)
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_version(user_version(instance.pk))
+    elif pk_set:
+        # permission.user_set.add(...) and friends
+        bump_user_versions(pk_set)
+    else:
+        bump_version(PERMISSIONS)
+
+
+@receiver([post_save, post_delete], sender=Permission)
+def permission_changed(sender, **kwargs):
+    bump_version(PERMISSIONS)
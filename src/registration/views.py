@@ -1,28 +1,36 @@
 from functools import reduce
 from operator import or_
-import requests
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.decorators.http import require_http_methods
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
-from django.db import IntegrityError, transaction
+from django.db import IntegrityError, router, transaction
 import logging
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth import login, authenticate, logout as auth_logout
+from django.contrib.auth import logout as auth_logout
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q
-from django.http import JsonResponse
+from django.db.models import Count, Q
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_POST
-from django.contrib.auth.models import Group
 from django.core.exceptions import ObjectDoesNotExist
 
-from .models import Module, Student, Registration, Course
+from .models import Module, Registration, RegistrationArchive, Course
 from .forms import UserRegistrationForm, StudentProfileForm, ContactForm, ModuleSearchForm
+from .external import ExternalDataError, get_client
+from .signup import sign_up
+from .singleflight import make_key, single_flight
+from .routers import replica_reads
+from .terms import current_term
+from .versioning import CATALOG
 
+# Module columns the cards and list pages render; description stays in the database
+MODULE_CARD_FIELDS = ('id', 'code', 'name', 'summary', 'category', 'credit', 'courses_allowed', 'availability', 'updated_at')
+
+@replica_reads
 def home(request):
     """Home page with featured modules"""
-    featured_modules = Module.objects.filter(availability=True)[:6]
+    featured_modules = Module.objects.filter(availability=True).only(*MODULE_CARD_FIELDS)[:6]
     context = {
         'featured_modules': featured_modules,
     }
@@ -51,32 +59,8 @@ def register_user(request):
     if request.method == 'POST':
         form = UserRegistrationForm(request.POST)
         if form.is_valid():
-            # Save user with proper role flags
-            user = form.save(commit=False)
-            user.is_student = True
-            user.is_teacher = False  # Explicitly set to False for student registration
-            user.save()
-            
-            # Add user to Students group
-            students_group, _ = Group.objects.get_or_create(name='Students')
-            user.groups.add(students_group)
-            
-            # Create student profile with default values
-            Student.objects.create(
-                user=user,
-                student_id=f"STU{user.id:05d}",  # Generate a student ID
-                date_of_birth='2000-01-01',
-                address='',
-                city='',
-                country='',
-                # Note: course will need to be set later in profile completion
-            )
-            
-            # Log the user in
-            username = form.cleaned_data.get('username')
-            password = form.cleaned_data.get('password1')
-            user = authenticate(username=username, password=password)
-            login(request, user)
+            # One transaction, one password hash, no authenticate() round trip
+            sign_up(request, form)
             
             messages.success(request, 'Registration successful! Please complete your profile and select your course.')
             return redirect('profile')
@@ -86,67 +70,83 @@ def register_user(request):
     context = {'form': form}
     return render(request, 'registration/register.html', context)
 
+def filter_modules(modules_list, cleaned_data):
+    """Apply ModuleSearchForm filters to a module queryset (builds SQL only)"""
+    search = cleaned_data.get('search')
+    category = cleaned_data.get('category')
+    course = cleaned_data.get('course')
+    
+    if search:
+        # Use a list of Q objects with OR conditions
+        search_conditions = [
+            Q(name__icontains=search),
+            Q(code__icontains=search),
+            Q(description__icontains=search)
+        ]
+        combined_query = reduce(or_, search_conditions)  # type: ignore[operator]
+        modules_list = modules_list.filter(combined_query)
+    
+    if category:
+        modules_list = modules_list.filter(category=category)
+    
+    if course:
+        modules_list = modules_list.filter(courses=course)
+    return modules_list
+
+def restrict_to_course(modules_list, course):
+    """Limit modules to those open to all courses or linked to ``course``"""
+    # Show modules that are either:
+    # 1. Available for all courses (no course restrictions)
+    # 2. Available for the student's specific course
+    return modules_list.filter(
+        Q(courses__isnull=True) | Q(courses=course)
+    ).distinct()
+
+def with_seat_counts(modules_list, term=None):
+    """Annotate the term's approved registrations so cards show live seats without per-card queries"""
+    term = term or current_term()
+    # GROUP BY drops the implicit Meta.ordering, so order explicitly for pagination
+    return modules_list.annotate(registered_count=Count(
+        'registrations', filter=Q(registrations__status='A', registrations__term=term), distinct=True,
+    )).order_by('code')
+
+def can_register_for(module, allowed_course_ids, student, is_registered):
+    """Whether ``student`` may register for ``module`` given its course links"""
+    # Allow registration if:
+    # 1. Module has no course restrictions (empty courses list) - allow all students
+    # 2. Module has course restrictions and student's course is in the allowed list
+    return (not is_registered and module.availability and
+            ((len(allowed_course_ids) == 0) or (student.course_id in allowed_course_ids)))
+
 @login_required
+@replica_reads
 def modules(request):
     """Modules listing with search and pagination"""
-    modules_list = Module.objects.filter(availability=True)
+    modules_list = Module.objects.filter(availability=True).only(*MODULE_CARD_FIELDS)
     
     # Search functionality
     search_form = ModuleSearchForm(request.GET)
     if search_form.is_valid():
-        search = search_form.cleaned_data.get('search')
-        category = search_form.cleaned_data.get('category')
-        course = search_form.cleaned_data.get('course')
-        
-        if search:
-            # Use a list of Q objects with OR conditions
-            search_conditions = [
-                Q(name__icontains=search),
-                Q(code__icontains=search),
-                Q(description__icontains=search)
-            ]
-            combined_query = reduce(or_, search_conditions)  # type: ignore[operator]
-            modules_list = modules_list.filter(combined_query)
-        
-        if category:
-            modules_list = modules_list.filter(category=category)
-        
-        if course:
-            modules_list = modules_list.filter(courses=course)
+        modules_list = filter_modules(modules_list, search_form.cleaned_data)
     
     # Filter modules based on student's course if authenticated
-    if request.user.is_authenticated:
-        try:
-            student = Student.objects.get(user=request.user)
-            # Show modules that are available for the student's course
-            # If student has a course, filter modules that are either:
-            # 1. Available for all courses (no course restrictions)
-            # 2. Available for the student's specific course
-            if student.course:
-                modules_list = modules_list.filter(
-                    Q(courses__isnull=True) | Q(courses=student.course)
-                ).distinct()
-        except ObjectDoesNotExist:
-            pass
+    student = request.student_context.student
+    if student and student.course:
+        modules_list = restrict_to_course(modules_list, student.course)
     
     # Pagination
-    paginator = Paginator(modules_list, 10)
+    paginator = Paginator(with_seat_counts(modules_list), 10)
     page_number = request.GET.get('page')
     modules_page = paginator.get_page(page_number)
+    for module in modules_page:
+        module.seats_left = max(0, module.courses_allowed - module.registered_count)
     
     # Check if user is registered for each module and if they can register
-    if request.user.is_authenticated:
-        try:
-            student = Student.objects.get(user=request.user)
-            registered_modules = Registration.objects.filter(student=student).values_list('module_id', flat=True)
-            for module in modules_page:
-                module.is_registered = module.id in registered_modules
-                # Check if student can register (must have a course)
-                module.can_register = student.course is not None
-        except ObjectDoesNotExist:
-            for module in modules_page:
-                module.is_registered = False
-                module.can_register = False
+    registered_modules = request.student_context.registrations
+    for module in modules_page:
+        module.is_registered = module.id in registered_modules
+        # Check if student can register (must have a course)
+        module.can_register = bool(student and student.course is not None)
     
     context = {
         'modules': modules_page,
@@ -158,29 +158,29 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+@replica_reads
 def module_detail(request, module_code):
     """Module detail page showing module info and registered students"""
     module = get_object_or_404(Module, code=module_code)
     
     # Get registered students with their photos
-    registrations = Registration.objects.filter(module=module, status='A').select_related('student__user')
+    registrations = list(
+        Registration.objects.filter(module=module, term=current_term(), status='A').select_related('student__user')
+    )
+    allowed_courses = list(module.courses.all())
     
     # Check if current user is registered
     is_registered = False
     can_register = False
     if request.user.is_authenticated:
-        try:
-            student = Student.objects.get(user=request.user)
-            is_registered = Registration.objects.filter(student=student, module=module).exists()
+        student = request.student_context.student
+        if student is not None:
+            is_registered = module.id in request.student_context.registrations
             
             # Check if student can register (module available for their course)
             if student.course:
-                # Allow registration if:
-                # 1. Module has no course restrictions (empty courses list) - allow all students
-                # 2. Module has course restrictions and student's course is in the allowed list
-                module_courses = list(module.courses.values_list('id', flat=True))
-                can_register = (not is_registered and module.availability and 
-                              ((len(module_courses) == 0) or (student.course.id in module_courses)))
+                module_courses = [course.id for course in allowed_courses]
+                can_register = can_register_for(module, module_courses, student, is_registered)
                 
                 # Log the registration check for debugging
                 logger.info(f"[MODULE_DETAIL] Student {student.pk} can register for {module.code}: {can_register}")
@@ -189,34 +189,35 @@ def module_detail(request, module_code):
                 logger.info(f"[MODULE_DETAIL] Module has no restrictions: {len(module_courses) == 0}")
                 logger.info(f"[MODULE_DETAIL] Student course in allowed courses: {student.course.id in module_courses}")
                 
-        except ObjectDoesNotExist:
+        else:
             logger.warning(f"[MODULE_DETAIL] No student profile for user {request.user}")
-            pass
     
     context = {
         'module': module,
         'registrations': registrations,
+        'registered_count': len(registrations),
+        'allowed_courses': allowed_courses,
         'is_registered': is_registered,
         'can_register': can_register,
-        'available_slots': module.courses_allowed - registrations.count(),
+        'available_slots': module.courses_allowed - len(registrations),
     }
     return render(request, 'registration/module_detail.html', context)
 
 @login_required
 def profile(request):
     """User profile view"""
-    try:
-        student = Student.objects.select_related('course').get(user=request.user)
-        registrations = Registration.objects.filter(student=student, status='A').select_related('module')
+    student = request.student_context.student
+    if student is not None:
+        term = current_term()
+        registrations = Registration.objects.filter(student=student, term=term, status='A').select_related('module').defer('module__description')
         # Only show course modules if student is enrolled in a course
         course_modules = None
         if student.course:
             course_modules = Module.objects.filter(
                 Q(courses=student.course) | Q(courses__isnull=True),
                 availability=True
-            ).exclude(registrations__student=student)
-    except ObjectDoesNotExist:
-        student = None
+            ).only(*MODULE_CARD_FIELDS).exclude(pk__in=Registration.objects.filter(student=student, term=term).values('module_id'))
+    else:
         registrations = []
         course_modules = None
     
@@ -229,12 +230,8 @@ def profile(request):
             if form.is_valid():
                 student = form.save(commit=False)
                 student.user = request.user
-                # Preserve existing course and enrollment data
-                if student.pk:
-                    original_student = Student.objects.get(pk=student.pk)
-                    student.course = original_student.course
-                    student.enrollment_date = original_student.enrollment_date
-                    student.expected_graduation = original_student.expected_graduation
+                # Course and enrollment fields are not on this form, so the
+                # instance keeps its existing values for them
                 student.save()
                 messages.success(request, 'Personal details updated successfully!')
                 return redirect('profile')
@@ -285,8 +282,8 @@ def register_module(request, module_code):
             return redirect('modules')
         
         # Check if student profile exists
-        try:
-            student = request.user.student_profile
+        student = request.student_context.student
+        if student is not None:
             logger.info(f"[REGISTER_MODULE] Found student profile - User: {student.user.username}")
             logger.info(f"[REGISTER_MODULE] Student course: {getattr(student, 'course', 'No course assigned')}")
             logger.info(f"[REGISTER_MODULE] Student object: {student}")
@@ -295,14 +292,15 @@ def register_module(request, module_code):
             if not student.course:
                 messages.error(request, 'You must be enrolled in a course before registering for modules.')
                 return redirect('courses')
-        except ObjectDoesNotExist:
+        else:
             error_msg = f"Student profile not found for user {request.user}"
             logger.error(f"[REGISTER_MODULE] {error_msg}")
             messages.error(request, 'Student profile not found. Please complete your profile first.')
             return redirect('profile')
         
-        # Check if already registered
-        existing_reg = Registration.objects.filter(student=student, module=module).first()
+        # Check if already registered this term
+        term = current_term()
+        existing_reg = Registration.objects.filter(term=term, student=student, module=module).first()
         if existing_reg:
             logger.warning(f"[REGISTER_MODULE] User {request.user} already registered for module {module.code} with status {existing_reg.get_status_display()}")
             if existing_reg.status == 'A':
@@ -335,8 +333,8 @@ def register_module(request, module_code):
                 messages.warning(request, f'You have a registration for {module.name} with status: {existing_reg.get_status_display()}')
             return redirect('modules')
         
-        # Check if module has available spots
-        current_registrations = Registration.objects.filter(module=module).count()
+        # Check if module has available spots this term
+        current_registrations = Registration.objects.filter(term=term, module=module).count()
         logger.info(f"[REGISTER_MODULE] Current registrations for {module.code}: {current_registrations}/{module.courses_allowed}")
         
         if current_registrations >= module.courses_allowed:
@@ -377,6 +375,7 @@ def register_module(request, module_code):
         registration = Registration(
             student=student, 
             module=module, 
+            term=term,
             status='A'  # Approved status
         )
         
@@ -384,26 +383,22 @@ def register_module(request, module_code):
             logger.info("[REGISTER_MODULE] Validating registration data...")
             registration.full_clean()
             
-            # Start a transaction
-            sid = transaction.savepoint()
-            try:
-                # Save the registration
+            # One short write transaction: re-check capacity and insert. On
+            # SQLite it opens with BEGIN IMMEDIATE (SQLITE_OPTIONS), on
+            # MySQL/Postgres it holds the module row lock, so concurrent
+            # registrations queue for the lock instead of overfilling the module
+            with transaction.atomic(using=router.db_for_write(Module)):
+                list(Module.objects.select_for_update().filter(pk=module.pk).values_list('pk', flat=True))
+                current_registrations = Registration.objects.filter(term=term, module=module).count()
+                if current_registrations >= module.courses_allowed:
+                    logger.warning(f"[REGISTER_MODULE] Module {module.code} filled up")
+                    messages.error(request, f'Sorry, {module.name} is full.')
+                    return redirect('modules')
                 registration.save(force_insert=True)
-                logger.info(f"[REGISTER_MODULE] Successfully created registration for student {student.user.username} and module {module.code}")
-                
-                # Get updated registration count
-                current_registrations = Registration.objects.filter(module=module).count()
-                logger.info(f"[REGISTER_MODULE] Updated registration count for {module.code}: {current_registrations}/{module.courses_allowed}")
-                
-                # Commit the transaction
-                transaction.savepoint_commit(sid)
-                messages.success(request, f'Successfully registered for {module.name}!')
-                return redirect('modules')
-                
-            except Exception as e:
-                # Rollback transaction on error
-                transaction.savepoint_rollback(sid)
-                raise
+            logger.info(f"[REGISTER_MODULE] Successfully created registration for student {student.user.username} and module {module.code}")
+            logger.info(f"[REGISTER_MODULE] Updated registration count for {module.code}: {current_registrations + 1}/{module.courses_allowed}")
+            messages.success(request, f'Successfully registered for {module.name}!')
+            return redirect('modules')
                 
         except ValidationError as e:
             error_msg = f"Validation error during registration: {e}"
@@ -425,7 +420,7 @@ def register_module(request, module_code):
             
             if 'unique' in str(e).lower():
                 # Check if there's already a registration
-                existing_reg = Registration.objects.filter(student=student, module=module).first()
+                existing_reg = Registration.objects.filter(term=term, student=student, module=module).first()
                 if existing_reg:
                     if existing_reg.status == 'A':
                         messages.warning(request, 'You are already registered for this module.')
@@ -454,14 +449,13 @@ def register_module(request, module_code):
 @require_POST
 def unregister_module(request, module_code):
     """Unregister from a module"""
-    try:
-        student = Student.objects.get(user=request.user)
-    except ObjectDoesNotExist:
+    student = request.student_context.student
+    if student is None:
         messages.error(request, 'Please complete your profile first.')
         return redirect('profile')
     
     module = get_object_or_404(Module, code=module_code)
-    registration = get_object_or_404(Registration, student=student, module=module)
+    registration = get_object_or_404(Registration, term=current_term(), student=student, module=module)
     
     registration.delete()
     messages.success(request, f'Successfully unregistered from {module.name}')
@@ -471,24 +465,32 @@ def unregister_module(request, module_code):
 @login_required
 def my_registrations(request):
     """View showing all modules the student is registered in"""
-    try:
-        student = Student.objects.get(user=request.user)
-        registrations = Registration.objects.filter(student=student).select_related('module').order_by('-registration_date')
-    except ObjectDoesNotExist:
-        registrations = []
+    student = request.student_context.student
+    if student is None:
         messages.warning(request, 'Please complete your profile first.')
         return redirect('profile')
+    term = current_term()
+    registrations = (
+        Registration.objects.filter(student=student, term=term)
+        .select_related('module').defer('module__description').order_by('-registration_date')
+    )
+    past_registrations = RegistrationArchive.objects.filter(student=student).select_related('module', 'term').only(
+        'status', 'grade', 'module__code', 'module__name', 'module__credit', 'term__name',
+    )
     
     context = {
         'registrations': registrations,
+        'past_registrations': past_registrations,
+        'term': term,
         'student': student,
     }
     return render(request, 'registration/my_registrations.html', context)
 
 # Course listing view
+@replica_reads
 def courses(request):
     """Display all available courses"""
-    courses_list = Course.objects.filter(is_active=True)
+    courses_list = Course.objects.filter(is_active=True).annotate(student_count=Count('students'))
     context = {
         'courses': courses_list,
     }
@@ -498,9 +500,8 @@ def courses(request):
 @login_required
 def enroll_course(request, course_code):
     """Enroll a student in a course"""
-    try:
-        student = Student.objects.get(user=request.user)
-    except ObjectDoesNotExist:
+    student = request.student_context.student
+    if student is None:
         messages.error(request, 'Please complete your profile first.')
         return redirect('profile')
     
@@ -517,7 +518,14 @@ def enroll_course(request, course_code):
     messages.success(request, f'Successfully enrolled in {course.name}!')
     return redirect('profile')
 
+def enrolled_students(course):
+    """A course's active students with only the columns the course page shows"""
+    return course.students.filter(is_active=True).select_related('user').only(
+        'user', 'course', 'photo', 'student_id', 'enrollment_date', 'user__first_name', 'user__last_name',
+    )
+
 # Course detail view
+@replica_reads
 def course_detail(request, course_code):
     """Display detailed information about a specific course"""
     course = get_object_or_404(Course, code=course_code, is_active=True)
@@ -526,46 +534,56 @@ def course_detail(request, course_code):
     modules = Module.objects.filter(
         Q(courses=course) | Q(courses__isnull=True),
         availability=True
-    )
+    ).only(*MODULE_CARD_FIELDS)
     
     # Get students enrolled in this course
-    students = course.students.filter(is_active=True)
+    students = enrolled_students(course)
     
     context = {
         'course': course,
         'modules': modules,
         'students': students,
+        'enrolled_count': course.get_students_count(),
     }
     return render(request, 'registration/course_detail.html', context)
 
+@replica_reads
 def api_modules(request):
     """API endpoint for modules"""
-    modules = Module.objects.filter(availability=True)
-    data = []
-    for module in modules:
-        data.append({
-            'id': module.id,
-            'code': module.code,
-            'name': module.name,
-            'category': module.category,
-            'credit': module.credit,
-            'description': module.description,
-            'courses_allowed': module.courses_allowed,
-            'linked_courses': [course.code for course in module.courses.all()],
-        })
-    return JsonResponse({'modules': data})
+    key = make_key('api_modules', depends_on=(CATALOG,))
+    return JsonResponse({'modules': single_flight.do(key, module_api_data)})
+
+def module_api_data():
+    """Serialized list of available modules"""
+    modules = Module.objects.filter(availability=True).prefetch_related('courses')
+    return [serialize_module(module) for module in modules]
+
+def serialize_module(module):
+    """JSON representation of a module for the public API"""
+    return {
+        'id': module.id,
+        'code': module.code,
+        'name': module.name,
+        'category': module.category,
+        'credit': module.credit,
+        'description': module.description,
+        'courses_allowed': module.courses_allowed,
+        'linked_courses': [course.code for course in module.courses.all()],
+    }
+
+def module_availability_stream(request):
+    """Live availability is only streamed by the async views (ASYNC_CATALOG_VIEWS)"""
+    # A stream would hold a worker thread for its whole lifetime; 204 tells EventSource not to reconnect
+    return HttpResponse(status=204)
 
 def api_external_data(request):
     """Fetch external API data (example)"""
     try:
-        # Example: Fetch some external data
-        response = requests.get('https://jsonplaceholder.typicode.com/posts/1')
-        if response.status_code == 200:
-            return JsonResponse(response.json())
-        else:
-            return JsonResponse({'error': 'Failed to fetch external data'}, status=500)
-    except requests.RequestException:
-        return JsonResponse({'error': 'Network error'}, status=500)
+        # Pooled, time-bounded and cached; see registration/external.py
+        data = get_client().get_json('/posts/1')
+    except ExternalDataError:
+        return JsonResponse({'error': 'Failed to fetch external data'}, status=500)
+    return JsonResponse(data, safe=False)
 
 def logout(request):
     """Custom logout view that redirects to home page"""
@@ -0,0 +1,101 @@
+"""
+Warm per-process caches before a server process accepts traffic.
+
+The gunicorn launch profiles (config/gunicorn.py, config/gunicorn_asgi.py)
+call ``warm_up()`` once in the master when the app is preloaded, so forked
+workers inherit the populated caches copy-on-write. Without preload, each
+worker calls it after it boots instead.
+
+Warmed:
+- the URL resolver (every urlconf and view module imported);
+- compiled templates (kept by the cached template loader when DEBUG is off);
+- the module catalog API payload in the shared cache.
+
+Database connections and cache clients opened here are closed before
+returning, so no socket is shared between forked workers.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.core.cache import close_caches
+from django.db import DatabaseError, connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def warm_urls() -> int:
+    resolver = get_resolver()
+    # Populating the reverse dict imports every included urlconf and view
+    return len(resolver.reverse_dict)
+
+
+def template_dirs(backend) -> list:
+    """Directories a template backend searches, app template directories included"""
+    engine = getattr(backend, 'engine', None)
+    if engine is None:
+        return list(backend.template_dirs)
+    # Ask the loaders: with explicit loaders (production) APP_DIRS is off and
+    # backend.template_dirs no longer lists the app directories
+    dirs = []
+    for loader in engine.template_loaders:
+        if hasattr(loader, 'get_dirs'):
+            dirs.extend(directory for directory in loader.get_dirs() if directory not in dirs)
+    return dirs
+
+
+def template_names(backend):
+    """Names of all .html templates visible to a Django template backend"""
+    seen = set()
+    for directory in template_dirs(backend):
+        path = Path(directory)
+        for template in sorted(path.rglob('*.html')):
+            name = template.relative_to(path).as_posix()
+            if name not in seen:
+                seen.add(name)
+                yield name
+
+
+def warm_templates() -> int:
+    loaded = 0
+    for backend in engines.all():
+        if not hasattr(backend, 'template_dirs'):
+            continue
+        for name in template_names(backend):
+            try:
+                backend.get_template(name)
+                loaded += 1
+            except (TemplateDoesNotExist, TemplateSyntaxError) as e:
+                logger.warning(f"[WARMUP] Skipping template {name}: {e}")
+    return loaded
+
+
+def warm_catalog() -> int:
+    from .singleflight import make_key, single_flight
+    from .versioning import CATALOG
+    from .views import module_api_data
+
+    key = make_key('api_modules', depends_on=(CATALOG,))
+    return len(single_flight.do(key, module_api_data))
+
+
+def warm_up():
+    """Warm URL, template and catalog caches; never raises for a missing database"""
+    started = time.perf_counter()
+    urls = warm_urls()
+    templates = warm_templates()
+    try:
+        modules = warm_catalog()
+    except DatabaseError as e:
+        # e.g. before `manage.py bootstrap` has run; workers fill it on demand
+        logger.warning(f"[WARMUP] Catalog not warmed: {e}")
+        modules = 0
+    finally:
+        connections.close_all()
+        close_caches()
+    logger.info(
+        f"[WARMUP] {urls} URL patterns, {templates} templates, {modules} catalog modules "
+        f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
@@ -0,0 +1,22 @@
+document.addEventListener('DOMContentLoaded', function() {
+console.log('API Dashboard loaded');
+setInterval(() => {
+const currentCount = parseInt(document.querySelector('.stats-number').textContent);
+document.querySelector('.stats-number').textContent = currentCount + Math.floor(Math.random() * 5);
+}, 10000);
+});
+function generateApiKey() {
+const chars = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789';
+let result = 'sk_live_51';
+for (let i = 0; i < 32; i++) {
+result += chars.charAt(Math.floor(Math.random() * chars.length));
+}
+return result;
+}
+function toggleEndpointStatus(endpointId, currentStatus) {
+const newStatus = currentStatus === 'active' ? 'inactive' : 'active';
+console.log(`Toggling endpoint ${endpointId} to ${newStatus}`);
+}
+function exportApiUsage() {
+console.log('Exporting API usage data');
+}
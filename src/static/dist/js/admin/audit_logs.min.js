@@ -0,0 +1,35 @@
+document.addEventListener('DOMContentLoaded', function() {
+console.log('Audit logs page loaded');
+setTimeout(() => {
+document.getElementById('live-feed').innerHTML = `
+            <div class="mb-2">
+                <small class="text-muted">2 minutes ago</small><br>
+                <span class="badge badge-success">CREATE</span> New student registered
+            </div>
+            <div class="mb-2">
+                <small class="text-muted">5 minutes ago</small><br>
+                <span class="badge badge-warning">UPDATE</span> Module availability changed
+            </div>
+            <div class="mb-2">
+                <small class="text-muted">8 minutes ago</small><br>
+                <span class="badge badge-info">VIEW</span> Admin accessed dashboard
+            </div>
+        `;
+document.getElementById('today-creates').textContent = '12';
+document.getElementById('today-updates').textContent = '8';
+}, 2000);
+});
+function exportLogs() {
+console.log('Exporting audit logs');
+}
+function clearOldLogs() {
+if (confirm('Are you sure you want to clear old audit logs? This action cannot be undone.')) {
+console.log('Clearing old logs');
+}
+}
+document.getElementById('action').addEventListener('change', function() {
+this.form.submit();
+});
+document.getElementById('model').addEventListener('change', function() {
+this.form.submit();
+});
@@ -0,0 +1,28 @@
+document.getElementById('select-all-modules').addEventListener('change', function() {
+const checkboxes = document.querySelectorAll('.module-checkbox');
+checkboxes.forEach(checkbox => {
+checkbox.checked = this.checked;
+});
+});
+document.getElementById('select-all-registrations').addEventListener('change', function() {
+const checkboxes = document.querySelectorAll('.registration-checkbox');
+checkboxes.forEach(checkbox => {
+checkbox.checked = this.checked;
+});
+});
+document.querySelectorAll('form').forEach(form => {
+form.addEventListener('submit', function(e) {
+const selectedItems = this.querySelectorAll('input[name="selected_items"]:checked');
+if (selectedItems.length === 0) {
+e.preventDefault();
+alert('Please select at least one item to perform the operation.');
+return false;
+}
+const action = e.submitter.value;
+const count = selectedItems.length;
+if (!confirm(`Are you sure you want to perform "${action}" on ${count} selected item(s)?`)) {
+e.preventDefault();
+return false;
+}
+});
+});
@@ -0,0 +1,82 @@
+const dropZone = document.getElementById('drop-zone');
+const fileInput = document.getElementById('csv_file');
+const dragFileInput = document.getElementById('drag-file');
+dropZone.addEventListener('click', () => {
+fileInput.click();
+});
+dropZone.addEventListener('dragover', (e) => {
+e.preventDefault();
+dropZone.classList.add('dragover');
+});
+dropZone.addEventListener('dragleave', () => {
+dropZone.classList.remove('dragover');
+});
+dropZone.addEventListener('drop', (e) => {
+e.preventDefault();
+dropZone.classList.remove('dragover');
+const files = e.dataTransfer.files;
+if (files.length > 0) {
+fileInput.files = files;
+updateFileName(files[0].name);
+}
+});
+fileInput.addEventListener('change', (e) => {
+if (e.target.files.length > 0) {
+updateFileName(e.target.files[0].name);
+}
+});
+function updateFileName(fileName) {
+const dropZone = document.getElementById('drop-zone');
+dropZone.innerHTML = `
+        <div class="upload-icon text-success">
+            <i class="fas fa-check-circle"></i>
+        </div>
+        <h5>File Selected</h5>
+        <p class="text-muted">${fileName}</p>
+    `;
+}
+function downloadTemplate(type) {
+let csvContent = '';
+let filename = '';
+if (type === 'modules') {
+filename = 'module_template.csv';
+csvContent = 'name,code,credit,category,description,availability,courses_allowed\n' +
+'Introduction to Computer Science,CS101,3,CS,Basic concepts of computer science,true,50\n' +
+'Advanced Mathematics,MATH201,4,MATH,Advanced mathematical concepts,true,30';
+} else if (type === 'students') {
+filename = 'student_template.csv';
+csvContent = 'username,email,password,first_name,last_name,date_of_birth,city,country\n' +
+'john.doe,john@example.com,password123,John,Doe,1995-05-15,New York,USA\n' +
+'jane.smith,jane@example.com,password123,Jane,Smith,1996-08-20,London,UK';
+}
+const blob = new Blob([csvContent], { type: 'text/csv' });
+const url = window.URL.createObjectURL(blob);
+const a = document.createElement('a');
+a.href = url;
+a.download = filename;
+a.click();
+window.URL.revokeObjectURL(url);
+}
+document.getElementById('csv-import-form').addEventListener('submit', function(e) {
+const modelType = document.getElementById('model_type').value;
+const csvFile = document.getElementById('csv_file').files[0];
+if (!modelType) {
+e.preventDefault();
+alert('Please select a data type.');
+return false;
+}
+if (!csvFile) {
+e.preventDefault();
+alert('Please select a CSV file.');
+return false;
+}
+if (!csvFile.name.toLowerCase().endsWith('.csv')) {
+e.preventDefault();
+alert('Please select a valid CSV file.');
+return false;
+}
+if (!confirm('Are you sure you want to import this data? This action cannot be undone.')) {
+e.preventDefault();
+return false;
+}
+});
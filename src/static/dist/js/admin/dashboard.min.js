@@ -0,0 +1,10 @@
+document.addEventListener('DOMContentLoaded', function() {
+document.querySelectorAll('.progress-bar[data-width]').forEach(bar => {
+const width = bar.getAttribute('data-width');
+bar.style.width = `${width}%`;
+bar.setAttribute('aria-valuenow', width);
+bar.setAttribute('aria-valuemin', 0);
+bar.setAttribute('aria-valuemax', 100);
+});
+console.log('Admin dashboard loaded');
+});
@@ -0,0 +1,16 @@
+document.addEventListener('DOMContentLoaded', function() {
+document.querySelectorAll('.progress-bar[data-width]').forEach(bar => {
+const width = bar.getAttribute('data-width');
+bar.style.width = `${width}%`;
+bar.setAttribute('aria-valuenow', width);
+bar.setAttribute('aria-valuemin', 0);
+bar.setAttribute('aria-valuemax', 100);
+});
+console.log('Reports page loaded');
+});
+function exportReport(format) {
+console.log('Exporting report as', format);
+}
+function scheduleReport() {
+console.log('Scheduling report');
+}
@@ -0,0 +1,34 @@
+// API Dashboard functionality
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('API Dashboard loaded');
+
+    // Simulate real-time updates
+    setInterval(() => {
+        // Update API call count
+        const currentCount = parseInt(document.querySelector('.stats-number').textContent);
+        document.querySelector('.stats-number').textContent = currentCount + Math.floor(Math.random() * 5);
+    }, 10000);
+});
+
+// Generate new API key
+function generateApiKey() {
+    const chars = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789';
+    let result = 'sk_live_51';
+    for (let i = 0; i < 32; i++) {
+        result += chars.charAt(Math.floor(Math.random() * chars.length));
+    }
+    return result;
+}
+
+// Toggle endpoint status
+function toggleEndpointStatus(endpointId, currentStatus) {
+    const newStatus = currentStatus === 'active' ? 'inactive' : 'active';
+    console.log(`Toggling endpoint ${endpointId} to ${newStatus}`);
+    // Implementation for toggling endpoint status
+}
+
+// Export API usage data
+function exportApiUsage() {
+    console.log('Exporting API usage data');
+    // Implementation for exporting usage data
+}
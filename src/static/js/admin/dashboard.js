@@ -0,0 +1,14 @@
+// Initialize progress bars and other interactive elements
+document.addEventListener('DOMContentLoaded', function() {
+    // Initialize progress bars
+    document.querySelectorAll('.progress-bar[data-width]').forEach(bar => {
+        const width = bar.getAttribute('data-width');
+        bar.style.width = `${width}%`;
+        bar.setAttribute('aria-valuenow', width);
+        bar.setAttribute('aria-valuemin', 0);
+        bar.setAttribute('aria-valuemax', 100);
+    });
+
+    // Initialize any charts here if needed
+    console.log('Admin dashboard loaded');
+});
@@ -0,0 +1,26 @@
+// Report generation functionality
+document.addEventListener('DOMContentLoaded', function() {
+    // Initialize progress bars
+    document.querySelectorAll('.progress-bar[data-width]').forEach(bar => {
+        const width = bar.getAttribute('data-width');
+        bar.style.width = `${width}%`;
+        bar.setAttribute('aria-valuenow', width);
+        bar.setAttribute('aria-valuemin', 0);
+        bar.setAttribute('aria-valuemax', 100);
+    });
+
+    // Initialize any charts here if needed
+    console.log('Reports page loaded');
+});
+
+// Export functionality
+function exportReport(format) {
+    console.log('Exporting report as', format);
+    // Add export functionality here
+}
+
+// Schedule report functionality
+function scheduleReport() {
+    console.log('Scheduling report');
+    // Add schedule functionality here
+}
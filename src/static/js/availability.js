@@ -0,0 +1,36 @@
+/* Live seat availability: updates seat counts in place from the SSE stream */
+(function () {
+    var script = document.currentScript;
+    if (!script || !window.EventSource) {
+        return;
+    }
+
+    function each(attribute, code, callback) {
+        var selector = '[' + attribute + '="' + CSS.escape(code) + '"]';
+        document.querySelectorAll(selector).forEach(callback);
+    }
+
+    var source = new EventSource(script.dataset.streamUrl);
+    source.addEventListener('availability', function (event) {
+        var data = JSON.parse(event.data);
+
+        each('data-seats-module', data.module, function (el) {
+            var fullLabel = el.dataset.fullLabel;
+            if (fullLabel && data.available <= 0) {
+                el.textContent = fullLabel;
+                el.classList.replace('badge-success', 'badge-danger');
+            } else {
+                el.textContent = data.available;
+                el.classList.replace('badge-danger', 'badge-success');
+            }
+        });
+        each('data-registered-module', data.module, function (el) {
+            el.textContent = data.registered;
+        });
+        each('data-progress-module', data.module, function (el) {
+            var percent = data.capacity ? Math.round(100 * data.registered / data.capacity) : 0;
+            el.style.width = percent + '%';
+            el.setAttribute('aria-valuenow', data.registered);
+        });
+    });
+})();
@@ -17,10 +17,10 @@ cd /d "%~dp0\src"
 echo Installing/upgrading required packages...
 pip install mysqlclient==2.2.4
 
+echo Preparing database (create, migrate, sample data)...
+python manage.py bootstrap
+
 echo Starting Django development server...
-echo Database will be created automatically if needed!
-echo Migrations will run automatically!
-echo Sample data will be populated automatically!
 echo.
 echo Server will be available at: http://127.0.0.1:8000
 echo Admin panel at: http://127.0.0.1:8000/admin/
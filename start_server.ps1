@@ -16,10 +16,10 @@ Set-Location -Path "$PSScriptRoot\src"
 Write-Host "Installing required packages..." -ForegroundColor Yellow
 pip install mysqlclient
 
+Write-Host "Preparing database (create, migrate, sample data)..." -ForegroundColor Yellow
+python manage.py bootstrap
+
 Write-Host "`nStarting Django development server..." -ForegroundColor Green
-Write-Host "✅ Database will be created automatically if needed!" -ForegroundColor Green
-Write-Host "✅ Migrations will run automatically!" -ForegroundColor Green  
-Write-Host "✅ Sample data will be populated automatically!" -ForegroundColor Green
 Write-Host ""
 Write-Host "🌐 Server will be available at: http://127.0.0.1:8000" -ForegroundColor Magenta
 Write-Host "⚙️  Admin panel at: http://127.0.0.1:8000/admin/" -ForegroundColor Magenta